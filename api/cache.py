@@ -0,0 +1,133 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+
+class LRUTTLCache:
+    """
+    프로세스 내 LRU + TTL 캐시.
+    엔트리마다 tag 를 달아두고 invalidate(tag) 로 같은 키워드의 엔트리를 한 번에 지운다.
+    이벤트 루프 한 곳에서만 접근하므로 별도 락은 두지 않는다.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, tags: Iterable[str] = ()):
+        tags = tuple(tags)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    async def invalidate(self, tag: str):
+        for key in list(self._tags.get(tag, ())):
+            self._remove(key)
+
+    async def close(self):
+        pass
+
+    def _remove(self, key: str):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisCache:
+    """
+    Redis 캐시. 값은 JSON 으로 저장하고 TTL 을 건다.
+    tag 마다 Redis SET 에 소속 키를 모아두고 invalidate(tag) 시 함께 삭제한다.
+    """
+
+    def __init__(self, url: str, ttl: float = 30.0, prefix: str = "kwapi:"):
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis 를 쓰려면 redis 패키지가 필요합니다.") from e
+
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = aioredis.Redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, tags: Iterable[str] = ()):
+        ttl_ms = int(self.ttl * 1000)
+        pipe = self._client.pipeline()
+        pipe.set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=ttl_ms)
+        for tag in tags:
+            # tag SET 은 매번 TTL 을 갱신하므로 소속 엔트리보다 먼저 만료되지 않는다
+            pipe.sadd(self.prefix + "tag:" + tag, self.prefix + key)
+            pipe.pexpire(self.prefix + "tag:" + tag, ttl_ms)
+        await pipe.execute()
+
+    async def invalidate(self, tag: str):
+        tag_key = self.prefix + "tag:" + tag
+        keys = await self._client.smembers(tag_key)
+        pipe = self._client.pipeline()
+        if keys:
+            pipe.delete(*keys)
+        pipe.delete(tag_key)
+        await pipe.execute()
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class NullCache:
+    """CACHE_BACKEND=none: 캐시 비활성화"""
+
+    async def get(self, key: str) -> Optional[Any]:
+        return None
+
+    async def set(self, key: str, value: Any, tags: Iterable[str] = ()):
+        pass
+
+    async def invalidate(self, tag: str):
+        pass
+
+    async def close(self):
+        pass
+
+
+def build_cache():
+    """
+    환경 변수로 캐시 백엔드 선택
+    - CACHE_BACKEND   : memory(기본) / redis / none
+    - CACHE_TTL       : 엔트리 최대 수명(초). POST /next 무효화가 닿지 않는 경우의 최대 지연
+    - CACHE_MAXSIZE   : memory 백엔드 최대 엔트리 수
+    - REDIS_URL       : redis 백엔드 접속 주소
+    """
+    backend = os.getenv("CACHE_BACKEND", "memory").lower()
+    ttl = float(os.getenv("CACHE_TTL", "30"))
+
+    if backend == "redis":
+        return RedisCache(os.getenv("REDIS_URL", "redis://redis:6379/0"), ttl=ttl)
+    if backend == "none":
+        return NullCache()
+    return LRUTTLCache(maxsize=int(os.getenv("CACHE_MAXSIZE", "10000")), ttl=ttl)
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from search_graph.neo4j_client import UNWIND_NEXT_DELTAS
+
+logger = logging.getLogger(__name__)
+
+Edge = Tuple[str, str]
+
+
+class NextWriteBuffer:
+    """
+    POST /next 클릭 이벤트를 (from_kw, to_kw) 별 증가분으로 메모리에 합산했다가
+    주기적으로 UNWIND 트랜잭션 한 번에 적재한다.
+
+    - max_staleness: 가장 오래된 미적재 증가분이 이 시간(초)을 넘기기 전에 flush
+    - max_pending  : 버퍼에 쌓인 서로 다른 간선 수가 이 값을 넘으면 즉시 flush
+    - on_flushed   : flush 성공 후 적재된 간선 목록으로 호출 (캐시 무효화 등)
+    """
+
+    def __init__(
+        self,
+        driver,
+        max_staleness: float = 1.0,
+        max_pending: int = 10000,
+        on_flushed: Optional[Callable[[List[Edge]], Awaitable[None]]] = None,
+    ):
+        self._driver = driver
+        self.max_staleness = max_staleness
+        self.max_pending = max_pending
+        self._on_flushed = on_flushed
+
+        self._pending: Dict[Edge, int] = {}
+        self._oldest: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.flushes = 0
+        self.flush_errors = 0
+        self.last_flush_rows = 0
+        self.last_flush_latency_ms = 0.0
+        self.max_flush_latency_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def add(self, from_kw: str, to_kw: str, delta: int = 1) -> int:
+        """증가분을 버퍼에 합산하고 현재 버퍼 깊이를 반환 (적재는 나중에)"""
+        edge = (from_kw, to_kw)
+        self._pending[edge] = self._pending.get(edge, 0) + delta
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+            self._wakeup.set()
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+        return len(self._pending)
+
+    async def start(self):
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        주기 flush 를 멈추고 남은 버퍼를 마지막으로 적재.
+        진행 중인 flush 를 취소하지 않고 루프가 끝나기를 기다린 뒤 마지막 flush 를 한다.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            timeout = self.max_staleness
+            if self._oldest is not None:
+                timeout = max(0.0, self._oldest + self.max_staleness - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._stopping:
+                return
+
+            due = self._oldest is not None and (
+                time.monotonic() - self._oldest >= self.max_staleness
+                or len(self._pending) >= self.max_pending
+            )
+            if due:
+                try:
+                    await self.flush()
+                except Exception:
+                    # 실패한 증가분은 버퍼에 되돌려 두었으므로 다음 주기에 재시도
+                    logger.exception("NEXT 버퍼 flush 실패")
+
+    async def flush(self):
+        if not self._pending:
+            return
+
+        pending = self._pending
+        self._pending = {}
+        self._oldest = None
+
+        rows = [
+            {"from_kw": a, "to_kw": b, "delta": delta}
+            for (a, b), delta in sorted(pending.items())
+        ]
+
+        started = time.monotonic()
+        try:
+            async with self._driver.session() as session:
+                await session.execute_write(_write_rows, rows)
+        except BaseException:
+            # 취소(CancelledError)로 끊긴 경우도 커밋되지 않은 증가분은 버퍼로 되돌린다
+            self.flush_errors += 1
+            for edge, delta in pending.items():
+                self._pending[edge] = self._pending.get(edge, 0) + delta
+            if self._oldest is None:
+                self._oldest = started
+            raise
+
+        latency = (time.monotonic() - started) * 1000
+        self.flushes += 1
+        self.last_flush_rows = len(rows)
+        self.last_flush_latency_ms = latency
+        self.max_flush_latency_ms = max(self.max_flush_latency_ms, latency)
+        logger.debug("NEXT 버퍼 flush: rows=%d (%.1fms)", len(rows), latency)
+
+        if self._on_flushed is not None:
+            await self._on_flushed(list(pending))
+
+    def stats(self) -> Dict[str, float]:
+        oldest_age = time.monotonic() - self._oldest if self._oldest is not None else 0.0
+        return {
+            "depth": self.depth,
+            "oldest_age_ms": round(oldest_age * 1000, 1),
+            "max_staleness_ms": self.max_staleness * 1000,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "last_flush_rows": self.last_flush_rows,
+            "last_flush_latency_ms": round(self.last_flush_latency_ms, 1),
+            "max_flush_latency_ms": round(self.max_flush_latency_ms, 1),
+        }
+
+
+async def _write_rows(tx, rows):
+    result = await tx.run(UNWIND_NEXT_DELTAS, rows=rows)
+    await result.consume()
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from search_graph.csr_graph import CSRGraph, load_csr
+
+from snapshot_store import SnapshotStore
+
+
+class GraphStore(SnapshotStore):
+    """
+    배치(export_csr)가 만든 NEXT CSR 그래프를 메모리에 올려두고 다중 홉 추천에 사용한다.
+    RecommendStore 와 같은 방식으로 LATEST 가 바뀌면 새 그래프를 읽은 뒤 참조만 교체한다.
+    요청 처리 중 교체될 수 있으므로 그래프와 version 은 current 에서 함께 꺼내 쓴다.
+    """
+
+    label = "CSR 그래프"
+
+    @property
+    def graph(self) -> Optional[CSRGraph]:
+        return self.current[0] if self.current is not None else None
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.current[1] if self.current is not None else None
+
+    def load(self, path: str) -> CSRGraph:
+        graph = load_csr(path)
+        # /path 역방향 탐색용 인접 구조를 요청 전에 미리 만든다
+        graph.reverse_adjacency()
+        return graph
+
+    def describe(self, graph: CSRGraph) -> str:
+        return f"nodes={graph.num_nodes}, edges={graph.num_edges}"
@@ -1,15 +1,198 @@
+import asyncio
+import base64
+import json
+import logging
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Any, List, Optional
+
+import yaml
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase
+from neo4j.exceptions import DriverError, Neo4jError
+
+from cache import build_cache
+from coalescer import NextWriteBuffer
+from graph_store import GraphStore
+from recommend_store import RecommendStore
+from search_graph.csr_graph import personalized_pagerank, shortest_path, top_k
+from search_graph.neo4j_client import (
+    LIST_NODES,
+    MERGE_NEXT_CLICK,
+    NODE_BY_NAME,
+    NODE_WITH_NEXT,
+    NODES_WITH_NEXT,
+    SCHEMA_MAX_RETRIES,
+    SCHEMA_STATEMENTS,
+    UNWIND_NEXT_DELTAS_RETURN_COUNTS,
+    schema_retry_delay,
+)
+from search_graph.normalize import KeywordNormalizer, NormalizeConfig
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
 
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://neo4j:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "2Engussla")
+# 커넥션 풀 크기 / 풀에서 커넥션을 얻기까지 최대 대기 시간(초)
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "100"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "60"))
+
+driver = AsyncGraphDatabase.driver(
+    NEO4J_URI,
+    auth=(NEO4J_USER, NEO4J_PASSWORD),
+    max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+    connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+)
+
+
+def _load_normalizer() -> KeywordNormalizer:
+    """배치 config.yml 의 normalize 섹션으로 정규화기 생성 (없으면 기본 규칙)"""
+    path = os.getenv("KEYWORD_NORMALIZE_CONFIG")
+    if not path:
+        return KeywordNormalizer()
+
+    with open(path, encoding="utf-8") as f:
+        raw = yaml.safe_load(f) or {}
+    return KeywordNormalizer(NormalizeConfig.from_dict(raw.get("normalize")))
+
+
+# 요청의 키워드는 배치와 같은 규칙으로 정규화해서 Keyword.name 과 맞춘다
+normalize_keyword = _load_normalizer()
+
+# GET /node, /nodes 읽기 캐시 (POST /next 가 해당 키워드 엔트리를 무효화)
+cache = build_cache()
+
+
+def _node_tag(name: str) -> str:
+    return f"node:{name}"
+
+
+def _node_cache_key(name: str, include_next: bool, limit: int, cursor: str = "") -> str:
+    # name 은 ':' 를 포함할 수 있으므로 가변 부분을 마지막에 둔다 (cursor 는 base64url)
+    return f"node:{include_next}:{limit}:{cursor}:{name}"
+
+
+# ---------------------------------------------------------
+# keyset 페이지네이션 커서: 마지막 항목의 정렬 키를 base64url(JSON) 로 감싼 값
+# ---------------------------------------------------------
+def _encode_cursor(key: Any) -> str:
+    raw = json.dumps(key, ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Any:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
+
+def _next_response(name: str, next_list: List[dict], limit: int) -> dict:
+    response = {"found": True, "name": name, "next": next_list, "next_cursor": None}
+    if len(next_list) == limit:
+        last = next_list[-1]
+        response["next_cursor"] = _encode_cursor([last["count"], last["name"]])
+    return response
+
+
+async def _invalidate_edges(edges):
+    for from_kw, to_kw in edges:
+        await cache.invalidate(_node_tag(from_kw))
+        await cache.invalidate(_node_tag(to_kw))
+
+
+# POST /next 쓰기 병합 모드 (NEXT_COALESCE=true 일 때만 사용)
+# 증가분은 즉시 응답하고 NEXT_COALESCE_MAX_STALENESS 초 안에 UNWIND 로 일괄 적재
+NEXT_COALESCE = os.getenv("NEXT_COALESCE", "false").lower() in ("1", "true", "yes")
+next_buffer = (
+    NextWriteBuffer(
+        driver,
+        max_staleness=float(os.getenv("NEXT_COALESCE_MAX_STALENESS", "1.0")),
+        max_pending=int(os.getenv("NEXT_COALESCE_MAX_PENDING", "10000")),
+        on_flushed=_invalidate_edges,
+    )
+    if NEXT_COALESCE
+    else None
+)
+
+
+# 배치(export_recommend)가 만든 추천 스냅샷: LATEST 변경을 주기적으로 확인해 교체
+recommend_store = RecommendStore(
+    os.getenv("RECOMMEND_SNAPSHOT_DIR", "/data/recommend"),
+    reload_interval=float(os.getenv("RECOMMEND_RELOAD_INTERVAL", "30")),
+)
+
+# 배치(export_csr)가 만든 NEXT CSR 그래프: /recommend/multihop 용
+graph_store = GraphStore(
+    os.getenv("GRAPH_SNAPSHOT_DIR", "/data/graph"),
+    reload_interval=float(os.getenv("RECOMMEND_RELOAD_INTERVAL", "30")),
+)
 
-driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+# 배치 엔드포인트 요청당 최대 항목 수
+NEXT_BATCH_MAX_ITEMS = int(os.getenv("NEXT_BATCH_MAX_ITEMS", "500"))
+NODE_LOOKUP_MAX_NAMES = int(os.getenv("NODE_LOOKUP_MAX_NAMES", "100"))
+
+# /path 탐색 상한 (최악 지연 시간 제한)
+PATH_MAX_HOPS = int(os.getenv("PATH_MAX_HOPS", "6"))
+PATH_MAX_FANOUT = int(os.getenv("PATH_MAX_FANOUT", "200"))
+
+
+# 모든 쿼리가 Keyword.name 으로 노드를 찾고 NEXT 를 count 로 다루므로 시작 시 보장
+# (배치와 같은 SCHEMA_STATEMENTS 를 쓴다)
+# compose 의 depends_on 은 Neo4j 준비를 기다리지 않으므로 시작을 막지 않고 백그라운드에서
+# 연결될 때까지 재시도한다 (그동안 요청은 드라이버가 연결되는 대로 처리)
+async def ensure_schema():
+    attempt = 0
+    while True:
+        try:
+            await _create_schema()
+            return
+        except DriverError as e:
+            if attempt >= SCHEMA_MAX_RETRIES:
+                logger.error("Neo4j 에 연결하지 못해 스키마를 만들지 못했습니다: %s", e)
+                return
+            attempt += 1
+            delay = schema_retry_delay(attempt)
+            logger.warning(
+                "Neo4j 연결 대기 %d/%d (%.0fs 후 재시도): %s", attempt, SCHEMA_MAX_RETRIES, delay, e
+            )
+            await asyncio.sleep(delay)
+
+
+async def _create_schema():
+    async with driver.session() as session:
+        for name, statement in SCHEMA_STATEMENTS.items():
+            try:
+                result = await session.run(statement)
+                await result.consume()
+            except Neo4jError as e:
+                # 예: 중복 Keyword 가 이미 있으면 유니크 제약조건 생성 실패
+                logger.warning("스키마 생성 실패: %s (%s)", name, e.message)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    schema_task = asyncio.create_task(ensure_schema())
+    await recommend_store.start()
+    await graph_store.start()
+    if next_buffer is not None:
+        await next_buffer.start()
+    yield
+    schema_task.cancel()
+    await asyncio.gather(schema_task, return_exceptions=True)
+    await recommend_store.stop()
+    await graph_store.stop()
+    if next_buffer is not None:
+        # 종료 전에 남은 증가분 적재
+        await next_buffer.stop()
+    await cache.close()
+    await driver.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 class ClickPath(BaseModel):
@@ -17,13 +200,12 @@ class ClickPath(BaseModel):
     to_kw: str
 
 
-@app.on_event("shutdown")
-def close_driver():
-    driver.close()
+class ClickPathBatch(BaseModel):
+    items: List[ClickPath]
 
 
 @app.post("/next")
-def create_next(cp: ClickPath):
+async def create_next(cp: ClickPath):
     """
     ex)
     POST /next
@@ -31,73 +213,358 @@ def create_next(cp: ClickPath):
       "from_kw": "치킨",
       "to_kw": "닭고기"
     }
+
+    NEXT_COALESCE=true 이면 증가분을 버퍼에 넣고 바로 응답한다 (count 없음).
+    키워드는 정규화해서 저장하며 응답의 from/to 도 정규화된 값이다.
     """
-    cypher = """
-    MERGE (a:Keyword {name:$from_kw})
-    MERGE (b:Keyword {name:$to_kw})
-    MERGE (a)-[r:NEXT]->(b)
-    ON CREATE SET r.count = 1
-    ON MATCH SET r.count = r.count + 1
-    RETURN r.count AS count
-    """
-    with driver.session() as session:
-        result = session.run(
-            cypher,
+    cp = ClickPath(from_kw=normalize_keyword(cp.from_kw), to_kw=normalize_keyword(cp.to_kw))
+    if not (cp.from_kw and cp.to_kw):
+        raise HTTPException(status_code=400, detail="빈 키워드입니다.")
+
+    if next_buffer is not None:
+        depth = next_buffer.add(cp.from_kw, cp.to_kw)
+        return {"from": cp.from_kw, "to": cp.to_kw, "queued": True, "pending": depth}
+
+    async with driver.session() as session:
+        result = await session.run(
+            MERGE_NEXT_CLICK,
             from_kw=cp.from_kw,
             to_kw=cp.to_kw,
         )
-        record = result.single()
-        return {"from": cp.from_kw, "to": cp.to_kw, "count": record["count"]}
+        record = await result.single()
+
+    # from_kw 의 NEXT 목록과, 새로 생겼을 수 있는 to_kw 노드 조회 결과 무효화
+    await _invalidate_edges([(cp.from_kw, cp.to_kw)])
+    return {"from": cp.from_kw, "to": cp.to_kw, "count": record["count"]}
+
+
+@app.post("/next/batch")
+async def create_next_batch(batch: ClickPathBatch):
+    """
+    여러 클릭 경로를 한 트랜잭션으로 반영
+
+    ex)
+    POST /next/batch
+    {"items": [{"from_kw": "치킨", "to_kw": "닭고기"}, {"from_kw": "치킨", "to_kw": "튀김"}]}
+
+    결과는 items 순서대로 돌려준다. 같은 간선이 여러 번 있으면 한 번에 합산하며,
+    count 는 배치 반영 후 값이다. 빈 키워드는 해당 항목만 error 로 응답한다.
+    키워드는 정규화해서 합산하므로 표기만 다른 항목은 같은 간선이 된다.
+    """
+    if len(batch.items) > NEXT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"items 는 최대 {NEXT_BATCH_MAX_ITEMS}개까지 가능합니다.",
+        )
+
+    items = [
+        ClickPath(from_kw=normalize_keyword(cp.from_kw), to_kw=normalize_keyword(cp.to_kw))
+        for cp in batch.items
+    ]
+
+    deltas = {}
+    for cp in items:
+        if cp.from_kw and cp.to_kw:
+            edge = (cp.from_kw, cp.to_kw)
+            deltas[edge] = deltas.get(edge, 0) + 1
+
+    counts = {}
+    if next_buffer is not None:
+        for (from_kw, to_kw), delta in deltas.items():
+            next_buffer.add(from_kw, to_kw, delta)
+    elif deltas:
+        rows = [
+            {"from_kw": a, "to_kw": b, "delta": delta}
+            for (a, b), delta in sorted(deltas.items())
+        ]
+        async with driver.session() as session:
+            records = await session.execute_write(_write_next_deltas, rows)
+        counts = {(r["from_kw"], r["to_kw"]): r["count"] for r in records}
+        await _invalidate_edges(deltas)
+
+    results = []
+    for cp in items:
+        if not (cp.from_kw and cp.to_kw):
+            results.append({"from": cp.from_kw, "to": cp.to_kw, "error": "empty keyword"})
+        elif next_buffer is not None:
+            results.append({"from": cp.from_kw, "to": cp.to_kw, "queued": True})
+        else:
+            results.append(
+                {"from": cp.from_kw, "to": cp.to_kw, "count": counts[(cp.from_kw, cp.to_kw)]}
+            )
+    return {"count": len(results), "results": results}
+
+
+async def _write_next_deltas(tx, rows):
+    result = await tx.run(UNWIND_NEXT_DELTAS_RETURN_COUNTS, rows=rows)
+    return await result.data()
+
+
+@app.get("/metrics/next-buffer")
+async def next_buffer_metrics():
+    """POST /next 쓰기 병합 버퍼 상태 (깊이, flush 지연 등)"""
+    if next_buffer is None:
+        return {"enabled": False}
+    return {"enabled": True, **next_buffer.stats()}
+
+
 @app.get("/node/{name}")
-def get_node(name: str, include_next: bool = True, limit: int = 50):
+async def get_node(
+    name: str,
+    include_next: bool = True,
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
     """
     키워드 노드 조회 (옵션: NEXT 이웃까지)
 
     - GET /node/치킨
     - GET /node/치킨?include_next=true&limit=10
+    - GET /node/치킨?limit=10&cursor=<이전 응답의 next_cursor>
+
+    NEXT 이웃은 count 내림차순 상위 limit 개. 더 있으면 next_cursor 로 다음 페이지 조회.
+    페이지마다 name 의 NEXT 간선을 전부 정렬하므로 비용은 나가는 간선 수에 비례한다
+    (허브 키워드의 상위 K 는 /recommend 스냅샷이 미리 계산해 둔다).
+    name 은 정규화해서 조회한다 (GET /node/TERRA%20 == GET /node/terra).
     """
+    name = normalize_keyword(name)
+    cache_key = _node_cache_key(name, include_next, limit, cursor or "")
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    response = await _get_node(name, include_next, limit, cursor)
+    await cache.set(cache_key, response, tags=[_node_tag(name)])
+    return response
+
+
+async def _get_node(name: str, include_next: bool, limit: int, cursor: Optional[str]):
     if include_next:
-        cypher = """
-        MATCH (k:Keyword {name:$name})
-        OPTIONAL MATCH (k)-[r:NEXT]->(n:Keyword)
-        RETURN
-          k.name AS name,
-          collect({name: n.name, count: r.count})[0..$limit] AS next
-        """
-        with driver.session() as session:
-            record = session.run(cypher, name=name, limit=limit).single()
+        after_count, after_name = None, None
+        if cursor:
+            after = _decode_cursor(cursor)
+            if not (
+                isinstance(after, list)
+                and len(after) == 2
+                and isinstance(after[0], int)
+                and isinstance(after[1], str)
+            ):
+                raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+            after_count, after_name = after
+        async with driver.session() as session:
+            result = await session.run(
+                NODE_WITH_NEXT,
+                name=name,
+                limit=limit,
+                after_count=after_count,
+                after_name=after_name,
+            )
+            record = await result.single()
             if record is None:
                 return {"found": False, "name": name}
-            return {
-                "found": True,
-                "name": record["name"],
-                "next": [x for x in (record["next"] or []) if x.get("name") is not None],
-            }
-
-    cypher = """
-    MATCH (k:Keyword {name:$name})
-    RETURN k.name AS name
-    """
-    with driver.session() as session:
-        record = session.run(cypher, name=name).single()
+            return _next_response(record["name"], record["next"], limit)
+
+    async with driver.session() as session:
+        result = await session.run(NODE_BY_NAME, name=name)
+        record = await result.single()
         if record is None:
             return {"found": False, "name": name}
         return {"found": True, "name": record["name"]}
 
 
+@app.get("/nodes/next")
+async def get_nodes_next(
+    name: List[str] = Query(...),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """
+    여러 키워드의 NEXT 이웃을 한 번의 Cypher 로 조회
+
+    - GET /nodes/next?name=치킨&name=맥주&limit=10
+
+    결과는 name 순서대로, 각 항목은 GET /node/{name} (첫 페이지) 과 같은 형태.
+    캐시에 있는 키워드는 캐시에서, 나머지만 Neo4j 에서 가져온다.
+    각 name 은 정규화해서 조회한다.
+    """
+    if len(name) > NODE_LOOKUP_MAX_NAMES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"name 은 최대 {NODE_LOOKUP_MAX_NAMES}개까지 가능합니다.",
+        )
+    name = [normalize_keyword(n) for n in name]
+
+    found = {}
+    misses = []
+    for n in dict.fromkeys(name):
+        cached = await cache.get(_node_cache_key(n, True, limit))
+        if cached is not None:
+            found[n] = cached
+        else:
+            misses.append(n)
+
+    if misses:
+        async with driver.session() as session:
+            result = await session.run(
+                NODES_WITH_NEXT,
+                names=misses,
+                limit=limit,
+                after_count=None,
+                after_name=None,
+            )
+            records = await result.data()
+
+        for record in records:
+            if record["found"]:
+                response = _next_response(record["name"], record["next"], limit)
+            else:
+                response = {"found": False, "name": record["name"]}
+            found[record["name"]] = response
+            await cache.set(
+                _node_cache_key(record["name"], True, limit),
+                response,
+                tags=[_node_tag(record["name"])],
+            )
+
+    results = [found[n] for n in name]
+    return {"count": len(results), "results": results}
+
+
 @app.get("/nodes")
-def list_nodes(limit: int = 100):
+async def list_nodes(
+    limit: int = Query(100, ge=1, le=10000),
+    cursor: Optional[str] = None,
+):
     """
     전체 Keyword 노드 목록(일부) 조회
 
     - GET /nodes?limit=100
+    - GET /nodes?limit=100&cursor=<이전 응답의 next_cursor>
+
+    name 오름차순 keyset 페이지네이션 (Keyword.name 인덱스 순서로 읽음)
     """
-    cypher = """
-    MATCH (k:Keyword)
-    RETURN k.name AS name
-    ORDER BY name
-    LIMIT $limit
+    # 새 노드 반영은 CACHE_TTL 만큼 늦어질 수 있음
+    cache_key = f"nodes:{limit}:{cursor or ''}"
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    after_name = _decode_cursor(cursor) if cursor else None
+    if cursor and not isinstance(after_name, str):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+    async with driver.session() as session:
+        result = await session.run(LIST_NODES, limit=limit, after_name=after_name)
+        rows = await result.data()
+
+    nodes = [r["name"] for r in rows]
+    response = {
+        "count": len(nodes),
+        "nodes": nodes,
+        "next_cursor": _encode_cursor(nodes[-1]) if len(nodes) == limit else None,
+    }
+    await cache.set(cache_key, response)
+    return response
+
+
+@app.get("/recommend/multihop/{name}")
+async def recommend_multihop(
+    name: str,
+    limit: int = Query(10, ge=1, le=1000),
+    alpha: float = Query(0.15, gt=0, lt=1),
+):
+    """
+    다중 홉 추천: name 에서 시작하는 random walk with restart(Personalized PageRank)
+    점수 상위 키워드. 직접 이웃뿐 아니라 2~3 홉 떨어진 키워드도 포함된다.
+
+    - GET /recommend/multihop/치킨?limit=10&alpha=0.15
+    """
+    name = normalize_keyword(name)
+    # await 중에 그래프가 교체될 수 있으므로 그래프와 version 을 한 번에 꺼낸다
+    current = graph_store.current
+    if current is None:
+        raise HTTPException(status_code=503, detail="CSR 그래프가 아직 로드되지 않았습니다.")
+    graph, version = current
+
+    source = graph.index.get(name)
+    if source is None:
+        return {"found": False, "name": name, "version": version}
+
+    # CPU 연산이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+    nodes, scores = await asyncio.to_thread(personalized_pagerank, graph, [source], alpha)
+    ranked = top_k(nodes, scores, limit, exclude=[source])
+
+    return {
+        "found": True,
+        "name": name,
+        "version": version,
+        "results": [{"name": graph.keywords[i], "score": score} for i, score in ranked],
+    }
+
+
+@app.get("/path")
+async def reformulation_path(
+    from_kw: str = Query(..., alias="from"),
+    to_kw: str = Query(..., alias="to"),
+    max_hops: int = Query(4, ge=1, le=PATH_MAX_HOPS),
+    fanout: int = Query(50, ge=1, le=PATH_MAX_FANOUT),
+):
+    """
+    두 키워드 사이 재검색 경로 (NEXT count 가 클수록 짧은 간선으로 보는 최단 경로)
+
+    - GET /path?from=테라&to=맥주&max_hops=4
     """
-    with driver.session() as session:
-        rows = session.run(cypher, limit=limit).data()
-        return {"count": len(rows), "nodes": [r["name"] for r in rows]}
+    from_kw, to_kw = normalize_keyword(from_kw), normalize_keyword(to_kw)
+    current = graph_store.current
+    if current is None:
+        raise HTTPException(status_code=503, detail="CSR 그래프가 아직 로드되지 않았습니다.")
+    graph, version = current
+
+    missing = [kw for kw in (from_kw, to_kw) if kw not in graph.index]
+    if missing:
+        return {"found": False, "from": from_kw, "to": to_kw, "missing": missing}
+
+    found = await asyncio.to_thread(
+        shortest_path,
+        graph,
+        graph.index[from_kw],
+        graph.index[to_kw],
+        max_hops,
+        fanout,
+    )
+    if found is None:
+        return {"found": False, "from": from_kw, "to": to_kw, "missing": []}
+
+    nodes, cost = found
+    return {
+        "found": True,
+        "from": from_kw,
+        "to": to_kw,
+        "version": version,
+        "path": [graph.keywords[i] for i in nodes],
+        "hops": len(nodes) - 1,
+        "cost": cost,
+    }
+
+
+@app.get("/recommend/{name}")
+async def recommend(name: str, limit: int = Query(10, ge=1)):
+    """
+    다음 검색어 추천 (Neo4j 조회 없이 메모리 스냅샷에서 응답)
+
+    - GET /recommend/치킨?limit=10
+    """
+    name = normalize_keyword(name)
+    snapshot = recommend_store.snapshot
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="추천 스냅샷이 아직 로드되지 않았습니다.")
+
+    entry = snapshot.items.get(name)
+    if entry is None:
+        return {"found": False, "name": name, "version": snapshot.version}
+
+    return {
+        "found": True,
+        "name": name,
+        "version": snapshot.version,
+        "next": [{"name": n, "count": c} for n, c in entry["next"][:limit]],
+        "fail_next": [{"name": n, "count": c} for n, c in entry["fail_next"][:limit]],
+    }
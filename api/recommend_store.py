@@ -0,0 +1,25 @@
+from typing import Optional
+
+from search_graph.recommend_snapshot import RecommendSnapshot, load_snapshot
+
+from snapshot_store import SnapshotStore
+
+
+class RecommendStore(SnapshotStore):
+    """
+    배치(export_recommend)가 만든 추천 스냅샷을 메모리에 올려두고 조회한다.
+    LATEST 가 바뀌면 새 스냅샷을 백그라운드에서 읽은 뒤 참조만 교체한다
+    (교체 전까지는 이전 스냅샷으로 계속 응답).
+    """
+
+    label = "추천 스냅샷"
+
+    @property
+    def snapshot(self) -> Optional[RecommendSnapshot]:
+        return self.current[0] if self.current is not None else None
+
+    def load(self, path: str) -> RecommendSnapshot:
+        return load_snapshot(path)
+
+    def describe(self, snapshot: RecommendSnapshot) -> str:
+        return f"keywords={len(snapshot.items)}"
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import os
+from typing import Any, Optional, Tuple
+
+from search_graph.recommend_snapshot import latest_snapshot_path
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """
+    배치가 LATEST 방식으로 내보낸 스냅샷 디렉토리를 주기적으로 확인해 메모리 객체를 교체한다.
+    새 파일은 백그라운드 스레드에서 읽고 (객체, 버전) 튜플 참조만 한 번에 바꾸므로
+    요청은 current 를 한 번 읽으면 같은 스냅샷의 객체와 버전을 함께 쓴다.
+    깨진 파일은 로드하지 않고 이전 스냅샷을 유지하며, 같은 파일은 다시 읽지 않는다.
+
+    하위 클래스는 label, load(path), describe(value) 를 정의한다.
+    """
+
+    label = "스냅샷"
+
+    def __init__(self, snapshot_dir: str, reload_interval: float = 30.0):
+        self.snapshot_dir = snapshot_dir
+        self.reload_interval = reload_interval
+        # (로드한 객체, 버전 = 파일명)
+        self.current: Optional[Tuple[Any, str]] = None
+        self._path: Optional[str] = None
+        self._failed_path: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self, path: str) -> Any:
+        raise NotImplementedError
+
+    def describe(self, value: Any) -> str:
+        return ""
+
+    async def start(self):
+        # 시작 시 스냅샷이 없거나 깨져 있어도 API 는 뜬다 (그동안 해당 엔드포인트는 503)
+        try:
+            await self.reload()
+        except Exception:
+            logger.warning("%s 로드 실패 (스냅샷 없이 시작)", self.label, exc_info=True)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception("%s 리로드 실패 (이전 스냅샷 유지)", self.label)
+
+    async def reload(self) -> bool:
+        """LATEST 가 가리키는 파일이 바뀌었으면 읽어서 교체. 교체 여부 반환"""
+        path = latest_snapshot_path(self.snapshot_dir)
+        if path is None or path == self._path or path == self._failed_path:
+            return False
+
+        try:
+            value = await asyncio.to_thread(self.load, path)
+        except Exception:
+            # 깨지거나 덜 쓰인 파일: 다음 스냅샷이 나올 때까지 다시 시도하지 않는다
+            self._failed_path = path
+            raise
+        self.current = (value, os.path.basename(path))
+        self._path = path
+        logger.info("%s 로드: %s (%s)", self.label, path, self.describe(value))
+        return True
@@ -0,0 +1,27 @@
+# api 모듈은 api/ 를 작업 디렉터리로 두고 실행되므로 (Dockerfile) 테스트도 같은 경로에서 import
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+_API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _API_DIR)
+# 이미지에는 batch 가 search_graph 로 설치돼 있다. 체크아웃에서 돌릴 때는 소스 경로를 쓴다
+sys.path.insert(1, os.path.join(os.path.dirname(_API_DIR), "batch", "src"))
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """드라이버/캐시를 메모리 대역으로 바꾼 main 모듈 (lifespan 없이 TestClient 로 호출)"""
+    import main
+    from cache import LRUTTLCache
+    from fastapi.testclient import TestClient
+
+    from fake_neo4j import FakeGraph
+
+    graph = FakeGraph()
+    monkeypatch.setattr(main, "driver", graph.driver())
+    monkeypatch.setattr(main, "cache", LRUTTLCache(maxsize=1000, ttl=60))
+    monkeypatch.setattr(main, "next_buffer", None)
+    return SimpleNamespace(main=main, graph=graph, client=TestClient(main.app))
@@ -0,0 +1,149 @@
+# tests/fake_neo4j.py
+"""
+API 테스트용 메모리 async Neo4j 드라이버.
+
+쿼리를 해석하지 않고 search_graph.neo4j_client 의 API 쿼리 상수로 동작을 고른다.
+NEXT 이웃 정렬/keyset 조건은 TOP_NEXT_SUBQUERY 와 같은 규칙
+(count 내림차순, 동률은 name 오름차순, (after_count, after_name) 다음부터) 으로 흉내낸다.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from neo4j.exceptions import ServiceUnavailable
+
+from search_graph.neo4j_client import (
+    LIST_NODES,
+    MERGE_NEXT_CLICK,
+    NODE_BY_NAME,
+    NODE_WITH_NEXT,
+    NODES_WITH_NEXT,
+    SCHEMA_STATEMENTS,
+    UNWIND_NEXT_DELTAS,
+    UNWIND_NEXT_DELTAS_RETURN_COUNTS,
+)
+
+
+class FakeResult:
+    def __init__(self, records: List[Dict[str, Any]]):
+        self._records = records
+
+    async def single(self) -> Optional[Dict[str, Any]]:
+        return self._records[0] if self._records else None
+
+    async def data(self) -> List[Dict[str, Any]]:
+        return list(self._records)
+
+    async def consume(self):
+        return None
+
+
+class FakeGraph:
+    def __init__(self):
+        self.keywords = set()
+        self.next: Dict[Tuple[str, str], int] = {}
+        self.schema: List[str] = []
+        self.queries: List[str] = []
+        # 이 횟수만큼 세션 쿼리가 ServiceUnavailable (Neo4j 가 아직 뜨는 중)
+        self.unavailable = 0
+
+    def driver(self) -> "FakeDriver":
+        return FakeDriver(self)
+
+    def add_next(self, from_kw: str, to_kw: str, count: int):
+        self.keywords.update((from_kw, to_kw))
+        self.next[(from_kw, to_kw)] = self.next.get((from_kw, to_kw), 0) + count
+
+    def run(self, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if self.unavailable:
+            self.unavailable -= 1
+            raise ServiceUnavailable("Neo4j 연결 불가")
+        self.queries.append(query)
+
+        if query in SCHEMA_STATEMENTS.values():
+            self.schema.append(query)
+            return []
+        if query == MERGE_NEXT_CLICK:
+            self.add_next(params["from_kw"], params["to_kw"], 1)
+            return [{"count": self.next[(params["from_kw"], params["to_kw"])]}]
+        if query in (UNWIND_NEXT_DELTAS, UNWIND_NEXT_DELTAS_RETURN_COUNTS):
+            for row in params["rows"]:
+                self.add_next(row["from_kw"], row["to_kw"], row["delta"])
+            if query == UNWIND_NEXT_DELTAS:
+                return []
+            return [
+                {
+                    "from_kw": row["from_kw"],
+                    "to_kw": row["to_kw"],
+                    "count": self.next[(row["from_kw"], row["to_kw"])],
+                }
+                for row in params["rows"]
+            ]
+        if query == NODE_WITH_NEXT:
+            if params["name"] not in self.keywords:
+                return []
+            return [{"name": params["name"], "next": self._top_next(params["name"], params)}]
+        if query == NODE_BY_NAME:
+            return [{"name": params["name"]}] if params["name"] in self.keywords else []
+        if query == NODES_WITH_NEXT:
+            return [
+                {
+                    "name": name,
+                    "found": name in self.keywords,
+                    "next": self._top_next(name, params) if name in self.keywords else [],
+                }
+                for name in params["names"]
+            ]
+        if query == LIST_NODES:
+            after = params["after_name"]
+            names = sorted(k for k in self.keywords if after is None or k > after)
+            return [{"name": name} for name in names[: params["limit"]]]
+        raise AssertionError(f"처리하지 않는 쿼리: {query}")
+
+    def _top_next(self, name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        after_count, after_name = params["after_count"], params["after_name"]
+        rows = sorted(
+            ((b, count) for (a, b), count in self.next.items() if a == name),
+            key=lambda row: (-row[1], row[0]),
+        )
+        if after_count is not None:
+            rows = [
+                (b, count)
+                for b, count in rows
+                if count < after_count or (count == after_count and b > after_name)
+            ]
+        return [{"name": b, "count": count} for b, count in rows[: params["limit"]]]
+
+
+class FakeTx:
+    def __init__(self, graph: FakeGraph):
+        self._graph = graph
+
+    async def run(self, query: str, **params):
+        return FakeResult(self._graph.run(query, params))
+
+
+class FakeSession:
+    def __init__(self, graph: FakeGraph):
+        self._graph = graph
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query: str, **params):
+        return FakeResult(self._graph.run(query, params))
+
+    async def execute_write(self, work, *args):
+        return await work(FakeTx(self._graph), *args)
+
+
+class FakeDriver:
+    def __init__(self, graph: FakeGraph):
+        self._graph = graph
+
+    def session(self):
+        return FakeSession(self._graph)
+
+    async def close(self):
+        pass
@@ -0,0 +1,80 @@
+# tests/test_batch_endpoints.py
+"""POST /next/batch, GET /nodes/next"""
+import pytest
+
+CLICKS = [
+    ("치킨", "맥주"),
+    ("치킨", "콜라"),
+    ("치킨", "맥주"),
+    ("맥주", "안주"),
+    ("TERRA ", "카스"),
+    ("terra", "카스"),
+]
+
+
+def test_batch_matches_per_item_next(api):
+    for from_kw, to_kw in CLICKS:
+        api.client.post("/next", json={"from_kw": from_kw, "to_kw": to_kw})
+    expected = dict(api.graph.next)
+
+    api.graph.next.clear()
+    api.graph.keywords.clear()
+    response = api.client.post(
+        "/next/batch", json={"items": [{"from_kw": a, "to_kw": b} for a, b in CLICKS]}
+    ).json()
+
+    assert api.graph.next == expected
+    assert response["count"] == len(CLICKS)
+    # 결과는 items 순서대로, count 는 배치 반영 후 값
+    assert [r["count"] for r in response["results"]] == [2, 1, 2, 1, 2, 2]
+    assert response["results"][4] == {"from": "terra", "to": "카스", "count": 2}
+
+
+def test_batch_reports_empty_keyword_per_item(api):
+    response = api.client.post(
+        "/next/batch",
+        json={"items": [{"from_kw": "치킨", "to_kw": " "}, {"from_kw": "치킨", "to_kw": "맥주"}]},
+    ).json()
+
+    assert response["results"][0] == {"from": "치킨", "to": "", "error": "empty keyword"}
+    assert response["results"][1]["count"] == 1
+    assert api.graph.next == {("치킨", "맥주"): 1}
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{}, {"items": [{"from_kw": "치킨"}]}, {"items": "치킨"}],
+)
+def test_batch_rejects_invalid_payload(api, payload):
+    assert api.client.post("/next/batch", json=payload).status_code == 422
+    assert api.graph.next == {}
+
+
+def test_batch_size_limit(api, monkeypatch):
+    monkeypatch.setattr(api.main, "NEXT_BATCH_MAX_ITEMS", 2)
+    items = [{"from_kw": "치킨", "to_kw": "맥주"}] * 3
+
+    assert api.client.post("/next/batch", json={"items": items}).status_code == 413
+    assert api.graph.next == {}
+
+
+def test_nodes_next_matches_single_lookups(api):
+    api.graph.add_next("치킨", "맥주", 3)
+    api.graph.add_next("치킨", "콜라", 5)
+    api.graph.add_next("맥주", "안주", 1)
+
+    response = api.client.get("/nodes/next?name=치킨&name=없음&name=맥주&name=치킨&limit=1").json()
+
+    assert response["count"] == 4
+    assert response["results"] == [
+        api.client.get("/node/치킨?limit=1").json(),
+        {"found": False, "name": "없음"},
+        api.client.get("/node/맥주?limit=1").json(),
+        api.client.get("/node/치킨?limit=1").json(),
+    ]
+
+
+def test_nodes_next_limits(api, monkeypatch):
+    monkeypatch.setattr(api.main, "NODE_LOOKUP_MAX_NAMES", 2)
+    assert api.client.get("/nodes/next?name=a&name=b&name=c").status_code == 413
+    assert api.client.get("/nodes/next").status_code == 422
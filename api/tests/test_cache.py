@@ -0,0 +1,142 @@
+# tests/test_cache.py
+import asyncio
+
+import pytest
+
+import cache as cache_module
+from cache import LRUTTLCache, NullCache, RedisCache, build_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_hit_and_ttl_expiry(clock):
+    cache = LRUTTLCache(maxsize=10, ttl=30)
+    run(cache.set("k", {"v": 1}, tags=["node:a"]))
+    assert run(cache.get("k")) == {"v": 1}
+
+    clock.now += 31
+    assert run(cache.get("k")) is None
+    # 만료된 엔트리는 tag 목록에서도 빠진다
+    assert cache._tags == {}
+
+
+def test_lru_eviction_keeps_recently_used(clock):
+    cache = LRUTTLCache(maxsize=2, ttl=30)
+    run(cache.set("a", 1))
+    run(cache.set("b", 2))
+    run(cache.get("a"))
+    run(cache.set("c", 3))
+
+    assert run(cache.get("a")) == 1
+    assert run(cache.get("b")) is None
+    assert run(cache.get("c")) == 3
+
+
+def test_invalidate_by_tag(clock):
+    cache = LRUTTLCache(maxsize=10, ttl=30)
+    run(cache.set("node:a:1", 1, tags=["node:a"]))
+    run(cache.set("node:a:2", 2, tags=["node:a"]))
+    run(cache.set("node:b:1", 3, tags=["node:b"]))
+    run(cache.invalidate("node:a"))
+
+    assert run(cache.get("node:a:1")) is None
+    assert run(cache.get("node:a:2")) is None
+    assert run(cache.get("node:b:1")) == 3
+
+
+class FakeRedis:
+    """RedisCache 가 쓰는 명령만 흉내 (TTL 은 무시)"""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def set(self, key, value, px):
+        self.ops.append(lambda: self.redis.values.__setitem__(key, value.encode("utf-8")))
+
+    def sadd(self, key, member):
+        self.ops.append(lambda: self.redis.sets.setdefault(key, set()).add(member))
+
+    def pexpire(self, key, ms):
+        pass
+
+    def delete(self, *keys):
+        def op():
+            for key in keys:
+                self.redis.values.pop(key, None)
+                self.redis.sets.pop(key, None)
+
+        self.ops.append(op)
+
+    async def execute(self):
+        for op in self.ops:
+            op()
+
+
+def test_redis_cache_set_get_invalidate():
+    cache = object.__new__(RedisCache)
+    cache.ttl, cache.prefix, cache._client = 30, "t:", FakeRedis()
+
+    run(cache.set("node:a:1", {"name": "테라"}, tags=["node:a"]))
+    assert run(cache.get("node:a:1")) == {"name": "테라"}
+    run(cache.invalidate("node:a"))
+    assert run(cache.get("node:a:1")) is None
+
+
+def test_build_cache_backend(monkeypatch):
+    monkeypatch.setenv("CACHE_BACKEND", "none")
+    assert isinstance(build_cache(), NullCache)
+    monkeypatch.setenv("CACHE_BACKEND", "memory")
+    monkeypatch.setenv("CACHE_TTL", "5")
+    cache = build_cache()
+    assert isinstance(cache, LRUTTLCache) and cache.ttl == 5
+
+
+def test_post_next_invalidates_cached_node(api):
+    api.graph.add_next("치킨", "맥주", 3)
+    first = api.client.get("/node/치킨").json()
+    assert first["next"] == [{"name": "맥주", "count": 3}]
+    assert api.client.get("/node/콜라").json() == {"found": False, "name": "콜라"}
+
+    # 두 번째 조회는 캐시에서 (Neo4j 쿼리 없음)
+    queries = len(api.graph.queries)
+    assert api.client.get("/node/치킨").json() == first
+    assert len(api.graph.queries) == queries
+
+    api.client.post("/next", json={"from_kw": "치킨", "to_kw": "콜라"})
+    after = api.client.get("/node/치킨").json()
+    assert after["next"] == [{"name": "맥주", "count": 3}, {"name": "콜라", "count": 1}]
+    # to 쪽 키워드(새로 생긴 노드)의 캐시된 "없음" 응답도 무효화
+    assert api.client.get("/node/콜라").json()["found"] is True
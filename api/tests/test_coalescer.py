@@ -0,0 +1,111 @@
+# tests/test_coalescer.py
+import asyncio
+from collections import Counter
+
+from coalescer import NextWriteBuffer
+
+
+class FakeTx:
+    def __init__(self, store):
+        self._store = store
+
+    async def run(self, query, rows):
+        await self._store.gate.wait()
+        self._store.staged.append(rows)
+        return self
+
+    async def consume(self):
+        return None
+
+
+class FakeSession:
+    def __init__(self, store):
+        self._store = store
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute_write(self, work, rows):
+        self._store.started.set()
+        self._store.staged = []
+        await work(FakeTx(self._store), rows)
+        # 트랜잭션 함수가 끝까지 실행됐을 때만 커밋
+        for staged in self._store.staged:
+            for row in staged:
+                self._store.counts[(row["from_kw"], row["to_kw"])] += row["delta"]
+
+
+class FakeDriver:
+    def __init__(self):
+        self.counts = Counter()
+        self.staged = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.started = asyncio.Event()
+
+    def session(self):
+        return FakeSession(self)
+
+
+def test_stop_waits_for_in_flight_flush():
+    async def run():
+        driver = FakeDriver()
+        driver.gate.clear()
+        buffer = NextWriteBuffer(driver, max_staleness=60, max_pending=1)
+        await buffer.start()
+        buffer.add("테라", "카스")
+        await driver.started.wait()  # 주기 flush 가 트랜잭션 안에서 멈춰 있다
+
+        stopping = asyncio.create_task(buffer.stop())
+        await asyncio.sleep(0)
+        buffer.add("테라", "카스")
+        driver.gate.set()
+        await stopping
+        return driver, buffer
+
+    driver, buffer = asyncio.run(run())
+    assert driver.counts == {("테라", "카스"): 2}
+    assert buffer.depth == 0
+    assert buffer.flush_errors == 0
+
+
+def test_cancelled_flush_restores_pending_deltas():
+    async def run():
+        driver = FakeDriver()
+        driver.gate.clear()
+        buffer = NextWriteBuffer(driver)
+        buffer.add("테라", "카스", 3)
+
+        flushing = asyncio.create_task(buffer.flush())
+        await driver.started.wait()
+        flushing.cancel()
+        try:
+            await flushing
+        except asyncio.CancelledError:
+            pass
+        assert driver.counts == {}
+        assert buffer.depth == 1
+
+        driver.gate.set()
+        await buffer.stop()
+        return driver
+
+    driver = asyncio.run(run())
+    assert driver.counts == {("테라", "카스"): 3}
+
+
+def test_stop_flushes_remaining_buffer():
+    async def run():
+        driver = FakeDriver()
+        buffer = NextWriteBuffer(driver, max_staleness=60)
+        await buffer.start()
+        buffer.add("테라", "카스")
+        buffer.add("카스", "맥주")
+        await buffer.stop()
+        return driver
+
+    driver = asyncio.run(run())
+    assert driver.counts == {("테라", "카스"): 1, ("카스", "맥주"): 1}
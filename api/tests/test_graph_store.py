@@ -0,0 +1,72 @@
+# tests/test_graph_store.py
+import asyncio
+import os
+
+from search_graph.csr_graph import build_csr, personalized_pagerank, write_graph
+from search_graph.recommend_snapshot import _write_latest
+
+from graph_store import GraphStore
+
+
+def _load(tmp_path, edges):
+    write_graph(str(tmp_path), build_csr(iter(edges)))
+    store = GraphStore(str(tmp_path))
+    asyncio.run(store.reload())
+    return store
+
+
+def test_reload_swaps_graph_and_version_together(tmp_path):
+    store = _load(tmp_path, [("치킨", "맥주", 3)])
+    first_graph, first_version = store.current
+    assert first_version.startswith("graph-")
+
+    path = write_graph(str(tmp_path), build_csr(iter([("치킨", "콜라", 1)])))
+    assert asyncio.run(store.reload()) is True
+
+    graph, version = store.current
+    assert graph is not first_graph
+    assert version == os.path.basename(path) != first_version
+    assert "콜라" in graph.index
+
+
+def test_corrupt_graph_keeps_previous(tmp_path):
+    store = _load(tmp_path, [("치킨", "맥주", 3)])
+    previous = store.current
+
+    (tmp_path / "graph-99999999T999999999999Z.npz").write_bytes(b"truncated")
+    _write_latest(str(tmp_path), "graph-99999999T999999999999Z.npz")
+    try:
+        asyncio.run(store.reload())
+    except Exception:
+        pass
+
+    assert store.current is previous
+    assert asyncio.run(store.reload()) is False
+
+
+def test_multihop_version_matches_graph_used(api, monkeypatch, tmp_path):
+    old_dir, new_dir = tmp_path / "old", tmp_path / "new"
+    old_store = _load(old_dir, [("치킨", "맥주", 3), ("맥주", "안주", 1)])
+    new_store = _load(new_dir, [("치킨", "콜라", 1)])
+    monkeypatch.setattr(api.main, "graph_store", old_store)
+
+    def swap_during_walk(graph, seeds, alpha):
+        # to_thread 로 계산하는 동안 리로드가 일어난 상황
+        old_store.current = new_store.current
+        return personalized_pagerank(graph, seeds, alpha)
+
+    monkeypatch.setattr(api.main, "personalized_pagerank", swap_during_walk)
+    old_version = old_store.current[1]
+
+    body = api.client.get("/recommend/multihop/치킨").json()
+
+    assert body["version"] == old_version
+    assert {r["name"] for r in body["results"]} == {"맥주", "안주"}
+
+
+def test_multihop_without_graph_is_503(api, monkeypatch, tmp_path):
+    monkeypatch.setattr(api.main, "graph_store", GraphStore(str(tmp_path)))
+
+    assert api.client.get("/recommend/multihop/치킨").status_code == 503
+    assert api.client.get("/path", params={"from": "a", "to": "b"}).status_code == 503
+
@@ -0,0 +1,92 @@
+# tests/test_pagination.py
+"""GET /node/{name}, GET /nodes keyset 커서"""
+import base64
+import json
+
+import pytest
+
+
+def _pages(client, path, params):
+    """next_cursor 가 None 이 될 때까지 따라가며 응답을 모은다"""
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get(path, params=query)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = pages[-1]["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def _raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+
+def test_node_next_pages_have_no_duplicates_or_gaps(api):
+    # 동률 count 가 페이지 경계에 걸치도록 3 개씩 같은 값
+    for i in range(20):
+        api.graph.add_next("치킨", f"kw{i:02d}", 5 - i // 3)
+    expected = sorted(
+        ({"name": b, "count": c} for (a, b), c in api.graph.next.items() if a == "치킨"),
+        key=lambda row: (-row["count"], row["name"]),
+    )
+
+    pages = _pages(api.client, "/node/치킨", {"limit": 4})
+
+    collected = [row for page in pages for row in page["next"]]
+    assert collected == expected
+    assert all(len(page["next"]) <= 4 for page in pages)
+
+
+def test_node_next_exact_multiple_ends_with_empty_page(api):
+    for i in range(8):
+        api.graph.add_next("치킨", f"kw{i}", 1)
+
+    pages = _pages(api.client, "/node/치킨", {"limit": 4})
+
+    assert [len(page["next"]) for page in pages] == [4, 4, 0]
+
+
+def test_nodes_pages_have_no_duplicates_or_gaps(api):
+    names = [f"키워드{i:03d}" for i in range(25)] + ["a:b", "z"]
+    api.graph.keywords.update(names)
+
+    pages = _pages(api.client, "/nodes", {"limit": 7})
+
+    collected = [name for page in pages for name in page["nodes"]]
+    assert collected == sorted(names)
+    assert [page["count"] for page in pages] == [len(page["nodes"]) for page in pages]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "%%%",
+        "bm90LWpzb24",  # base64("not-json")
+        _raw_cursor("치킨"),
+        _raw_cursor([3]),
+        _raw_cursor(["3", "치킨"]),
+        _raw_cursor([3, 4]),
+        _raw_cursor({"count": 3, "name": "치킨"}),
+    ],
+)
+def test_node_invalid_cursor_is_400(api, cursor):
+    api.graph.add_next("치킨", "맥주", 1)
+
+    response = api.client.get("/node/치킨", params={"cursor": cursor})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["%%%", "bm90LWpzb24", _raw_cursor([3, "치킨"]), _raw_cursor(3), _raw_cursor(None)],
+)
+def test_nodes_invalid_cursor_is_400(api, cursor):
+    api.graph.keywords.add("치킨")
+
+    response = api.client.get("/nodes", params={"cursor": cursor})
+
+    assert response.status_code == 400
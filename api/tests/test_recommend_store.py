@@ -0,0 +1,81 @@
+# tests/test_recommend_store.py
+import asyncio
+import gzip
+
+from search_graph.recommend_snapshot import _write_latest, write_snapshot
+
+import recommend_store
+from recommend_store import RecommendStore
+
+
+def _write_corrupt(snapshot_dir, name="recommend-99999999T999999999999Z.json.gz"):
+    # 덜 쓰인 gzip: 헤더만 있고 본문이 잘림
+    body = gzip.compress(b'{"format_version": 1, "version": "x", "items": {"a": ')
+    (snapshot_dir / name).write_bytes(body[: len(body) // 2])
+    _write_latest(str(snapshot_dir), name)
+    return str(snapshot_dir / name)
+
+
+def test_write_load_and_hot_reload(tmp_path):
+    write_snapshot(str(tmp_path), iter([("치킨", [("맥주", 3)], [])]), top_n=10)
+    store = RecommendStore(str(tmp_path), reload_interval=0.01)
+
+    async def run():
+        await store.start()
+        first = store.snapshot
+        write_snapshot(str(tmp_path), iter([("치킨", [("콜라", 7)], [])]), top_n=10)
+        for _ in range(100):
+            if store.snapshot is not first:
+                break
+            await asyncio.sleep(0.01)
+        await store.stop()
+        return first
+
+    first = asyncio.run(run())
+
+    assert first.items["치킨"]["next"] == [("맥주", 3)]
+    assert store.snapshot.items["치킨"]["next"] == [("콜라", 7)]
+    assert store.snapshot.version != first.version
+
+
+def test_start_with_corrupt_snapshot_serves_empty(tmp_path):
+    _write_corrupt(tmp_path)
+    store = RecommendStore(str(tmp_path), reload_interval=60)
+
+    async def run():
+        await store.start()
+        await store.stop()
+
+    asyncio.run(run())
+
+    assert store.snapshot is None
+
+
+def test_corrupt_snapshot_keeps_previous_and_is_not_retried(tmp_path, monkeypatch):
+    write_snapshot(str(tmp_path), iter([("치킨", [("맥주", 3)], [])]), top_n=10)
+    store = RecommendStore(str(tmp_path))
+
+    async def run():
+        await store.reload()
+        previous = store.snapshot
+        _write_corrupt(tmp_path)
+        try:
+            await store.reload()
+        except Exception:
+            pass
+        return previous
+
+    previous = asyncio.run(run())
+    assert store.snapshot is previous
+
+    # 같은 깨진 파일은 다시 읽지 않는다
+    loads = []
+    monkeypatch.setattr(recommend_store, "load_snapshot", lambda path: loads.append(path))
+    assert asyncio.run(store.reload()) is False
+    assert loads == []
+
+    # 새 스냅샷이 나오면 정상 교체
+    monkeypatch.undo()
+    write_snapshot(str(tmp_path), iter([("치킨", [("콜라", 1)], [])]), top_n=10)
+    assert asyncio.run(store.reload()) is True
+    assert store.snapshot.items["치킨"]["next"] == [("콜라", 1)]
@@ -0,0 +1,41 @@
+# tests/test_schema.py
+import asyncio
+
+import search_graph.neo4j_client as nc
+from search_graph.neo4j_client import SCHEMA_STATEMENTS
+
+
+def test_schema_waits_for_neo4j(api, monkeypatch):
+    # Neo4j 가 아직 뜨는 중이라 처음 두 번은 ServiceUnavailable
+    api.graph.unavailable = 2
+    delays = []
+
+    async def no_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(api.main.asyncio, "sleep", no_sleep)
+    asyncio.run(api.main.ensure_schema())
+
+    assert delays == [nc.schema_retry_delay(1), nc.schema_retry_delay(2)]
+    assert api.graph.schema == list(SCHEMA_STATEMENTS.values())
+
+
+def test_schema_gives_up_without_raising(api, monkeypatch):
+    api.graph.unavailable = 100
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(api.main.asyncio, "sleep", no_sleep)
+    asyncio.run(api.main.ensure_schema())
+    assert api.graph.schema == []
+
+
+def test_startup_does_not_wait_for_neo4j(api, monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    api.graph.unavailable = 100
+    monkeypatch.setattr(api.main.recommend_store, "snapshot_dir", str(tmp_path))
+    monkeypatch.setattr(api.main.graph_store, "snapshot_dir", str(tmp_path))
+    with TestClient(api.main.app) as client:
+        assert client.get("/metrics/next-buffer").json() == {"enabled": False}
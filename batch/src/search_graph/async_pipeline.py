@@ -0,0 +1,293 @@
+# src/search_graph/async_pipeline.py
+"""
+PCID 리스트 처리를 asyncio 파이프라인으로 (process_all_pcids 의 pipeline 모드).
+
+동기 버전은 PCID 마다 ES 조회 → 전이 계산 → Neo4j 적재를 차례로 하므로
+한쪽 네트워크를 기다리는 동안 다른 쪽은 놀고, 처리량이 두 지연의 합에 묶인다.
+여기서는 세 단계를 큐로 이어 동시에 돌려서 처리량이 느린 쪽 백엔드에 묶이게 한다.
+
+    pcid 큐 ─▶ fetcher × N ─▶ seq 큐(bounded) ─▶ transformer × M ─▶ write 큐(bounded) ─▶ writer × K
+               (AsyncElasticsearch)               (process_hits,                      (AsyncNeo4jBatchWriter)
+                                                   스레드에서 실행)
+
+- backpressure: 단계 사이 큐는 queue_size 로 크기가 정해져 있어, 뒤 단계가 밀리면
+  앞 단계의 put 이 기다린다 (메모리에 쌓이는 시퀀스 수 ≤ 2 × queue_size + 작업 중인 수).
+  fetcher 는 PCID 시퀀스를 통째로 받으므로(search_all) 메모리 상한은
+  (2 × queue_size + fetchers + transformers + writers) × 가장 긴 시퀀스 크기다.
+  단계별로 put 을 기다린 시간을 로그에 남겨 어느 쪽이 병목인지 보이게 한다.
+- 체크포인트: writer 마다 자기 배치 writer 를 두고, flush 가 끝난 PCID 만 완료로 기록한다
+  (동기 버전과 같이 flush 트랜잭션에 AppliedBatch 를 남기고 FAIL_NEXT 후보도 함께 저장).
+- 한 단계에서 예외가 나면 나머지 작업을 모두 취소하고 예외를 그대로 올린다.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from .edge_accumulator import EdgeAccumulator
+from .fail_pairs import FailPairAggregator
+from .hit_cache import HitCache
+
+if TYPE_CHECKING:
+    from .search_log_processor import SearchLogProcessor
+
+logger = logging.getLogger(__name__)
+
+# 단계 종료 표시
+_DONE = None
+
+
+@dataclass
+class PipelineConfig:
+    fetchers: int = 8  # 동시 ES 조회 수
+    transformers: int = 2  # 동시 전이 계산 수
+    writers: int = 2  # 동시 Neo4j 적재 수 (writer 마다 배치 버퍼 하나)
+    queue_size: int = 64  # 단계 사이 큐 최대 길이 (PCID 시퀀스 단위)
+
+
+@dataclass
+class PipelineStats:
+    pcids: int = 0
+    hits: int = 0
+    transformed: int = 0
+    written: int = 0
+    # 다음 단계 큐가 가득 차서 put 을 기다린 시간(초) 합계
+    fetch_blocked: float = 0.0
+    transform_blocked: float = 0.0
+    max_seq_queue: int = 0
+    max_write_queue: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def log(self):
+        elapsed = time.monotonic() - self.started
+        logger.info(
+            "async 파이프라인 완료: pcids=%d, hits=%d, written=%d, elapsed=%.1fs (%.1f pcid/s)",
+            self.pcids,
+            self.hits,
+            self.written,
+            elapsed,
+            self.written / elapsed if elapsed else 0.0,
+        )
+        logger.info(
+            "async 파이프라인 backpressure: fetch 대기=%.1fs, transform 대기=%.1fs, "
+            "seq 큐 최대=%d, write 큐 최대=%d",
+            self.fetch_blocked,
+            self.transform_blocked,
+            self.max_seq_queue,
+            self.max_write_queue,
+        )
+
+
+class AsyncPcidPipeline:
+    def __init__(self, processor: "SearchLogProcessor", config: Optional[PipelineConfig] = None):
+        self.processor = processor
+        self.config = config or PipelineConfig()
+        for name in ("fetchers", "transformers", "writers", "queue_size"):
+            if getattr(self.config, name) < 1:
+                raise ValueError(f"{name} 는 1 이상이어야 합니다.")
+
+    def run(
+        self,
+        pcids: List[str],
+        gte: str,
+        lte: str,
+        size: int,
+        range_key: str,
+        exclusive_start: bool,
+        total_fail_pairs: FailPairAggregator,
+        applied: Optional[Dict[str, Set[str]]] = None,
+    ) -> PipelineStats:
+        """이벤트 루프를 새로 띄워 파이프라인을 끝까지 실행한다 (동기 호출용)"""
+        return asyncio.run(
+            self._run(pcids, gte, lte, size, range_key, exclusive_start, total_fail_pairs, applied)
+        )
+
+    async def _run(
+        self,
+        pcids: List[str],
+        gte: str,
+        lte: str,
+        size: int,
+        range_key: str,
+        exclusive_start: bool,
+        total_fail_pairs: FailPairAggregator,
+        applied: Optional[Dict[str, Set[str]]],
+    ) -> PipelineStats:
+        cfg = self.config
+        stats = PipelineStats()
+
+        pcid_queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        for pcid in pcids:
+            pcid_queue.put_nowait(pcid)
+        for _ in range(cfg.fetchers):
+            pcid_queue.put_nowait(_DONE)
+
+        seq_queue: "asyncio.Queue[Optional[Tuple[str, List[Dict[str, Any]]]]]" = asyncio.Queue(
+            maxsize=cfg.queue_size
+        )
+        write_queue: "asyncio.Queue[Optional[Tuple[str, EdgeAccumulator]]]" = asyncio.Queue(
+            maxsize=cfg.queue_size
+        )
+
+        es = self.processor.es.async_service()
+        driver = self.processor.neo.async_driver()
+        logger.info(
+            "async 파이프라인 시작: pcids=%d, fetchers=%d, transformers=%d, writers=%d, queue_size=%d",
+            len(pcids),
+            cfg.fetchers,
+            cfg.transformers,
+            cfg.writers,
+            cfg.queue_size,
+        )
+
+        stages = [
+            asyncio.create_task(
+                self._stage(
+                    [
+                        self._fetch(es, pcid_queue, seq_queue, gte, lte, size, exclusive_start, stats)
+                        for _ in range(cfg.fetchers)
+                    ],
+                    seq_queue,
+                    cfg.transformers,
+                )
+            ),
+            asyncio.create_task(
+                self._stage(
+                    [
+                        self._transform(seq_queue, write_queue, total_fail_pairs, stats)
+                        for _ in range(cfg.transformers)
+                    ],
+                    write_queue,
+                    cfg.writers,
+                )
+            ),
+            asyncio.create_task(
+                self._stage(
+                    [
+                        self._write(driver, write_queue, range_key, applied, stats)
+                        for _ in range(cfg.writers)
+                    ]
+                )
+            ),
+        ]
+
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            for task in stages:
+                task.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            raise
+        finally:
+            await es.close()
+            await driver.close()
+
+        stats.log()
+        return stats
+
+    @staticmethod
+    async def _stage(workers, next_queue: Optional[asyncio.Queue] = None, next_workers: int = 0):
+        """단계의 워커가 모두 끝나면 다음 단계 워커 수만큼 종료 표시를 넣는다"""
+        await asyncio.gather(*workers)
+        for _ in range(next_workers):
+            await next_queue.put(_DONE)
+
+    async def _fetch(
+        self,
+        es,
+        pcid_queue: asyncio.Queue,
+        seq_queue: asyncio.Queue,
+        gte: str,
+        lte: str,
+        size: int,
+        exclusive_start: bool,
+        stats: PipelineStats,
+    ):
+        processor = self.processor
+        hit_cache = processor.hit_cache
+
+        while True:
+            pcid = await pcid_queue.get()
+            if pcid is _DONE:
+                return
+
+            body = processor._pcid_query_body(pcid, gte, lte, exclusive_start)
+            hits = None
+            if hit_cache is not None:
+                key = HitCache.make_key(processor.index_name, pcid, gte, lte, body)
+                hits = await asyncio.to_thread(hit_cache.get, key)
+            if hits is None:
+                hits = await es.search_all(
+                    processor.index_name, body, page_size=size, try_single_page=True
+                )
+                if hit_cache is not None:
+                    await asyncio.to_thread(hit_cache.put, key, hits)
+
+            stats.pcids += 1
+            stats.hits += len(hits)
+
+            blocked = time.monotonic()
+            await seq_queue.put((pcid, hits))
+            stats.fetch_blocked += time.monotonic() - blocked
+            stats.max_seq_queue = max(stats.max_seq_queue, seq_queue.qsize())
+
+    async def _transform(
+        self,
+        seq_queue: asyncio.Queue,
+        write_queue: asyncio.Queue,
+        total_fail_pairs: FailPairAggregator,
+        stats: PipelineStats,
+    ):
+        while True:
+            item = await seq_queue.get()
+            if item is _DONE:
+                return
+
+            pcid, hits = item
+            # CPU 작업이라 이벤트 루프(네트워크 I/O)를 막지 않도록 스레드에서
+            acc = await asyncio.to_thread(self._transform_sequence, pcid, hits, total_fail_pairs)
+            stats.transformed += 1
+
+            blocked = time.monotonic()
+            await write_queue.put((pcid, acc))
+            stats.transform_blocked += time.monotonic() - blocked
+            stats.max_write_queue = max(stats.max_write_queue, write_queue.qsize())
+
+    def _transform_sequence(
+        self, pcid: str, hits: List[Dict[str, Any]], total_fail_pairs: FailPairAggregator
+    ) -> EdgeAccumulator:
+        acc = EdgeAccumulator()
+        fail_pairs = self.processor.process_hits(hits, writer=acc)
+        total_fail_pairs.update(fail_pairs)
+        self.processor._remember_fail_pairs(pcid, fail_pairs)
+        return acc
+
+    async def _write(
+        self,
+        driver,
+        write_queue: asyncio.Queue,
+        range_key: str,
+        applied: Optional[Dict[str, Set[str]]],
+        stats: PipelineStats,
+    ):
+        processor = self.processor
+        writer = processor.neo.async_batch_writer(
+            driver, token_scope=processor._token_scope("pcids", range_key), applied=applied
+        )
+        if processor.checkpoint is not None:
+            writer.add_flush_listener(lambda pcids: processor._complete_pcids(range_key, pcids))
+
+        while True:
+            item = await write_queue.get()
+            if item is _DONE:
+                break
+
+            pcid, acc = item
+            # PCID 단위로 합치므로 flush 는 항상 PCID 경계 (체크포인트 완료 기록 단위)
+            writer.merge(acc, token=pcid)
+            await writer.maybe_flush()
+            stats.written += 1
+
+        # 남은 버퍼 flush
+        await writer.close()
@@ -0,0 +1,97 @@
+# src/search_graph/bulk_import.py
+"""
+neo4j-admin database import 용 CSV 생성 (전체 재구축).
+
+파일 구성 (<output_dir>/)
+    keywords.csv   : name:ID(Keyword), :LABEL
+    next.csv       : :START_ID(Keyword), :END_ID(Keyword), count:long, :TYPE
+    fail_next.csv  : :START_ID(Keyword), :END_ID(Keyword), count:long, first_seen, last_seen, :TYPE
+
+모든 필드는 큰따옴표로 감싸고(내부 따옴표는 두 번) 키워드에 줄바꿈이 있어도
+--multiline-fields=true 로 읽을 수 있게 한다.
+"""
+import csv
+import logging
+import os
+from contextlib import contextmanager
+from typing import Dict
+
+from .edge_accumulator import EdgeAccumulator
+
+logger = logging.getLogger(__name__)
+
+KEYWORDS_FILE = "keywords.csv"
+NEXT_FILE = "next.csv"
+FAIL_NEXT_FILE = "fail_next.csv"
+
+
+def write_import_csvs(acc: EdgeAccumulator, output_dir: str) -> Dict[str, str]:
+    """누적된 노드/간선을 import CSV 로 쓰고 {종류: 경로} 를 반환"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        "keywords": os.path.join(output_dir, KEYWORDS_FILE),
+        "next": os.path.join(output_dir, NEXT_FILE),
+        "fail_next": os.path.join(output_dir, FAIL_NEXT_FILE),
+    }
+
+    # 간선 끝점이 모두 노드 파일에 있어야 import 가 실패하지 않는다
+    keywords = set(acc.keywords)
+    for a, b in acc.next_counts:
+        keywords.add(a)
+        keywords.add(b)
+    for a, b in acc.fail_counts:
+        keywords.add(a)
+        keywords.add(b)
+
+    with _open_csv(paths["keywords"]) as writer:
+        writer.writerow(["name:ID(Keyword)", ":LABEL"])
+        for name in keywords:
+            writer.writerow([name, "Keyword"])
+
+    with _open_csv(paths["next"]) as writer:
+        writer.writerow([":START_ID(Keyword)", ":END_ID(Keyword)", "count:long", ":TYPE"])
+        for (a, b), count in acc.next_counts.items():
+            writer.writerow([a, b, count, "NEXT"])
+
+    with _open_csv(paths["fail_next"]) as writer:
+        writer.writerow(
+            [":START_ID(Keyword)", ":END_ID(Keyword)", "count:long", "first_seen", "last_seen", ":TYPE"]
+        )
+        for edge, count in acc.fail_counts.items():
+            a, b = edge
+            writer.writerow(
+                [a, b, count, acc.fail_first_seen[edge], acc.fail_last_seen[edge], "FAIL_NEXT"]
+            )
+
+    logger.info(
+        "import CSV 저장: %s (keywords=%d, next=%d, fail_next=%d)",
+        output_dir,
+        len(keywords),
+        len(acc.next_counts),
+        len(acc.fail_counts),
+    )
+    return paths
+
+
+def import_command(paths: Dict[str, str], database: str = "neo4j") -> str:
+    """
+    생성한 CSV 로 오프라인 적재하는 neo4j-admin 명령 (DB 를 멈춘 상태에서 실행)
+
+    import 는 제약조건/인덱스를 만들지 않는다. 적재 후 DB 를 띄우고
+    Neo4j 에 연결하는 모드(schema 제외)나 API 를 한 번 실행해야 SCHEMA_STATEMENTS 가 생성되며,
+    빠진 것이 없는지는 schema 모드(`search-graph schema`)로 확인한다. 그 전까지는 Keyword.name 조회가 전체 스캔이다.
+    """
+    return (
+        f"neo4j-admin database import full {database} --overwrite-destination "
+        f"--multiline-fields=true "
+        f"--nodes={paths['keywords']} "
+        f"--relationships={paths['next']} "
+        f"--relationships={paths['fail_next']}"
+    )
+
+
+@contextmanager
+def _open_csv(path: str):
+    """QUOTE_ALL csv.writer 로 파일을 연다"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        yield csv.writer(f, quoting=csv.QUOTE_ALL)
@@ -0,0 +1,273 @@
+# src/search_graph/checkpoint.py
+import logging
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Iterator, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """
+    배치 적재 진행 상황을 SQLite 파일에 저장한다.
+
+    - watermarks     : scope(인덱스) 별로 마지막으로 완료된 created_date_time
+    - completed_pcids: 기간(range_key) 별로 적재가 끝난 PCID 목록
+    - range_progress : 기간 단일 패스에서 마지막으로 적재가 끝난 PCID
+                       (user_pcid 순 스트림이므로 이 값 이후부터 재개)
+    - fail_pair_counts: 기간 별로 적재가 끝난 PCID 들의 FAIL_NEXT 후보 수 합계
+                       (완료 기록과 같은 트랜잭션에 더해 두고, 재개 시 CSV 집계를 여기서부터 이어간다)
+    - completed_ranges: 기간 단일 패스가 끝난 기간 (같은 기간을 다시 적재하지 않는다)
+    - pinned_windows : --since-checkpoint 실행의 기간 끝(lte). 같은 watermark 에서 다시 실행하면
+                       (중단 후 재시도) 같은 lte → 같은 range_key 로 재개한다
+    """
+
+    def __init__(self, path: str):
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS watermarks (
+                scope TEXT PRIMARY KEY,
+                created_date_time TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS completed_pcids (
+                range_key TEXT NOT NULL,
+                pcid TEXT NOT NULL,
+                completed_at TEXT NOT NULL,
+                PRIMARY KEY (range_key, pcid)
+            );
+            CREATE TABLE IF NOT EXISTS range_progress (
+                range_key TEXT PRIMARY KEY,
+                last_pcid TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS fail_pair_counts (
+                range_key TEXT NOT NULL,
+                from_kw TEXT NOT NULL,
+                to_kw TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (range_key, from_kw, to_kw)
+            );
+            CREATE TABLE IF NOT EXISTS completed_ranges (
+                range_key TEXT PRIMARY KEY,
+                completed_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pinned_windows (
+                scope TEXT PRIMARY KEY,
+                gte TEXT NOT NULL,
+                lte TEXT NOT NULL,
+                pinned_at TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+        logger.info("체크포인트 저장소 열기: %s", path)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def range_key(gte: str, lte: str) -> str:
+        return f"{gte}~{lte}"
+
+    # ---------------------------------------------------------
+    # watermark
+    # ---------------------------------------------------------
+    def get_watermark(self, scope: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_date_time FROM watermarks WHERE scope = ?",
+                (scope,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, scope: str, created_date_time: str):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO watermarks (scope, created_date_time, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(scope) DO UPDATE SET
+                  created_date_time = excluded.created_date_time,
+                  updated_at = excluded.updated_at
+                """,
+                (scope, created_date_time, _now()),
+            )
+            self._conn.commit()
+        logger.info("watermark 갱신: scope=%s, created_date_time=%s", scope, created_date_time)
+
+    def pin_window(self, scope: str, gte: str, lte: str) -> str:
+        """
+        증분 실행 기간의 끝을 고정하고 실제로 쓸 lte 를 반환한다.
+        같은 scope 에 같은 gte(watermark) 로 고정된 기간이 있으면 (이전 실행이 끝나지 않았으면)
+        새 lte 대신 그 lte 를 돌려준다. watermark 가 옮겨지면 complete_range 가 고정을 푼다.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT gte, lte FROM pinned_windows WHERE scope = ?",
+                (scope,),
+            ).fetchone()
+            if row is not None and row[0] == gte:
+                return row[1]
+            self._conn.execute(
+                """
+                INSERT INTO pinned_windows (scope, gte, lte, pinned_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(scope) DO UPDATE SET
+                  gte = excluded.gte,
+                  lte = excluded.lte,
+                  pinned_at = excluded.pinned_at
+                """,
+                (scope, gte, lte, _now()),
+            )
+            self._conn.commit()
+        return lte
+
+    # ---------------------------------------------------------
+    # PCID 단위 완료 기록
+    # ---------------------------------------------------------
+    def completed_pcids(self, range_key: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT pcid FROM completed_pcids WHERE range_key = ?",
+                (range_key,),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_completed(
+        self,
+        range_key: str,
+        pcids: Iterable[str],
+        fail_pairs: Optional[Mapping[Tuple[str, str], int]] = None,
+    ):
+        """PCID 들을 완료로 기록하고 그 PCID 들의 FAIL_NEXT 후보 수를 같은 트랜잭션에 더한다"""
+        now = _now()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO completed_pcids (range_key, pcid, completed_at) VALUES (?, ?, ?)",
+                [(range_key, pcid, now) for pcid in pcids],
+            )
+            self._add_fail_pairs(range_key, fail_pairs)
+            self._conn.commit()
+
+    # ---------------------------------------------------------
+    # 기간 단일 패스 진행 위치
+    # ---------------------------------------------------------
+    def get_progress(self, range_key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_pcid FROM range_progress WHERE range_key = ?",
+                (range_key,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_progress(
+        self,
+        range_key: str,
+        last_pcid: str,
+        fail_pairs: Optional[Mapping[Tuple[str, str], int]] = None,
+    ):
+        """진행 위치를 옮기고 그 사이 PCID 들의 FAIL_NEXT 후보 수를 같은 트랜잭션에 더한다"""
+        with self._lock:
+            self._add_fail_pairs(range_key, fail_pairs)
+            self._conn.execute(
+                """
+                INSERT INTO range_progress (range_key, last_pcid, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(range_key) DO UPDATE SET
+                  last_pcid = excluded.last_pcid,
+                  updated_at = excluded.updated_at
+                """,
+                (range_key, last_pcid, _now()),
+            )
+            self._conn.commit()
+
+    def clear_progress(self, range_key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM range_progress WHERE range_key = ?", (range_key,))
+            self._conn.commit()
+
+    def is_range_completed(self, range_key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM completed_ranges WHERE range_key = ?",
+                (range_key,),
+            ).fetchone()
+        return row is not None
+
+    def complete_range(self, range_key: str, scope: str, lte: str):
+        """
+        기간 단일 패스 완료를 한 트랜잭션으로 기록한다:
+        완료 표시 + watermark(lte) 갱신 + 진행 위치/FAIL_NEXT 후보 삭제 + 고정 기간 해제
+        (watermark 는 뒤로 가지 않는다: 뒤로 가면 다음 증분 실행이 적재한 구간을 다시 읽는다)
+        """
+        now = _now()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO completed_ranges (range_key, completed_at) VALUES (?, ?)",
+                (range_key, now),
+            )
+            self._conn.execute(
+                """
+                INSERT INTO watermarks (scope, created_date_time, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(scope) DO UPDATE SET
+                  created_date_time = MAX(created_date_time, excluded.created_date_time),
+                  updated_at = excluded.updated_at
+                """,
+                (scope, lte, now),
+            )
+            self._conn.execute("DELETE FROM range_progress WHERE range_key = ?", (range_key,))
+            self._conn.execute("DELETE FROM fail_pair_counts WHERE range_key = ?", (range_key,))
+            self._conn.execute("DELETE FROM pinned_windows WHERE scope = ?", (scope,))
+            self._conn.commit()
+        logger.info("기간 완료 기록: range=%s, watermark=%s", range_key, lte)
+
+    # ---------------------------------------------------------
+    # 완료된 PCID 들의 FAIL_NEXT 후보 수
+    # ---------------------------------------------------------
+    def _add_fail_pairs(
+        self, range_key: str, fail_pairs: Optional[Mapping[Tuple[str, str], int]]
+    ):
+        if not fail_pairs:
+            return
+        self._conn.executemany(
+            """
+            INSERT INTO fail_pair_counts (range_key, from_kw, to_kw, count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(range_key, from_kw, to_kw) DO UPDATE SET
+              count = count + excluded.count
+            """,
+            [(range_key, a, b, count) for (a, b), count in fail_pairs.items()],
+        )
+
+    def iter_fail_pairs(
+        self, range_key: str, chunk_size: int = 100_000
+    ) -> Iterator[Counter]:
+        """기록된 FAIL_NEXT 후보 수를 chunk_size 쌍씩 Counter 로 읽는다"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT from_kw, to_kw, count FROM fail_pair_counts WHERE range_key = ?",
+                (range_key,),
+            )
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield Counter({(a, b): count for a, b, count in rows})
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
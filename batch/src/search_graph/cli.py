@@ -1,15 +1,34 @@
 # src/search_graph/cli.py
 import argparse
 import logging
+from datetime import datetime, timedelta
 
+from .async_pipeline import PipelineConfig
+from .bulk_import import import_command
+from .checkpoint import CheckpointStore
 from .config import load_config
 from .logging_config import setup_logging
 from .es_client import ElasticsearchService
-from .neo4j_client import Neo4jService
+from .fail_pairs import AGGREGATOR_KINDS, make_fail_pair_aggregator
+from .hit_cache import MAX_CACHED_HITS, HitCache
+from .normalize import KeywordNormalizer
+from .neo4j_client import SCAN_OPERATORS, Neo4jService
+from .recommend_snapshot import latest_snapshot_path, write_snapshot
 from .search_log_processor import SearchLogProcessor
+from .sources import FileEventSource, write_ndjson
 
 logger = logging.getLogger(__name__)
 
+# 🔹 기간 기본값 (테스트용 한 달) - --gte / --lte 로 덮어쓸 수 있음
+DEFAULT_GTE = "2024-12-01T00:00:00.000"
+DEFAULT_LTE = "2025-01-01T00:00:00.000"
+
+# Neo4j 에 트랜잭션으로 노드/간선을 적재하는 모드
+WRITE_MODES = ("process", "process_all_pcids", "process_range")
+
+# 이벤트 소스만 읽어 파일을 만드는 모드: Neo4j 연결/스키마 생성 없이 처리
+OFFLINE_MODES = ("rebuild", "dump", "verify_transitions")
+
 
 def main():
     parser = argparse.ArgumentParser(description="ES 검색로그를 Neo4j 그래프로 적재")
@@ -19,8 +38,25 @@ def main():
         "mode",
         nargs="?",
         default="process",
-        choices=["process", "export_pcid", "process_all_pcids"],
-        help="실행 모드 선택: process / export_pcid / process_all_pcids (기본값: process)",
+        choices=[
+            "process",
+            "export_pcid",
+            "process_all_pcids",
+            "process_range",
+            "schema",
+            "export_recommend",
+            "export_csr",
+            "path",
+            "rebuild",
+            "dump",
+            "verify_transitions",
+            "normalize_keywords",
+        ],
+        help=(
+            "실행 모드 선택: process / export_pcid / process_all_pcids / process_range / schema "
+            "/ export_recommend / export_csr / path / rebuild / dump / verify_transitions "
+            "/ normalize_keywords (기본값: process)"
+        ),
     )
 
     parser.add_argument(
@@ -29,15 +65,195 @@ def main():
         default="config.yml",
         help="설정 파일 경로 (기본값: config.yml)",
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="process_all_pcids 병렬 워커 수 (기본값: 1, 순차 처리)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help=(
+            "process_all_pcids: ES 조회 / 전이 계산 / Neo4j 적재를 asyncio 파이프라인으로 동시에 수행 "
+            "(--workers 대신 단계별 동시성 사용, aiohttp 필요). PCID 시퀀스는 통째로 메모리에 "
+            "올라가므로 메모리는 (2 × --queue-size + --fetchers + --transformers + --writers) × "
+            "가장 긴 시퀀스 크기로 묶인다. 시퀀스가 매우 긴 PCID 가 많으면 --queue-size 를 줄이거나 "
+            "동기 경로(스트리밍)를 쓴다"
+        ),
+    )
+    parser.add_argument(
+        "--fetchers", type=int, default=8, help="--pipeline: 동시 ES 조회 수 (기본값: 8)"
+    )
+    parser.add_argument(
+        "--transformers", type=int, default=2, help="--pipeline: 동시 전이 계산 수 (기본값: 2)"
+    )
+    parser.add_argument(
+        "--writers", type=int, default=2, help="--pipeline: 동시 Neo4j 적재 수 (기본값: 2)"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=64,
+        help="--pipeline: 단계 사이 큐 최대 PCID 시퀀스 수. 가득 차면 앞 단계가 대기 (기본값: 64)",
+    )
+    parser.add_argument("--gte", help=f"조회 시작 시각 (기본값: {DEFAULT_GTE})")
+    parser.add_argument("--lte", help=f"조회 종료 시각 (기본값: {DEFAULT_LTE})")
+    parser.add_argument(
+        "--checkpoint",
+        help="체크포인트 SQLite 파일 경로. 지정하면 완료 PCID/진행 위치를 기록하고 중단 시 이어서 처리",
+    )
+    parser.add_argument(
+        "--since-checkpoint",
+        action="store_true",
+        help=(
+            "체크포인트 watermark(process_range 완료 시 갱신) 이후 데이터만 처리. "
+            "--lte 미지정 시 현재 시각 - --lag-minutes 까지이며, 그 끝은 체크포인트에 고정돼 "
+            "완료 전 재시도는 같은 기간으로 재개한다"
+        ),
+    )
+    parser.add_argument(
+        "--lag-minutes",
+        type=int,
+        default=10,
+        help=(
+            "--since-checkpoint: 늦게 색인되는 로그를 놓치지 않도록 현재 시각에서 "
+            "이만큼 뺀 시각까지만 처리 (기본값: 10)"
+        ),
+    )
+    parser.add_argument(
+        "--top-n",
+        type=int,
+        default=20,
+        help="export_recommend: 키워드별 저장할 후속어 수 (기본값: 20)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        help=(
+            "export_recommend / export_csr / rebuild: 출력 디렉토리 "
+            "(기본값: ./result/recommend, ./result/graph, ./result/import)"
+        ),
+    )
+    parser.add_argument(
+        "--hit-cache",
+        help="process_all_pcids: PCID 별 ES 조회 결과를 저장할 디스크 캐시 디렉토리",
+    )
+    parser.add_argument(
+        "--hit-cache-max-mb",
+        type=int,
+        default=1024,
+        help="--hit-cache 최대 크기(MB). 넘으면 오래 안 쓴 항목부터 삭제 (기본값: 1024)",
+    )
+    parser.add_argument(
+        "--hit-cache-max-hits",
+        type=int,
+        default=MAX_CACHED_HITS,
+        help=(
+            "--hit-cache 에 저장할 PCID 한 명의 최대 hit 수. 저장하려면 시퀀스 전체를 "
+            f"메모리에 모으므로 이보다 긴 시퀀스는 캐시하지 않는다 (기본값: {MAX_CACHED_HITS})"
+        ),
+    )
+    parser.add_argument(
+        "--fail-pairs",
+        choices=AGGREGATOR_KINDS,
+        default="memory",
+        help=(
+            "FAIL_NEXT 후보 CSV 집계 방식: memory(정확, 기본값) / "
+            "sqlite(정확, 디스크 spill) / topk(근사, 상위 --fail-pairs-top-k 개만)"
+        ),
+    )
+    parser.add_argument(
+        "--fail-pairs-spill",
+        type=int,
+        default=1_000_000,
+        help="--fail-pairs sqlite: 메모리에 모아 둘 최대 쌍 수 (기본값: 1000000)",
+    )
+    parser.add_argument(
+        "--fail-pairs-top-k",
+        type=int,
+        default=100_000,
+        help="--fail-pairs topk: CSV 에 남길 상위 쌍 수 (기본값: 100000)",
+    )
+    parser.add_argument(
+        "--input",
+        nargs="+",
+        help=(
+            "process_range / rebuild: ES 대신 읽을 NDJSON 덤프 파일(.gz/.zst 가능, "
+            "user_pcid → created_date_time 정렬). --gte/--lte 기간 필터는 그대로 적용"
+        ),
+    )
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="rebuild: 전이 계산을 NumPy 컬럼 구현으로 수행 (numpy 필요)",
+    )
+    parser.add_argument(
+        "--output",
+        default="./result/events.ndjson.gz",
+        help="dump: 저장할 NDJSON 파일 (기본값: ./result/events.ndjson.gz)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="normalize_keywords: 합칠 노드 목록만 출력하고 DB 는 바꾸지 않음",
+    )
+    parser.add_argument("--from", dest="from_kw", help="path: 출발 키워드")
+    parser.add_argument("--to", dest="to_kw", help="path: 도착 키워드")
+    parser.add_argument(
+        "--graph-dir",
+        default="./result/graph",
+        help="path: export_csr 그래프 디렉토리 (기본값: ./result/graph)",
+    )
+    parser.add_argument(
+        "--max-hops", type=int, default=4, help="path: 최대 홉 수 (기본값: 4)"
+    )
+    parser.add_argument(
+        "--fanout",
+        type=int,
+        default=50,
+        help="path: 노드마다 따라갈 상위 count 간선 수 (기본값: 50)",
+    )
     args = parser.parse_args()
 
+    if args.mode == "path" and not (args.from_kw and args.to_kw):
+        parser.error("path 모드는 --from 과 --to 가 필요합니다.")
+    if args.since_checkpoint and not args.checkpoint:
+        parser.error("--since-checkpoint 는 --checkpoint 와 함께 사용해야 합니다.")
+
     cfg = load_config(args.config)
     setup_logging(cfg.log_level)
 
     logger.info("애플리케이션 시작 (mode=%s)", args.mode)
 
+    normalizer = KeywordNormalizer(cfg.normalize)
+
+    # path 는 export_csr 결과 파일만 읽으므로 ES/Neo4j 연결 없이 처리
+    if args.mode == "path":
+        run_path(args, normalizer)
+        return
+
     es_service = ElasticsearchService(cfg.es.url, verify_certs=cfg.es.verify_certs)
-    neo_service = Neo4jService(cfg.neo4j.uri, cfg.neo4j.user, cfg.neo4j.password)
+    neo_service = None
+    if args.mode not in OFFLINE_MODES:
+        neo_service = Neo4jService(
+            cfg.neo4j.uri,
+            cfg.neo4j.user,
+            cfg.neo4j.password,
+            batch_size=cfg.neo4j.batch_size,
+            flush_interval=cfg.neo4j.flush_interval,
+            aggregate_scope=cfg.neo4j.aggregate_scope,
+            # schema 모드는 현재 상태를 그대로 보고해야 하므로 자동 생성하지 않음
+            ensure_schema=args.mode != "schema",
+            known_keyword_cache_size=cfg.neo4j.known_keyword_cache_size,
+            write_lanes=cfg.neo4j.write_lanes,
+            write_partition=cfg.neo4j.write_partition,
+        )
+    # 트랜잭션 적재 모드만 노드 MERGE 를 줄일 수 있으므로 그때만 prewarm
+    if cfg.neo4j.prewarm_known_keywords and args.mode in WRITE_MODES:
+        neo_service.prewarm_known_keywords()
+
+    checkpoint = CheckpointStore(args.checkpoint) if args.checkpoint else None
 
     # ⚠️ fail_pair_csv_path 는 기본값 쓰게 두고, 기존처럼 세팅
     processor = SearchLogProcessor(
@@ -46,8 +262,42 @@ def main():
         index_name=cfg.es.index_name,
         query_file=cfg.es.query_file,
         key_field=cfg.es.key_field,
+        checkpoint=checkpoint,
+        source=FileEventSource(args.input, key_field=cfg.es.key_field) if args.input else None,
+        hit_cache=(
+            HitCache(
+                args.hit_cache,
+                max_bytes=args.hit_cache_max_mb * 1024 * 1024,
+                max_hits=args.hit_cache_max_hits,
+            )
+            if args.hit_cache
+            else None
+        ),
+        fail_pair_aggregator=fail_pair_factory(args),
+        normalizer=normalizer,
     )
 
+    # 처리 기간: 기본값 → CLI 인자 → (--since-checkpoint) watermark 순으로 결정
+    gte = args.gte or DEFAULT_GTE
+    lte = args.lte or DEFAULT_LTE
+    exclusive_start = False
+    if args.since_checkpoint:
+        watermark = checkpoint.get_watermark(cfg.es.index_name)
+        if watermark:
+            gte = watermark
+            exclusive_start = True
+        if not args.lte:
+            # 끝 시각이 실행마다 달라지면 range_key 가 바뀌어 중단된 실행을 재개하지 못하고
+            # 이미 적재한 PCID 를 다시 더한다 → 같은 watermark 에서는 처음 정한 lte 를 쓴다
+            lte = checkpoint.pin_window(
+                cfg.es.index_name,
+                gte,
+                (datetime.now() - timedelta(minutes=args.lag_minutes)).strftime(
+                    "%Y-%m-%dT%H:%M:%S.000"
+                ),
+            )
+        logger.info("증분 처리: watermark=%s → gte=%s, lte=%s", watermark, gte, lte)
+
     try:
         # -------------------------------
         # 1) 기존 전체 로그 처리
@@ -62,9 +312,7 @@ def main():
         # 2) PCID 집계 → CSV 생성
         # -------------------------------
         elif args.mode == "export_pcid":
-            # 🔹 일단은 하드코딩(테스트용)
-            gte = "2024-12-01T00:00:00.000"
-            lte = "2025-01-01T00:00:00.000"
+            # 🔹 size/output 은 일단 하드코딩(테스트용)
             size = 10
             output_path = "./result/user_pcid_list.csv"
 
@@ -88,13 +336,11 @@ def main():
         elif args.mode == "process_all_pcids":
             # 🔹 이것도 일단 기본값(테스트용)
             pcid_list_file = "./result/user_pcid_list.csv"
-            gte = "2024-12-01T00:00:00.000"
-            lte = "2025-01-01T00:00:00.000"
             size = 10000
 
             logger.info(
-                "[process_all_pcids] pcid_list_file=%s, gte=%s, lte=%s, size=%d",
-                pcid_list_file, gte, lte, size
+                "[process_all_pcids] pcid_list_file=%s, gte=%s, lte=%s, size=%d, workers=%d, pipeline=%s",
+                pcid_list_file, gte, lte, size, args.workers, args.pipeline
             )
 
             processor.process_all_pcids(
@@ -102,13 +348,190 @@ def main():
                 gte=gte,
                 lte=lte,
                 size=size,
+                workers=args.workers,
+                exclusive_start=exclusive_start,
+                pipeline=(
+                    PipelineConfig(
+                        fetchers=args.fetchers,
+                        transformers=args.transformers,
+                        writers=args.writers,
+                        queue_size=args.queue_size,
+                    )
+                    if args.pipeline
+                    else None
+                ),
             )
 
             logger.info("[process_all_pcids] 완료")
 
+        # -------------------------------
+        # 4) 기간 전체 단일 패스 처리 (PCID 리스트 불필요)
+        # -------------------------------
+        elif args.mode == "process_range":
+            size = 10000
+
+            logger.info("[process_range] gte=%s, lte=%s, size=%d", gte, lte, size)
+
+            processor.process_range(
+                gte=gte,
+                lte=lte,
+                size=size,
+                exclusive_start=exclusive_start,
+            )
+
+            logger.info("[process_range] 완료")
+
+        # -------------------------------
+        # 5) 스키마 점검: 누락 인덱스 + 쿼리별 EXPLAIN 계획
+        # -------------------------------
+        elif args.mode == "schema":
+            missing = neo_service.missing_schema()
+            if missing:
+                logger.warning("[schema] 누락된 제약조건/인덱스: %s", ", ".join(missing))
+            else:
+                logger.info("[schema] 필요한 제약조건/인덱스가 모두 존재합니다.")
+
+            for name, operators in neo_service.explain_queries().items():
+                scans = [op for op in operators if op in SCAN_OPERATORS]
+                log = logger.warning if scans else logger.info
+                log("[schema] %s: %s", name, " > ".join(operators))
+
+        # -------------------------------
+        # 6) 키워드별 상위 NEXT/FAIL_NEXT 추천 스냅샷 생성 (API /recommend 용)
+        # -------------------------------
+        elif args.mode == "export_recommend":
+            output_dir = args.output_dir or "./result/recommend"
+            logger.info("[export_recommend] top_n=%d, output_dir=%s", args.top_n, output_dir)
+
+            path = write_snapshot(
+                output_dir,
+                neo_service.iter_top_successors(args.top_n),
+                top_n=args.top_n,
+            )
+
+            logger.info("[export_recommend] 완료: %s", path)
+
+        # -------------------------------
+        # 7) NEXT 그래프 CSR 스냅샷 생성 (API 다중 홉 추천 용, numpy 필요)
+        # -------------------------------
+        elif args.mode == "export_csr":
+            from .csr_graph import build_csr, write_graph
+
+            output_dir = args.output_dir or "./result/graph"
+            logger.info("[export_csr] output_dir=%s", output_dir)
+
+            graph = build_csr(neo_service.iter_next_edges())
+            path = write_graph(output_dir, graph)
+
+            logger.info("[export_csr] 완료: %s", path)
+
+        # -------------------------------
+        # 8) 전체 재구축용 neo4j-admin import CSV 생성 (Neo4j 에는 쓰지 않음)
+        # -------------------------------
+        elif args.mode == "rebuild":
+            output_dir = args.output_dir or "./result/import"
+            logger.info("[rebuild] gte=%s, lte=%s, output_dir=%s", gte, lte, output_dir)
+
+            paths = processor.rebuild(
+                gte=gte, lte=lte, output_dir=output_dir, vectorized=args.vectorized
+            )
+
+            logger.info("[rebuild] 완료. Neo4j 를 중지한 뒤 아래 명령으로 적재하세요:")
+            logger.info("  %s", import_command(paths))
+            logger.info(
+                "  (import 는 제약조건/인덱스를 만들지 않습니다. 적재 후 적재 모드나 API 를 한 번 실행해 "
+                "생성하고 `search-graph schema` 로 확인하세요)"
+            )
+
+        # -------------------------------
+        # 9) 기간 로그를 NDJSON 덤프로 저장 (이후 --input 으로 ES 없이 재생)
+        # -------------------------------
+        elif args.mode == "dump":
+            logger.info("[dump] gte=%s, lte=%s, output=%s", gte, lte, args.output)
+
+            hits = processor.source.iter_hits(gte, lte, exclusive_start=exclusive_start)
+            write_ndjson(args.output, hits)
+
+            logger.info("[dump] 완료")
+
+        # -------------------------------
+        # 10) 루프 / NumPy 전이 계산 결과 비교 (불일치 시 종료 코드 1)
+        # -------------------------------
+        elif args.mode == "verify_transitions":
+            logger.info("[verify_transitions] gte=%s, lte=%s", gte, lte)
+
+            diffs = processor.verify_transitions(gte=gte, lte=lte)
+            for diff in diffs[:20]:
+                logger.error("[verify_transitions] %s", diff)
+            if diffs:
+                raise SystemExit(1)
+
+            logger.info("[verify_transitions] 두 구현의 결과가 같습니다")
+
+        # -------------------------------
+        # 11) 기존 Keyword 노드를 정규화된 이름으로 합치기 (간선 count 합산)
+        # -------------------------------
+        elif args.mode == "normalize_keywords":
+            logger.info("[normalize_keywords] dry_run=%s", args.dry_run)
+
+            variants = processor.normalize_existing_keywords(dry_run=args.dry_run)
+
+            logger.info("[normalize_keywords] 완료: 합칠 노드=%d", len(variants))
+
     finally:
-        neo_service.close()
+        if neo_service is not None:
+            neo_service.close()
+        if checkpoint is not None:
+            checkpoint.close()
         logger.info("애플리케이션 종료")
 
+
+def run_path(args, normalizer: KeywordNormalizer):
+    """export_csr 그래프에서 두 키워드 사이 재검색 경로를 찾아 출력"""
+    from .csr_graph import load_csr, shortest_path
+
+    from_kw, to_kw = normalizer(args.from_kw), normalizer(args.to_kw)
+
+    path = latest_snapshot_path(args.graph_dir)
+    if path is None:
+        logger.error("[path] 그래프 스냅샷이 없습니다: %s (export_csr 먼저 실행)", args.graph_dir)
+        return
+
+    graph = load_csr(path)
+    missing = [kw for kw in (from_kw, to_kw) if kw not in graph.index]
+    if missing:
+        logger.warning("[path] 그래프에 없는 키워드: %s", missing)
+        return
+
+    found = shortest_path(
+        graph,
+        graph.index[from_kw],
+        graph.index[to_kw],
+        max_hops=args.max_hops,
+        fanout=args.fanout,
+    )
+    if found is None:
+        logger.info("[path] %s → %s: %d 홉 이내 경로 없음", from_kw, to_kw, args.max_hops)
+        return
+
+    nodes, cost = found
+    logger.info(
+        "[path] %s (hops=%d, cost=%.4f)",
+        " → ".join(graph.keywords[i] for i in nodes),
+        len(nodes) - 1,
+        cost,
+    )
+
+
+def fail_pair_factory(args):
+    """--fail-pairs 옵션에 맞는 FAIL_NEXT 후보 집계기 생성 함수 (실행마다 새로 만든다)"""
+    options = {}
+    if args.fail_pairs == "sqlite":
+        options["spill_threshold"] = args.fail_pairs_spill
+    elif args.fail_pairs == "topk":
+        options["k"] = args.fail_pairs_top_k
+    return lambda: make_fail_pair_aggregator(args.fail_pairs, **options)
+
+
 if __name__ == "__main__":
     main()
@@ -1,11 +1,13 @@
 # src/search_graph/config.py
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict
 
 import yaml
 from dotenv import load_dotenv
 
+from .normalize import NormalizeConfig
+
 
 @dataclass
 class ESConfig:
@@ -21,6 +23,14 @@ class Neo4jConfig:
     uri: str
     user: str
     password: str
+    batch_size: int = 1000
+    flush_interval: float = 5.0
+    aggregate_scope: str = "window"
+    known_keyword_cache_size: int = 500_000
+    prewarm_known_keywords: bool = False
+    # 쓰기 lane 수 / 간선 lane 배정 기준 (start | pair). 허브 끝 노드 경합은 남는다 (Neo4jWriteRouter)
+    write_lanes: int = 1
+    write_partition: str = "start"
 
 
 @dataclass
@@ -28,6 +38,7 @@ class AppConfig:
     log_level: str
     es: ESConfig
     neo4j: Neo4jConfig
+    normalize: NormalizeConfig = field(default_factory=NormalizeConfig)
 
 
 def load_config(path: str = "config.yml") -> AppConfig:
@@ -56,10 +67,18 @@ def load_config(path: str = "config.yml") -> AppConfig:
             "NEO4J_PASSWORD",
             neo4j_section.get("password", "neo4j"),
         ),
+        batch_size=int(neo4j_section.get("batch_size", 1000)),
+        flush_interval=float(neo4j_section.get("flush_interval", 5.0)),
+        aggregate_scope=neo4j_section.get("aggregate_scope", "window"),
+        known_keyword_cache_size=int(neo4j_section.get("known_keyword_cache_size", 500_000)),
+        prewarm_known_keywords=bool(neo4j_section.get("prewarm_known_keywords", False)),
+        write_lanes=int(neo4j_section.get("write_lanes", 1)),
+        write_partition=neo4j_section.get("write_partition", "start"),
     )
 
     return AppConfig(
         log_level=raw.get("log_level", "INFO"),
         es=es_cfg,
         neo4j=neo_cfg,
+        normalize=NormalizeConfig.from_dict(raw.get("normalize")),
     )
@@ -0,0 +1,337 @@
+# src/search_graph/csr_graph.py
+"""
+NEXT 그래프의 CSR(Compressed Sparse Row) 표현과 메모리 내 다중 홉 추천.
+
+디렉토리 구조 (추천 스냅샷과 같은 LATEST 방식)
+    <graph_dir>/graph-<version>.npz   : CSR 본문
+    <graph_dir>/LATEST                : 현재 그래프 파일명 (원자적 교체)
+    최신 keep 개의 그래프 파일만 남긴다.
+
+본문(np.savez, 압축 없음 / pickle 미사용)
+    indptr   : int64[n+1]  노드 i 의 간선 범위 = indices[indptr[i]:indptr[i+1]]
+    indices  : int32[m]    도착 노드 id (행 안에서 count 내림차순)
+    counts   : float32[m]  NEXT count
+    kw_bytes : uint8[*]    키워드 UTF-8 바이트를 이어붙인 값
+    kw_offsets: int64[n+1] 키워드 i = kw_bytes[kw_offsets[i]:kw_offsets[i+1]]
+"""
+import heapq
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .recommend_snapshot import KEEP_SNAPSHOTS, _write_latest, prune_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CSRGraph:
+    keywords: List[str]
+    indptr: np.ndarray
+    indices: np.ndarray
+    counts: np.ndarray
+    index: Dict[str, int] = field(init=False)
+    probs: np.ndarray = field(init=False)
+    out_degree: np.ndarray = field(init=False)
+    _reverse: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = field(
+        init=False, default=None, repr=False
+    )
+
+    def __post_init__(self):
+        self.index = {kw: i for i, kw in enumerate(self.keywords)}
+        self.out_degree = np.diff(self.indptr)
+
+        # 행 단위 전이 확률 (count 비례)
+        row_of_edge = np.repeat(np.arange(self.num_nodes), self.out_degree)
+        row_sums = np.bincount(row_of_edge, weights=self.counts, minlength=self.num_nodes)
+        row_sums[row_sums == 0] = 1.0
+        self.probs = (self.counts / row_sums[row_of_edge]).astype(np.float32)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.keywords)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    def reverse_adjacency(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        들어오는 간선 CSR (indptr, 출발 노드 id, count). 행 안은 count 내림차순.
+        처음 호출할 때 한 번 만들고 캐시한다.
+        """
+        if self._reverse is None:
+            sources = np.repeat(np.arange(self.num_nodes, dtype=np.int32), self.out_degree)
+            order = np.lexsort((-self.counts, self.indices))
+            indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=self.num_nodes), out=indptr[1:])
+            self._reverse = (indptr, sources[order], self.counts[order])
+        return self._reverse
+
+
+def build_csr(edges: Iterable[Tuple[str, str, int]]) -> CSRGraph:
+    """(from_kw, to_kw, count) 스트림으로 CSR 그래프를 만든다"""
+    index: Dict[str, int] = {}
+    keywords: List[str] = []
+    src: List[int] = []
+    dst: List[int] = []
+    cnt: List[int] = []
+
+    def intern(name: str) -> int:
+        i = index.get(name)
+        if i is None:
+            i = index[name] = len(keywords)
+            keywords.append(name)
+        return i
+
+    for from_kw, to_kw, count in edges:
+        src.append(intern(from_kw))
+        dst.append(intern(to_kw))
+        cnt.append(count or 0)
+
+    src_arr = np.asarray(src, dtype=np.int64)
+    dst_arr = np.asarray(dst, dtype=np.int32)
+    cnt_arr = np.asarray(cnt, dtype=np.float32)
+
+    # 출발 노드 순, 같은 행 안에서는 count 내림차순
+    order = np.lexsort((-cnt_arr, src_arr))
+    src_arr, dst_arr, cnt_arr = src_arr[order], dst_arr[order], cnt_arr[order]
+
+    indptr = np.zeros(len(keywords) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src_arr, minlength=len(keywords)), out=indptr[1:])
+
+    return CSRGraph(keywords=keywords, indptr=indptr, indices=dst_arr, counts=cnt_arr)
+
+
+def write_graph(graph_dir: str, graph: CSRGraph, keep: int = KEEP_SNAPSHOTS) -> str:
+    """
+    CSR 그래프를 새 파일로 쓰고 LATEST 를 원자적으로 교체한다.
+    최신 keep 개 밖의 그래프 파일은 지운다. 생성된 경로를 반환
+    """
+    os.makedirs(graph_dir, exist_ok=True)
+
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    filename = f"graph-{version}.npz"
+    path = os.path.join(graph_dir, filename)
+    tmp_path = path + ".tmp"
+
+    encoded = [kw.encode("utf-8") for kw in graph.keywords]
+    kw_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=kw_offsets[1:])
+    kw_bytes = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    # np.savez 는 파일명에 .npz 를 붙이므로 파일 객체로 넘긴다
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            indptr=graph.indptr,
+            indices=graph.indices,
+            counts=graph.counts,
+            kw_bytes=kw_bytes,
+            kw_offsets=kw_offsets,
+        )
+    os.replace(tmp_path, path)
+    _write_latest(graph_dir, filename)
+    prune_snapshots(graph_dir, "graph-", keep)
+
+    logger.info("CSR 그래프 저장: %s (nodes=%d, edges=%d)", path, graph.num_nodes, graph.num_edges)
+    return path
+
+
+def load_csr(path: str) -> CSRGraph:
+    with np.load(path, allow_pickle=False) as data:
+        blob = data["kw_bytes"].tobytes()
+        offsets = data["kw_offsets"]
+        keywords = [
+            blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)
+        ]
+        return CSRGraph(
+            keywords=keywords,
+            indptr=data["indptr"],
+            indices=data["indices"],
+            counts=data["counts"],
+        )
+
+
+def _edge_positions(starts: np.ndarray, lens: np.ndarray) -> np.ndarray:
+    """각 행의 [start, start+len) 간선 위치를 한 배열로 펼친다"""
+    total = int(lens.sum())
+    row_begin = np.repeat(np.cumsum(lens) - lens, lens)
+    return np.repeat(starts, lens) + (np.arange(total) - row_begin)
+
+
+def personalized_pagerank(
+    graph: CSRGraph,
+    seeds: Sequence[int],
+    alpha: float = 0.15,
+    epsilon: float = 1e-5,
+    max_rounds: int = 100,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    seed 노드 기준 Personalized PageRank (= 재시작 확률 alpha 의 random walk with restart).
+
+    전체 그래프를 반복 곱하는 power iteration 대신, 잔차가 큰 노드들만 한 번에
+    밀어내는 forward push 를 벡터화해서 seed 주변의 작은 영역만 건드린다.
+    잔차 r(u) 가 epsilon * outdeg(u) 이하가 되면 멈추므로 그래프 크기와 무관하게
+    한 번의 질의 비용이 작다.
+
+    반환: (노드 id 배열, 점수 배열) - 점수가 0 보다 큰 노드만
+    """
+    n = graph.num_nodes
+    seeds = np.unique(np.asarray(seeds, dtype=np.int64))
+    p = np.zeros(n, dtype=np.float64)
+    r = np.zeros(n, dtype=np.float64)
+    r[seeds] = 1.0 / len(seeds)
+
+    threshold = epsilon * np.maximum(graph.out_degree, 1)
+    frontier = seeds
+    touched = [seeds]
+
+    for _ in range(max_rounds):
+        if frontier.size == 0:
+            break
+
+        mass = r[frontier]
+        r[frontier] = 0.0
+        p[frontier] += alpha * mass
+        push = (1.0 - alpha) * mass
+
+        starts = graph.indptr[frontier]
+        lens = graph.indptr[frontier + 1] - starts
+
+        # 나가는 간선이 없는 노드의 잔차는 seed 로 재시작
+        dangling = push[lens == 0].sum()
+        if dangling:
+            r[seeds] += dangling / len(seeds)
+
+        positions = _edge_positions(starts, lens)
+        targets = graph.indices[positions]
+        values = np.repeat(push, lens) * graph.probs[positions]
+
+        uniq, inverse = np.unique(targets, return_inverse=True)
+        r[uniq] += np.bincount(inverse, weights=values)
+
+        candidates = np.concatenate([uniq, seeds]) if dangling else uniq
+        touched.append(uniq)
+        frontier = candidates[r[candidates] > threshold[candidates]]
+        frontier = np.unique(frontier)
+
+    nodes = np.unique(np.concatenate(touched))
+    scores = p[nodes]
+    mask = scores > 0
+    return nodes[mask], scores[mask]
+
+
+def top_k(
+    nodes: np.ndarray,
+    scores: np.ndarray,
+    k: int,
+    exclude: Optional[Iterable[int]] = None,
+) -> List[Tuple[int, float]]:
+    """점수 상위 k 개 (exclude 노드 제외)를 점수 내림차순으로"""
+    if exclude is not None:
+        keep = ~np.isin(nodes, np.fromiter(exclude, dtype=np.int64))
+        nodes, scores = nodes[keep], scores[keep]
+    if len(nodes) > k:
+        part = np.argpartition(-scores, k)[:k]
+        nodes, scores = nodes[part], scores[part]
+    order = np.argsort(-scores, kind="stable")
+    return [(int(nodes[i]), float(scores[i])) for i in order]
+
+
+def shortest_path(
+    graph: CSRGraph,
+    source: int,
+    target: int,
+    max_hops: int = 4,
+    fanout: int = 50,
+    max_expansions: int = 100000,
+) -> Optional[Tuple[List[int], float]]:
+    """
+    source → target 최단 경로 (간선 가중치 = 1 / NEXT count, 자주 이어진 전환일수록 짧다).
+
+    양방향 Dijkstra 의 상태를 (노드, 홉 수) 로 두고, 양쪽 홉 수 합이 max_hops 이하인
+    지점에서만 만나므로 홉 제한 안에서는 정확한 최단 경로다. 행이 count 내림차순이므로 노드마다 앞에서부터 fanout 개 간선만
+    보고(허브 노드 가지치기), 전체 확장 상태 수도 max_expansions 로 제한해 최악의 경우에도
+    지연 시간이 묶인다 (가지치기가 걸리면 근사 결과).
+
+    반환: (노드 id 경로, 비용) / 제한 안에서 경로가 없으면 None
+    """
+    if source == target:
+        return [source], 0.0
+
+    State = Tuple[int, int]
+    rev_indptr, rev_indices, rev_counts = graph.reverse_adjacency()
+    sides = [
+        (graph.indptr, graph.indices, graph.counts),
+        (rev_indptr, rev_indices, rev_counts),
+    ]
+    starts: List[State] = [(source, 0), (target, 0)]
+    dist: List[Dict[State, float]] = [{starts[0]: 0.0}, {starts[1]: 0.0}]
+    parent: List[Dict[State, State]] = [{}, {}]
+    # 노드별로 각 방향에서 도달한 {홉 수: 거리} (만나는 지점 계산용)
+    reached: List[Dict[int, Dict[int, float]]] = [{source: {0: 0.0}}, {target: {0: 0.0}}]
+    heaps: List[List[Tuple[float, int, int]]] = [[(0.0, source, 0)], [(0.0, target, 0)]]
+    settled: List[set] = [set(), set()]
+
+    best = float("inf")
+    meet: Optional[Tuple[State, State]] = None
+    expansions = 0
+
+    while (heaps[0] or heaps[1]) and expansions < max_expansions:
+        # 두 방향의 최소 거리 합이 현재 최선 이상이면 더 짧은 경로는 없다
+        # (한쪽이 홉 제한으로 먼저 소진돼도 반대쪽은 이미 도달한 상태와 만날 수 있다)
+        tops = [h[0][0] if h else 0.0 for h in heaps]
+        if tops[0] + tops[1] >= best:
+            break
+
+        side = 0 if heaps[0] and (not heaps[1] or tops[0] <= tops[1]) else 1
+        d, u, k = heapq.heappop(heaps[side])
+        if (u, k) in settled[side]:
+            continue
+        settled[side].add((u, k))
+        expansions += 1
+
+        indptr, indices, counts = sides[side]
+        if k >= max_hops:
+            continue
+
+        begin = int(indptr[u])
+        end = min(int(indptr[u + 1]), begin + fanout)
+        for v, count in zip(indices[begin:end].tolist(), counts[begin:end].tolist()):
+            state = (v, k + 1)
+            nd = d + 1.0 / max(count, 1.0)
+            if nd >= dist[side].get(state, float("inf")):
+                continue
+            dist[side][state] = nd
+            parent[side][state] = (u, k)
+            heapq.heappush(heaps[side], (nd, v, k + 1))
+
+            reached[side].setdefault(v, {})[k + 1] = nd
+
+            for other_k, other_d in reached[1 - side].get(v, {}).items():
+                if k + 1 + other_k <= max_hops and nd + other_d < best:
+                    best = nd + other_d
+                    other = (v, other_k)
+                    meet = (state, other) if side == 0 else (other, state)
+
+    if meet is None:
+        return None
+
+    forward, backward = meet
+    path = []
+    state = forward
+    while state != starts[0]:
+        path.append(state[0])
+        state = parent[0][state]
+    path.append(source)
+    path.reverse()
+    state = backward
+    while state != starts[1]:
+        state = parent[1][state]
+        path.append(state[0])
+    return path, best
@@ -0,0 +1,105 @@
+# src/search_graph/edge_accumulator.py
+from collections import Counter
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+Edge = Tuple[str, str]
+
+
+class EdgeAccumulator:
+    """
+    NEXT / FAIL_NEXT 증가분을 (from_kw, to_kw) 단위로 합산하는 누적기.
+
+    같은 간선이 여러 번 등장해도 그래프에는 한 번만
+    `count = count + delta` 로 반영되도록 delta 를 모은다.
+    FAIL_NEXT 의 first_seen / last_seen 은 min / max 로 미리 줄여둔다.
+    """
+
+    def __init__(self):
+        self.keywords: Set[str] = set()
+        self.next_counts: Counter[Edge] = Counter()
+        self.fail_counts: Counter[Edge] = Counter()
+        self.fail_first_seen: Dict[Edge, str] = {}
+        self.fail_last_seen: Dict[Edge, str] = {}
+
+    def __len__(self) -> int:
+        """버퍼에 쌓인 서로 다른 행(노드 + 간선) 수"""
+        return len(self.keywords) + len(self.next_counts) + len(self.fail_counts)
+
+    def merge_keyword(self, name: str):
+        self.keywords.add(name)
+
+    def add_next(self, from_kw: str, to_kw: str, delta: int = 1):
+        self.keywords.update((from_kw, to_kw))
+        self.next_counts[(from_kw, to_kw)] += delta
+
+    def add_fail_next(self, from_kw: str, to_kw: str, ts: str, delta: int = 1):
+        self.add_fail_span(from_kw, to_kw, ts, ts, delta)
+
+    def add_fail_span(
+        self, from_kw: str, to_kw: str, first_seen: str, last_seen: str, delta: int = 1
+    ):
+        """이미 (first_seen, last_seen) 으로 줄여 둔 FAIL_NEXT 증가분을 합친다"""
+        edge = (from_kw, to_kw)
+        self.keywords.update(edge)
+        self.fail_counts[edge] += delta
+
+        first = self.fail_first_seen.get(edge)
+        if first is None or first_seen < first:
+            self.fail_first_seen[edge] = first_seen
+        last = self.fail_last_seen.get(edge)
+        if last is None or last_seen > last:
+            self.fail_last_seen[edge] = last_seen
+
+    def merge(self, other: "EdgeAccumulator"):
+        """다른 누적기의 delta 를 합친다 (워커별 누적 결과 병합용)"""
+        self.keywords.update(other.keywords)
+        self.next_counts.update(other.next_counts)
+        for edge, delta in other.fail_counts.items():
+            self.fail_counts[edge] += delta
+            for ts in (other.fail_first_seen[edge], other.fail_last_seen[edge]):
+                if edge not in self.fail_first_seen or ts < self.fail_first_seen[edge]:
+                    self.fail_first_seen[edge] = ts
+                if edge not in self.fail_last_seen or ts > self.fail_last_seen[edge]:
+                    self.fail_last_seen[edge] = ts
+
+    def filter_edges(self, keep: Callable[[str, str], bool]) -> "EdgeAccumulator":
+        """keep(from_kw, to_kw) 가 참인 간선만 남긴 새 누적기 (키워드 MERGE 는 모두 유지)"""
+        filtered = EdgeAccumulator()
+        filtered.keywords = set(self.keywords)
+        filtered.next_counts = Counter(
+            {edge: delta for edge, delta in self.next_counts.items() if keep(*edge)}
+        )
+        for edge, delta in self.fail_counts.items():
+            if keep(*edge):
+                filtered.fail_counts[edge] = delta
+                filtered.fail_first_seen[edge] = self.fail_first_seen[edge]
+                filtered.fail_last_seen[edge] = self.fail_last_seen[edge]
+        return filtered
+
+    def keyword_rows(self) -> List[str]:
+        return sorted(self.keywords)
+
+    def next_rows(self) -> List[Dict[str, Any]]:
+        return [
+            {"from_kw": a, "to_kw": b, "delta": delta}
+            for (a, b), delta in sorted(self.next_counts.items())
+        ]
+
+    def fail_rows(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "from_kw": a,
+                "to_kw": b,
+                "delta": delta,
+                "first_seen": self.fail_first_seen[(a, b)],
+                "last_seen": self.fail_last_seen[(a, b)],
+            }
+            for (a, b), delta in sorted(self.fail_counts.items())
+        ]
+
+    def clear(self):
+        self.keywords = set()
+        self.next_counts = Counter()
+        self.fail_counts = Counter()
+        self.fail_first_seen = {}
+        self.fail_last_seen = {}
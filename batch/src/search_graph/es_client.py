@@ -1,7 +1,9 @@
 # src/search_graph/es_client.py
 import json
 import logging
+import time
 import warnings
+from typing import Any, Dict, Iterator, List, Optional
 
 import urllib3
 from elasticsearch import Elasticsearch
@@ -17,11 +19,24 @@ warnings.filterwarnings(
 
 class ElasticsearchService:
     def __init__(self, url: str, verify_certs: bool = False):
+        self.url = url
+        self.verify_certs = verify_certs
         self.client = Elasticsearch(url, verify_certs=verify_certs)
         logger.info("Elasticsearch 클라이언트 생성: %s", url)
 
-    def search_with_query_file(self, index_name: str, query_file: str):
-        logger.info("ES 검색 실행: index=%s, query_file=%s", index_name, query_file)
+    def iter_query_file_hits(
+        self,
+        index_name: str,
+        query_file: str,
+        page_size: int = 1000,
+        source_fields: Optional[List[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        query_file 의 query/sort 로 전체 결과를 PIT + search_after 로 스트리밍한다.
+        (10,000건 제한 없이 모든 hit 을 돌려준다)
+        source_fields 를 주면 query_file 에 _source 가 없을 때 그 필드만 받는다.
+        """
+        logger.info("ES 스트리밍 검색 실행: index=%s, query_file=%s", index_name, query_file)
 
         with open(query_file, encoding="utf-8") as f:
             query_source = json.load(f)
@@ -30,17 +45,120 @@ class ElasticsearchService:
             "query": query_source["query"],
             "sort": query_source["sort"],
         }
-        size = query_source.get("size", 10000)
+        if "_source" in query_source:
+            body["_source"] = query_source["_source"]
+        elif source_fields:
+            body["_source"] = source_fields
+        return self.iter_hits(index_name, body, page_size=page_size)
 
-        logger.debug("ES query body: %s", body)
-        response = self.client.search(
-            index=index_name,
-            body=body,
-            size=size,
-        )
+    def iter_hits(
+        self,
+        index_name: str,
+        body: Dict[str, Any],
+        page_size: int = 1000,
+        keep_alive: str = "1m",
+        try_single_page: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Point-in-time + search_after 로 body 의 결과 전체를 페이지 단위로 읽어
+        hit 을 하나씩 yield 한다.
+
+        - body["sort"] 뒤에 _shard_doc tiebreaker 를 붙여 같은 시각의 문서도
+          빠짐없이/중복없이 페이지를 넘긴다.
+        - 한 번에 page_size 건만 메모리에 올라오므로 결과 건수와 무관하게
+          메모리 사용량이 일정하다.
+        - 페이지별 응답 지연은 DEBUG, 전체 요약은 INFO 로그로 남긴다.
+        - body 에 track_total_hits 가 없으면 false 로 요청해 건수 집계를 생략한다.
+        - try_single_page: 먼저 PIT 없이 한 번 검색해 page_size 보다 적게 오면 그걸로 끝낸다
+          (결과가 적은 PCID 조회는 PIT 열기/닫기 없이 왕복 1번). 가득 차면 PIT 로 처음부터 다시 읽는다.
+        """
+        if try_single_page:
+            hits = self._search_single_page(index_name, body, page_size)
+            if hits is not None:
+                yield from hits
+                return
+
+        pit_id = self.client.open_point_in_time(index=index_name, keep_alive=keep_alive)["id"]
+
+        sort = list(body.get("sort", [])) + [{"_shard_doc": "asc"}]
+        search_after = None
+        pages = 0
+        total_hits = 0
+        total_latency = 0.0
+        max_latency = 0.0
+
+        try:
+            while True:
+                page_body = _page_body(body, sort, pit_id, keep_alive, page_size, search_after)
+
+                started = time.monotonic()
+                response = self.client.search(body=page_body)
+                latency = (time.monotonic() - started) * 1000
+
+                pit_id = response.get("pit_id", pit_id)
+                hits = response.get("hits", {}).get("hits", [])
+
+                pages += 1
+                total_hits += len(hits)
+                total_latency += latency
+                max_latency = max(max_latency, latency)
+                logger.debug(
+                    "ES 페이지 조회: page=%d, hits=%d, took=%sms, latency=%.1fms",
+                    pages,
+                    len(hits),
+                    response.get("took"),
+                    latency,
+                )
+
+                if not hits:
+                    break
+
+                yield from hits
+
+                if len(hits) < page_size:
+                    break
+                search_after = hits[-1]["sort"]
+        finally:
+            try:
+                self.client.close_point_in_time(body={"id": pit_id})
+            except Exception:
+                logger.warning("PIT 종료 실패 (keep_alive 만료 후 자동 정리됨)", exc_info=True)
+
+            logger.info(
+                "ES 스트리밍 조회 완료: index=%s, pages=%d, hits=%d, avg_latency=%.1fms, max_latency=%.1fms",
+                index_name,
+                pages,
+                total_hits,
+                total_latency / pages if pages else 0.0,
+                max_latency,
+            )
+
+    def _search_single_page(
+        self, index_name: str, body: Dict[str, Any], page_size: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        PIT 없이 한 번 검색해서 결과가 page_size 보다 적으면 그대로 반환한다.
+        가득 찼으면 (뒤에 더 있을 수 있으면) None.
+        PIT 없는 정렬에는 _shard_doc tiebreaker 가 없어 이 페이지에서 search_after 로
+        이어 읽을 수 없으므로, 호출한 쪽은 PIT 로 처음부터 다시 읽는다.
+        """
+        started = time.monotonic()
+        response = self.client.search(index=index_name, body=_single_page_body(body, page_size))
         hits = response.get("hits", {}).get("hits", [])
-        logger.info("ES 결과 hits 개수: %d", len(hits))
-        return response
+        logger.debug(
+            "ES 단일 페이지 조회: index=%s, hits=%d, took=%sms, latency=%.1fms",
+            index_name,
+            len(hits),
+            response.get("took"),
+            (time.monotonic() - started) * 1000,
+        )
+        if len(hits) < page_size:
+            return hits
+        return None
+
+    def async_service(self) -> "AsyncElasticsearchService":
+        """같은 클러스터에 붙는 AsyncElasticsearch 서비스 (async 파이프라인용)"""
+        return AsyncElasticsearchService(self.url, verify_certs=self.verify_certs)
 
     def aggregate_user_pcid(
         self,
@@ -101,4 +219,112 @@ class ElasticsearchService:
         )
 
         logger.info("user_pcid 집계 결과 bucket 개수: %d", len(buckets))
-        return buckets
\ No newline at end of file
+        return buckets
+
+class AsyncElasticsearchService:
+    """
+    AsyncElasticsearch 로 iter_hits 와 같은 PIT + search_after 조회를 한다.
+    elasticsearch 7 의 async 클라이언트는 aiohttp 가 있어야 한다 (pip install 'elasticsearch[async]').
+    """
+
+    def __init__(self, url: str, verify_certs: bool = False):
+        try:
+            from elasticsearch import AsyncElasticsearch
+        except ImportError:
+            raise RuntimeError(
+                "async 파이프라인에는 aiohttp 가 필요합니다 (pip install 'elasticsearch[async]')"
+            )
+        self.client = AsyncElasticsearch(url, verify_certs=verify_certs)
+        logger.info("AsyncElasticsearch 클라이언트 생성: %s", url)
+
+    async def close(self):
+        await self.client.close()
+
+    async def search_all(
+        self,
+        index_name: str,
+        body: Dict[str, Any],
+        page_size: int = 1000,
+        keep_alive: str = "1m",
+        try_single_page: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        body 의 결과 전체를 페이지를 넘기며 모아서 반환 (PCID 한 명 시퀀스 조회용)
+        try_single_page 는 ElasticsearchService.iter_hits 와 같다.
+        iter_hits 와 달리 시퀀스 전체를 리스트로 들고 있으므로 호출한 쪽이 동시에 들고 있는
+        시퀀스 수를 제한해야 한다 (async 파이프라인은 큐 크기로 제한).
+        """
+        if try_single_page:
+            response = await self.client.search(
+                index=index_name, body=_single_page_body(body, page_size)
+            )
+            hits = response.get("hits", {}).get("hits", [])
+            if len(hits) < page_size:
+                return hits
+
+        pit_id = (await self.client.open_point_in_time(index=index_name, keep_alive=keep_alive))["id"]
+
+        sort = list(body.get("sort", [])) + [{"_shard_doc": "asc"}]
+        search_after = None
+        pages = 0
+        collected: List[Dict[str, Any]] = []
+        started = time.monotonic()
+
+        try:
+            while True:
+                page_body = _page_body(body, sort, pit_id, keep_alive, page_size, search_after)
+                response = await self.client.search(body=page_body)
+
+                pit_id = response.get("pit_id", pit_id)
+                hits = response.get("hits", {}).get("hits", [])
+                pages += 1
+                if not hits:
+                    break
+
+                collected.extend(hits)
+
+                if len(hits) < page_size:
+                    break
+                search_after = hits[-1]["sort"]
+        finally:
+            try:
+                await self.client.close_point_in_time(body={"id": pit_id})
+            except Exception:
+                logger.warning("PIT 종료 실패 (keep_alive 만료 후 자동 정리됨)", exc_info=True)
+
+        logger.debug(
+            "ES async 조회 완료: index=%s, pages=%d, hits=%d, latency=%.1fms",
+            index_name,
+            pages,
+            len(collected),
+            (time.monotonic() - started) * 1000,
+        )
+        return collected
+
+
+def _single_page_body(body: Dict[str, Any], page_size: int) -> Dict[str, Any]:
+    """PIT 없이 한 번에 받는 요청 body (정렬은 body 그대로)"""
+    page_body = dict(body)
+    page_body["size"] = page_size
+    page_body.setdefault("track_total_hits", False)
+    return page_body
+
+
+def _page_body(
+    body: Dict[str, Any],
+    sort: List[Any],
+    pit_id: str,
+    keep_alive: str,
+    page_size: int,
+    search_after: Optional[List[Any]],
+) -> Dict[str, Any]:
+    """PIT + search_after 한 페이지 요청 body"""
+    page_body = dict(body)
+    page_body["size"] = page_size
+    page_body["sort"] = sort
+    page_body["pit"] = {"id": pit_id, "keep_alive": keep_alive}
+    # search_after 페이지 이동에는 전체 건수가 필요 없다
+    page_body.setdefault("track_total_hits", False)
+    if search_after is not None:
+        page_body["search_after"] = search_after
+    return page_body
@@ -0,0 +1,78 @@
+# src/search_graph/events.py
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from .normalize import default_normalizer
+
+# process_hits 가 실제로 쓰는 query_log 필드 (ES _source 필터에 사용)
+EVENT_FIELDS = ("user_pcid", "search_query", "created_date_time", "result_count")
+
+
+def event_source_fields(key_field: str = "query_log") -> List[str]:
+    """ES 요청의 _source includes 목록"""
+    return [f"{key_field}.{name}" for name in EVENT_FIELDS]
+
+
+class SearchEvent:
+    """
+    검색 로그 한 건. hit dict 대신 필요한 필드만 __slots__ 로 들고 있어
+    이벤트당 메모리가 작고 전이 처리 루프에서 dict 조회를 반복하지 않는다.
+    """
+
+    __slots__ = ("pcid", "query", "created_dt", "result_count")
+
+    def __init__(
+        self,
+        pcid: str,
+        query: str,
+        created_dt: str,
+        result_count: Optional[int] = None,
+    ):
+        self.pcid = pcid
+        self.query = query
+        self.created_dt = created_dt
+        self.result_count = result_count
+
+    @classmethod
+    def from_hit(
+        cls,
+        hit: Dict[str, Any],
+        key_field: str = "query_log",
+        normalizer: Optional[Callable[[str], str]] = None,
+    ) -> "SearchEvent":
+        # _source 필터에 걸려 필드가 빠지거나 null 인 문서도 있다
+        query_log = (hit.get("_source") or {}).get(key_field) or {}
+        normalize = normalizer or default_normalizer
+        return cls(
+            pcid=str(query_log.get("user_pcid") or ""),
+            # A/B는 일단 search_query 기준 (원하면 input_query로 바꿀 수 있음)
+            # Keyword.name 은 정규화된 검색어 (normalize.py)
+            query=normalize(str(query_log.get("search_query") or "")),
+            created_dt=str(query_log.get("created_date_time") or ""),
+            result_count=query_log.get("result_count"),
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"SearchEvent(pcid={self.pcid!r}, query={self.query!r}, "
+            f"created_dt={self.created_dt!r}, result_count={self.result_count!r})"
+        )
+
+
+def is_fail_event(event: SearchEvent) -> bool:
+    """FAIL_NEXT 의 A 가 될 수 있는 '실패 검색' 인지 (루프/벡터 구현 공통 기준)"""
+    # TODO: 실제 운영에서는 result_count == 0 인 경우만 실패로 볼 예정
+    # return event.result_count == 0
+    return True  # 현재는 MVP용: 일단 모두 실패로 간주
+
+
+def iter_events(
+    hits: Iterable[Union[Dict[str, Any], SearchEvent]],
+    key_field: str = "query_log",
+    normalizer: Optional[Callable[[str], str]] = None,
+) -> Iterator[SearchEvent]:
+    """hit dict 를 SearchEvent 로 디코딩 (이미 SearchEvent 면 그대로)"""
+    for hit in hits:
+        if isinstance(hit, SearchEvent):
+            yield hit
+        else:
+            yield SearchEvent.from_hit(hit, key_field, normalizer)
@@ -0,0 +1,217 @@
+# src/search_graph/fail_pairs.py
+"""
+FAIL_NEXT 후보 (A, B) 쌍 집계기.
+
+한 번의 실행(process / process_all_pcids / process_range / rebuild) 동안
+PCID 별 fail_pairs Counter 를 계속 합산하고, 끝에 count 내림차순으로 CSV 에 쓴다.
+
+- memory : Counter 하나에 정확히 합산 (기존 동작, 쌍 수만큼 메모리 사용)
+- sqlite : 메모리 버퍼가 spill_threshold 쌍을 넘으면 SQLite 로 upsert 해서 비우고,
+           정렬은 SQLite 의 외부 정렬에 맡긴다 (정확, 메모리 상한 고정)
+- topk   : Count-Min sketch + 상위 k 후보만 유지 (근사, 메모리 상한 고정).
+           count 는 sketch 추정치라 실제보다 클 수 있다
+"""
+import csv
+import heapq
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[str, str]
+
+AGGREGATOR_KINDS = ("memory", "sqlite", "topk")
+
+
+def _rank_key(item: Tuple[Pair, int]):
+    """count 내림차순, 동률은 (A, B) 오름차순 (SQLite 의 ORDER BY count DESC, a, b 와 같은 순서)"""
+    pair, count = item
+    return -count, pair
+
+
+class FailPairAggregator(ABC):
+    """update 는 여러 워커 스레드에서 호출해도 안전해야 한다"""
+
+    @abstractmethod
+    def update(self, pairs: Mapping[Pair, int]):
+        """(A, B) → 증가분 을 합산"""
+
+    @abstractmethod
+    def iter_top(self) -> Iterator[Tuple[str, str, int]]:
+        """(A, B, count) 를 count 내림차순, 동률은 (A, B) 오름차순으로 (집계 방식과 무관하게 같은 순서)"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """집계된 서로 다른 쌍 수 (topk 는 유지 중인 후보 수)"""
+
+    def close(self):
+        pass
+
+
+class CounterAggregator(FailPairAggregator):
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def update(self, pairs: Mapping[Pair, int]):
+        with self._lock:
+            self._counts.update(pairs)
+
+    def iter_top(self) -> Iterator[Tuple[str, str, int]]:
+        for (a, b), count in sorted(self._counts.items(), key=_rank_key):
+            yield a, b, count
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+class SqliteSpillAggregator(FailPairAggregator):
+    def __init__(self, path: Optional[str] = None, spill_threshold: int = 1_000_000):
+        self.spill_threshold = spill_threshold
+        self._own_file = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="fail_pairs_", suffix=".sqlite")
+            os.close(fd)
+        self.path = path
+
+        self._buffer: Counter = Counter()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fail_pairs (
+                a TEXT NOT NULL,
+                b TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (a, b)
+            ) WITHOUT ROWID
+            """
+        )
+        self.spills = 0
+        # close 를 못 하고 예외로 끝나도 임시 파일은 정리
+        self._finalizer = weakref.finalize(
+            self, _close_sqlite, self._conn, path if self._own_file else None
+        )
+
+    def update(self, pairs: Mapping[Pair, int]):
+        with self._lock:
+            self._buffer.update(pairs)
+            if len(self._buffer) >= self.spill_threshold:
+                self._spill()
+
+    def _spill(self):
+        """메모리 버퍼를 SQLite 에 합산하고 비운다 (lock 안에서 호출)"""
+        if not self._buffer:
+            return
+        with self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO fail_pairs (a, b, count) VALUES (?, ?, ?)
+                ON CONFLICT (a, b) DO UPDATE SET count = count + excluded.count
+                """,
+                ((a, b, c) for (a, b), c in self._buffer.items()),
+            )
+        self.spills += 1
+        logger.debug("fail_pairs spill: rows=%d (spills=%d)", len(self._buffer), self.spills)
+        self._buffer = Counter()
+
+    def iter_top(self) -> Iterator[Tuple[str, str, int]]:
+        with self._lock:
+            self._spill()
+        cursor = self._conn.execute("SELECT a, b, count FROM fail_pairs ORDER BY count DESC, a, b")
+        for a, b, count in cursor:
+            yield a, b, count
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._spill()
+            return self._conn.execute("SELECT COUNT(*) FROM fail_pairs").fetchone()[0]
+
+    def close(self):
+        self._finalizer()
+
+
+def _close_sqlite(conn: sqlite3.Connection, remove_path: Optional[str]):
+    conn.close()
+    if remove_path:
+        try:
+            os.remove(remove_path)
+        except OSError:
+            pass
+
+
+class TopKAggregator(FailPairAggregator):
+    def __init__(self, k: int = 100_000, width: int = 1 << 20, depth: int = 4):
+        self.k = k
+        self.width = width
+        self.depth = depth
+        self._rows = [array("q", bytes(8 * width)) for _ in range(depth)]
+        self._seeds = [random.getrandbits(32) for _ in range(depth)]
+        # 상위 후보 (쌍 → 추정치). 2k 를 넘으면 상위 k 개로 줄인다
+        self._top: Dict[Pair, int] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, pair: Pair, delta: int) -> int:
+        estimate = None
+        for row, seed in zip(self._rows, self._seeds):
+            i = hash((seed, pair)) % self.width
+            row[i] += delta
+            estimate = row[i] if estimate is None else min(estimate, row[i])
+        return estimate
+
+    def update(self, pairs: Mapping[Pair, int]):
+        with self._lock:
+            for pair, delta in pairs.items():
+                self._top[pair] = self._add(pair, delta)
+            if len(self._top) > 2 * self.k:
+                self._prune()
+
+    def _prune(self):
+        self._top = dict(heapq.nlargest(self.k, self._top.items(), key=lambda item: item[1]))
+
+    def iter_top(self) -> Iterator[Tuple[str, str, int]]:
+        with self._lock:
+            self._prune()
+            ranked = sorted(self._top.items(), key=_rank_key)
+        for (a, b), count in ranked:
+            yield a, b, count
+
+    def __len__(self) -> int:
+        return min(len(self._top), self.k)
+
+
+def make_fail_pair_aggregator(kind: str = "memory", **options) -> FailPairAggregator:
+    if kind == "memory":
+        return CounterAggregator()
+    if kind == "sqlite":
+        return SqliteSpillAggregator(**options)
+    if kind == "topk":
+        return TopKAggregator(**options)
+    raise ValueError(f"알 수 없는 fail_pairs 집계 방식: {kind} (memory / sqlite / topk)")
+
+
+def write_fail_pairs_csv(aggregator: FailPairAggregator, path: str) -> int:
+    """count 내림차순으로 한 줄씩 CSV 에 쓴다 (키워드의 쉼표/따옴표는 csv 모듈이 처리). 행 수 반환"""
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+
+    rows = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["A", "B", "pair_count"])
+        for a, b, count in aggregator.iter_top():
+            writer.writerow([a, b, count])
+            rows += 1
+    return rows
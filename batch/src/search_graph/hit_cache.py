@@ -0,0 +1,238 @@
+# src/search_graph/hit_cache.py
+"""
+PCID 별로 조회한 hit 시퀀스의 로컬 디스크 캐시 (같은 기간을 반복 처리할 때 ES 재조회 방지).
+
+- 키  : sha1(index, pcid, gte, lte, sha1(쿼리 body))
+- 파일: <cache_dir>/<키 앞 2자리>/<키>.bin
+        zlib 압축 JSON {"v": 2, "n": 건수, "columns": [[["<키>", "<하위 키>", ...], [값, ...]], ...]}
+        (_source 를 키 경로로 펼쳐 컬럼 단위로 저장 → 반복되는 필드명이 한 번만 들어간다.
+         경로는 키 목록이므로 "a.b" 같이 점이 들어간 필드명도 그대로 복원된다)
+- 용량: 전체 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은(mtime) 파일부터 삭제
+- 건수: 저장하려면 시퀀스 전체를 메모리에 모아야 하므로 max_hits 를 넘는 시퀀스는 캐시하지 않는다
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+# 이보다 긴 PCID 시퀀스는 캐시하지 않는다 (봇 등 비정상 PCID 가 메모리를 잡아먹지 않도록)
+MAX_CACHED_HITS = 100_000
+
+
+class HitCache:
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_hits: int = MAX_CACHED_HITS,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_hits = max_hits
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.skipped = 0
+        self.total_bytes = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def make_key(index_name: str, pcid: str, gte: str, lte: str, body: Dict[str, Any]) -> str:
+        body_hash = hashlib.sha1(
+            json.dumps(body, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        raw = json.dumps([index_name, pcid, gte, lte, body_hash], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".bin")
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                payload = json.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError, zlib.error):
+            # 깨진 파일은 지우고 다시 조회하게 한다
+            logger.warning("hit 캐시 파일 손상, 삭제: %s", path)
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if payload.get("v") != FORMAT_VERSION:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # LRU 기준 시각 갱신
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return _decode(payload)
+
+    def put(self, key: str, hits: List[Dict[str, Any]]):
+        if len(hits) > self.max_hits:
+            with self._lock:
+                self.skipped += 1
+            return
+        data = zlib.compress(
+            json.dumps(_encode(hits), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # 병렬 워커가 같은 키를 써도 안전하도록 임시 파일에 쓰고 교체
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            try:
+                self.total_bytes -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+            self.total_bytes += len(data)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def cached(self, key: str, hits: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        hits 를 그대로 흘려보내면서 모아 두었다가 끝까지 읽히면 캐시에 저장.
+        max_hits 를 넘으면 모은 것을 버리고 나머지는 저장 없이 흘려보내기만 한다.
+        """
+        collected: Optional[List[Dict[str, Any]]] = []
+        for hit in hits:
+            if collected is not None:
+                collected.append(hit)
+                if len(collected) > self.max_hits:
+                    collected = None
+            yield hit
+
+        if collected is None:
+            with self._lock:
+                self.skipped += 1
+            return
+        self.put(key, collected)
+
+    def _entries(self):
+        """(경로, 크기, mtime) 목록"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".bin"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self):
+        """가장 오래 사용하지 않은 파일부터 지워 max_bytes 의 90% 까지 줄인다 (lock 안에서 호출)"""
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        self.total_bytes = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self.total_bytes <= target:
+                break
+            if self._remove(path):
+                self.total_bytes -= size
+                self.evictions += 1
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "skipped": self.skipped,
+            "bytes": self.total_bytes,
+        }
+
+    def log_stats(self):
+        s = self.stats()
+        logger.info(
+            "hit 캐시: hits=%d, misses=%d, hit_rate=%.1f%%, evictions=%d, skipped=%d, size=%.1fMB",
+            s["hits"],
+            s["misses"],
+            s["hit_rate"] * 100,
+            s["evictions"],
+            s["skipped"],
+            s["bytes"] / (1024 * 1024),
+        )
+
+
+def _flatten(doc: Dict[str, Any], prefix: Tuple[str, ...], out: Dict[Tuple[str, ...], Any]):
+    for k, v in doc.items():
+        path = prefix + (k,)
+        if isinstance(v, dict) and v:
+            _flatten(v, path, out)
+        else:
+            out[path] = v
+
+
+def _encode(hits: List[Dict[str, Any]]) -> Dict[str, Any]:
+    columns: Dict[Tuple[str, ...], List[Any]] = {}
+    for i, hit in enumerate(hits):
+        flat: Dict[Tuple[str, ...], Any] = {}
+        _flatten(hit.get("_source") or {}, (), flat)
+        for path, value in flat.items():
+            column = columns.get(path)
+            if column is None:
+                column = columns[path] = [None] * i
+            column.append(value)
+        for path, column in columns.items():
+            if len(column) <= i:
+                column.append(None)
+    return {
+        "v": FORMAT_VERSION,
+        "n": len(hits),
+        "columns": [[list(path), values] for path, values in columns.items()],
+    }
+
+
+def _decode(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """컬럼을 다시 hit({"_source": {...}}) 목록으로 (None 인 필드는 생략)"""
+    columns = payload["columns"]
+    hits = []
+    for i in range(payload["n"]):
+        source: Dict[str, Any] = {}
+        for parts, values in columns:
+            value = values[i]
+            if value is None:
+                continue
+            node = source
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            node[parts[-1]] = value
+        hits.append({"_source": source})
+    return hits
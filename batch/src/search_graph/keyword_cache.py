@@ -0,0 +1,85 @@
+# src/search_graph/keyword_cache.py
+"""
+실행 중 이미 MERGE 가 끝난(그래프에 있다고 확인된) Keyword 이름 캐시.
+
+Neo4jBatchWriter.flush 가 UNWIND_MERGE_KEYWORDS 로 보낼 키워드 중 여기 있는 것은 건너뛴다.
+- 크기 제한 LRU: 넘치면 가장 오래 안 쓴 이름부터 빠진다 (빠진 이름은 다시 MERGE 될 뿐 안전)
+- flush 가 성공한 뒤에만 add_all 로 등록한다 (실패한 트랜잭션의 키워드를 있다고 믿지 않도록)
+- Bloom filter 는 오탐이면 필요한 MERGE 를 건너뛰어 간선 MATCH 가 조용히 실패하므로 쓰지 않는다
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+class KnownKeywordCache:
+    def __init__(self, max_size: int = 500_000):
+        self.max_size = max_size
+        self._names: "OrderedDict[str, None]" = OrderedDict()
+        # 워커 스레드별 writer 가 함께 쓴다
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def filter_unknown(self, names: Iterable[str]) -> List[str]:
+        """아직 확인되지 않은 이름만 순서대로 반환 (확인된 이름은 최근 사용으로 갱신)"""
+        unknown = []
+        with self._lock:
+            for name in names:
+                if name in self._names:
+                    self._names.move_to_end(name)
+                    self.hits += 1
+                else:
+                    unknown.append(name)
+                    self.misses += 1
+        return unknown
+
+    def add_all(self, names: Iterable[str]):
+        with self._lock:
+            for name in names:
+                self._names[name] = None
+                self._names.move_to_end(name)
+            while len(self._names) > self.max_size:
+                self._names.popitem(last=False)
+                self.evictions += 1
+
+    def discard_all(self, names: Iterable[str]):
+        """삭제된 노드 이름을 뺀다 (노드 병합/삭제 후 호출)"""
+        with self._lock:
+            for name in names:
+                self._names.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._names.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._names),
+        }
+
+    def log_stats(self):
+        s = self.stats()
+        logger.info(
+            "Keyword MERGE 캐시: hits=%d, misses=%d, hit_rate=%.1f%%, evictions=%d, size=%d",
+            s["hits"],
+            s["misses"],
+            s["hit_rate"] * 100,
+            s["evictions"],
+            s["size"],
+        )
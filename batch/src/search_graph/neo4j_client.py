@@ -1,16 +1,1104 @@
 # neo4j_client.py
+import asyncio
 import logging
-from neo4j import GraphDatabase
+import random
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from neo4j.exceptions import DriverError, Neo4jError
+
+from .edge_accumulator import EdgeAccumulator
+from .keyword_cache import KnownKeywordCache
 
 logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------
+# 배치 적재용 UNWIND 쿼리
+# ---------------------------------------------------------
+UNWIND_MERGE_KEYWORDS = """
+UNWIND $rows AS name
+MERGE (:Keyword {name:name})
+"""
+
+UNWIND_NEXT_RELATIONS = """
+UNWIND $rows AS row
+MATCH (a:Keyword {name:row.from_kw}), (b:Keyword {name:row.to_kw})
+MERGE (a)-[r:NEXT]->(b)
+ON CREATE SET r.count = row.delta
+ON MATCH SET r.count = r.count + row.delta
+"""
+
+UNWIND_FAIL_NEXT_RELATIONS = """
+UNWIND $rows AS row
+MATCH (a:Keyword {name:row.from_kw}), (b:Keyword {name:row.to_kw})
+MERGE (a)-[r:FAIL_NEXT]->(b)
+ON CREATE SET
+  r.count = row.delta,
+  r.first_seen = row.first_seen,
+  r.last_seen = row.last_seen
+ON MATCH SET
+  r.count = r.count + row.delta,
+  r.first_seen = CASE WHEN row.first_seen < r.first_seen THEN row.first_seen ELSE r.first_seen END,
+  r.last_seen = CASE WHEN row.last_seen > r.last_seen THEN row.last_seen ELSE r.last_seen END
+"""
+
+# flush 가 적재한 token(PCID) 목록을 같은 트랜잭션에 남기는 표시 노드.
+# part 는 그 트랜잭션이 적재한 범위: APPLIED_ALL(flush 전체) 또는 router lane 이름
+CREATE_APPLIED_BATCH = """
+CREATE (:AppliedBatch {scope:$scope, part:$part, tokens:$tokens})
+"""
+
+APPLIED_BATCHES = """
+MATCH (b:AppliedBatch {scope:$scope})
+RETURN b.part AS part, b.tokens AS tokens
+"""
+
+DELETE_APPLIED_BATCHES = """
+MATCH (b:AppliedBatch {scope:$scope})
+DELETE b
+"""
+
+APPLIED_ALL = "*"
+
+# ---------------------------------------------------------
+# 단건 쿼리
+# ---------------------------------------------------------
+CREATE_KEYWORD = "CREATE (k:Keyword {name:$name}) RETURN k"
+
+MERGE_KEYWORD = "MERGE (k:Keyword {name:$name}) RETURN k"
+
+CREATE_NEXT_RELATION = """
+MATCH (a:Keyword {name:$from_kw}), (b:Keyword {name:$to_kw})
+MERGE (a)-[r:NEXT]->(b)
+ON CREATE SET r.count = 1
+ON MATCH SET r.count = r.count + 1
+RETURN r
+"""
+
+CREATE_FAIL_NEXT_RELATION = """
+MATCH (a:Keyword {name:$from_kw}), (b:Keyword {name:$to_kw})
+MERGE (a)-[r:FAIL_NEXT]->(b)
+ON CREATE SET r.count = 1, r.first_seen = $ts, r.last_seen = $ts
+ON MATCH SET r.count = r.count + 1, r.last_seen = $ts
+RETURN r
+"""
+
+GET_NEXT_LIST = """
+MATCH (a:Keyword {name:$name})-[r:NEXT]->(b)
+RETURN b.name AS next, r.count AS count
+ORDER BY count DESC
+"""
+
+# 키워드별 NEXT / FAIL_NEXT 상위 $top_n 후속어 (추천 스냅샷 생성용)
+TOP_SUCCESSORS = """
+MATCH (a:Keyword)
+CALL {
+  WITH a
+  OPTIONAL MATCH (a)-[r:NEXT]->(b:Keyword)
+  WITH b, r
+  ORDER BY r.count DESC, b.name ASC
+  LIMIT $top_n
+  RETURN collect(CASE WHEN b IS NULL THEN null ELSE [b.name, r.count] END) AS next
+}
+CALL {
+  WITH a
+  OPTIONAL MATCH (a)-[r:FAIL_NEXT]->(b:Keyword)
+  WITH b, r
+  ORDER BY r.count DESC, b.name ASC
+  LIMIT $top_n
+  RETURN collect(CASE WHEN b IS NULL THEN null ELSE [b.name, r.count] END) AS fail_next
+}
+WITH a, next, fail_next
+WHERE size(next) > 0 OR size(fail_next) > 0
+RETURN a.name AS name, next, fail_next
+"""
+
+# CSR 그래프 export 용 NEXT 간선 전체 스트리밍
+ALL_NEXT_EDGES = """
+MATCH (a:Keyword)-[r:NEXT]->(b:Keyword)
+RETURN a.name AS from_kw, b.name AS to_kw, r.count AS count
+"""
+
+# 정규화 마이그레이션용 Keyword 이름 전체 스트리밍
+ALL_KEYWORD_NAMES = """
+MATCH (k:Keyword)
+RETURN k.name AS name
+"""
+
+# 표기만 다른 Keyword(row.name)를 정규화된 이름(row.target) 노드로 합친다.
+# NEXT / FAIL_NEXT 는 count 합산 (first_seen 은 min, last_seen 은 max),
+# 합친 결과 자기 자신으로 향하는 간선(같은 검색어의 표기 변경)은 버린다.
+# row.group 은 같은 target 으로 합쳐지는 모든 이름이다. v→v 나 같은 target 의 다른 변형으로
+# 가는 간선을 t 로 옮기면 t→v2 처럼 곧 지워질 노드를 가리키게 되므로 처음부터 옮기지 않는다
+# (적재 시에도 같은 검색어 반복은 NEXT 로 만들지 않는다).
+UNWIND_MERGE_KEYWORD_VARIANTS = """
+UNWIND $rows AS row
+MATCH (v:Keyword {name:row.name})
+MERGE (t:Keyword {name:row.target})
+WITH v, t, row.group AS group
+CALL {
+  WITH v, t, group
+  MATCH (v)-[r:NEXT]->(n:Keyword)
+  WHERE n <> t AND NOT n.name IN group
+  MERGE (t)-[m:NEXT]->(n)
+  ON CREATE SET m.count = r.count
+  ON MATCH SET m.count = m.count + r.count
+}
+CALL {
+  WITH v, t, group
+  MATCH (n:Keyword)-[r:NEXT]->(v)
+  WHERE n <> t AND NOT n.name IN group
+  MERGE (n)-[m:NEXT]->(t)
+  ON CREATE SET m.count = r.count
+  ON MATCH SET m.count = m.count + r.count
+}
+CALL {
+  WITH v, t, group
+  MATCH (v)-[r:FAIL_NEXT]->(n:Keyword)
+  WHERE n <> t AND NOT n.name IN group
+  MERGE (t)-[m:FAIL_NEXT]->(n)
+  ON CREATE SET m.count = r.count, m.first_seen = r.first_seen, m.last_seen = r.last_seen
+  ON MATCH SET
+    m.count = m.count + r.count,
+    m.first_seen = CASE WHEN r.first_seen < m.first_seen THEN r.first_seen ELSE m.first_seen END,
+    m.last_seen = CASE WHEN r.last_seen > m.last_seen THEN r.last_seen ELSE m.last_seen END
+}
+CALL {
+  WITH v, t, group
+  MATCH (n:Keyword)-[r:FAIL_NEXT]->(v)
+  WHERE n <> t AND NOT n.name IN group
+  MERGE (n)-[m:FAIL_NEXT]->(t)
+  ON CREATE SET m.count = r.count, m.first_seen = r.first_seen, m.last_seen = r.last_seen
+  ON MATCH SET
+    m.count = m.count + r.count,
+    m.first_seen = CASE WHEN r.first_seen < m.first_seen THEN r.first_seen ELSE m.first_seen END,
+    m.last_seen = CASE WHEN r.last_seen > m.last_seen THEN r.last_seen ELSE m.last_seen END
+}
+DETACH DELETE v
+"""
+
+# ---------------------------------------------------------
+# API(api/main.py, api/coalescer.py) 쿼리: schema 모드에서 함께 EXPLAIN 하도록 여기 둔다
+# ---------------------------------------------------------
+# POST /next: 클릭 한 건 반영 (노드가 없으면 만든다)
+MERGE_NEXT_CLICK = """
+MERGE (a:Keyword {name:$from_kw})
+MERGE (b:Keyword {name:$to_kw})
+MERGE (a)-[r:NEXT]->(b)
+ON CREATE SET r.count = 1
+ON MATCH SET r.count = r.count + 1
+RETURN r.count AS count
+"""
+
+# POST /next 쓰기 병합 버퍼: (from_kw, to_kw) 별 증가분 일괄 반영
+UNWIND_NEXT_DELTAS = """
+UNWIND $rows AS row
+MERGE (a:Keyword {name:row.from_kw})
+MERGE (b:Keyword {name:row.to_kw})
+MERGE (a)-[r:NEXT]->(b)
+ON CREATE SET r.count = row.delta
+ON MATCH SET r.count = r.count + row.delta
+"""
+
+# POST /next/batch: 위와 같고 반영 후 count 를 돌려준다
+UNWIND_NEXT_DELTAS_RETURN_COUNTS = UNWIND_NEXT_DELTAS + """\
+RETURN row.from_kw AS from_kw, row.to_kw AS to_kw, r.count AS count
+"""
+
+# k 의 NEXT 이웃을 count 내림차순(동률은 name 오름차순)으로 최대 $limit 개만 수집.
+# $after_count/$after_name 이 있으면 그 다음 항목부터 (keyset)
+# 결과는 $limit 개지만 k 의 나가는 NEXT 간선은 페이지마다 전부 펼쳐서 거르고 정렬한다
+# (O(out-degree)). 관계 count 인덱스는 노드 하나의 간선 확장을 줄이지 못하므로 허브 키워드는
+# 페이지 위치와 무관하게 차수만큼 비용이 든다. 상위 K 만 필요하면 /recommend 스냅샷을 쓴다.
+TOP_NEXT_SUBQUERY = """
+CALL {
+  WITH k
+  OPTIONAL MATCH (k)-[r:NEXT]->(n:Keyword)
+  WHERE $after_count IS NULL
+     OR r.count < $after_count
+     OR (r.count = $after_count AND n.name > $after_name)
+  WITH n, r
+  ORDER BY r.count DESC, n.name ASC
+  LIMIT $limit
+  RETURN collect(CASE WHEN n IS NULL THEN null ELSE {name: n.name, count: r.count} END) AS next
+}
+"""
+
+# GET /node/{name} (include_next=true, cursor 페이지 포함)
+NODE_WITH_NEXT = """
+MATCH (k:Keyword {name:$name})
+""" + TOP_NEXT_SUBQUERY + """\
+RETURN k.name AS name, next
+"""
+
+# GET /node/{name}?include_next=false
+NODE_BY_NAME = """
+MATCH (k:Keyword {name:$name})
+RETURN k.name AS name
+"""
+
+# GET /nodes/next: 여러 키워드의 NEXT 첫 페이지
+NODES_WITH_NEXT = """
+UNWIND $names AS name
+OPTIONAL MATCH (k:Keyword {name:name})
+""" + TOP_NEXT_SUBQUERY + """\
+RETURN name, k IS NOT NULL AS found, next
+"""
+
+# GET /nodes: name 오름차순 keyset 페이지
+LIST_NODES = """
+MATCH (k:Keyword)
+WHERE $after_name IS NULL OR k.name > $after_name
+RETURN k.name AS name
+ORDER BY name
+LIMIT $limit
+"""
+
+# ---------------------------------------------------------
+# 스키마: 모든 쓰기/조회가 Keyword.name 으로 노드를 찾고
+#         NEXT/FAIL_NEXT 를 count 로 정렬하므로 아래 제약조건/인덱스가 필요
+# ---------------------------------------------------------
+SCHEMA_STATEMENTS: Dict[str, str] = {
+    "keyword_name_unique": (
+        "CREATE CONSTRAINT keyword_name_unique IF NOT EXISTS "
+        "FOR (k:Keyword) REQUIRE k.name IS UNIQUE"
+    ),
+    "next_count": "CREATE INDEX next_count IF NOT EXISTS FOR ()-[r:NEXT]-() ON (r.count)",
+    "fail_next_count": (
+        "CREATE INDEX fail_next_count IF NOT EXISTS FOR ()-[r:FAIL_NEXT]-() ON (r.count)"
+    ),
+    "applied_batch_scope": (
+        "CREATE INDEX applied_batch_scope IF NOT EXISTS FOR (b:AppliedBatch) ON (b.scope)"
+    ),
+}
+
+# schema 모드에서 EXPLAIN 으로 실행 계획을 확인할 쿼리 목록: 이름 → (cypher, 예시 파라미터)
+_SAMPLE_EDGE = {"from_kw": "치킨", "to_kw": "닭고기"}
+SHIPPED_QUERIES: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "create_keyword": (CREATE_KEYWORD, {"name": "치킨"}),
+    "merge_keyword": (MERGE_KEYWORD, {"name": "치킨"}),
+    "create_next_relation": (CREATE_NEXT_RELATION, _SAMPLE_EDGE),
+    "create_fail_next_relation": (
+        CREATE_FAIL_NEXT_RELATION,
+        dict(_SAMPLE_EDGE, ts="2024-12-01T00:00:00.000"),
+    ),
+    "get_next_list": (GET_NEXT_LIST, {"name": "치킨"}),
+    "top_successors": (TOP_SUCCESSORS, {"top_n": 20}),
+    "all_next_edges": (ALL_NEXT_EDGES, {}),
+    "all_keyword_names": (ALL_KEYWORD_NAMES, {}),
+    "unwind_merge_keyword_variants": (
+        UNWIND_MERGE_KEYWORD_VARIANTS,
+        {"rows": [{"name": "치킨 ", "target": "치킨", "group": ["치킨 "]}]},
+    ),
+    "unwind_merge_keywords": (UNWIND_MERGE_KEYWORDS, {"rows": ["치킨"]}),
+    "unwind_next_relations": (
+        UNWIND_NEXT_RELATIONS,
+        {"rows": [dict(_SAMPLE_EDGE, delta=1)]},
+    ),
+    "unwind_fail_next_relations": (
+        UNWIND_FAIL_NEXT_RELATIONS,
+        {
+            "rows": [
+                dict(
+                    _SAMPLE_EDGE,
+                    delta=1,
+                    first_seen="2024-12-01T00:00:00.000",
+                    last_seen="2024-12-01T00:00:00.000",
+                )
+            ]
+        },
+    ),
+    "create_applied_batch": (
+        CREATE_APPLIED_BATCH,
+        {"scope": "pcids:2024-12-01~2024-12-31", "part": APPLIED_ALL, "tokens": ["pcid-1"]},
+    ),
+    "applied_batches": (APPLIED_BATCHES, {"scope": "pcids:2024-12-01~2024-12-31"}),
+    "delete_applied_batches": (DELETE_APPLIED_BATCHES, {"scope": "pcids:2024-12-01~2024-12-31"}),
+    # API
+    "api_merge_next_click": (MERGE_NEXT_CLICK, _SAMPLE_EDGE),
+    "api_unwind_next_deltas": (UNWIND_NEXT_DELTAS, {"rows": [dict(_SAMPLE_EDGE, delta=1)]}),
+    "api_unwind_next_deltas_return_counts": (
+        UNWIND_NEXT_DELTAS_RETURN_COUNTS,
+        {"rows": [dict(_SAMPLE_EDGE, delta=1)]},
+    ),
+    "api_node_with_next": (
+        NODE_WITH_NEXT,
+        {"name": "치킨", "limit": 50, "after_count": None, "after_name": None},
+    ),
+    "api_node_with_next_cursor": (
+        NODE_WITH_NEXT,
+        {"name": "치킨", "limit": 50, "after_count": 10, "after_name": "닭고기"},
+    ),
+    "api_node_by_name": (NODE_BY_NAME, {"name": "치킨"}),
+    "api_nodes_with_next": (
+        NODES_WITH_NEXT,
+        {"names": ["치킨", "맥주"], "limit": 50, "after_count": None, "after_name": None},
+    ),
+    "api_list_nodes": (LIST_NODES, {"limit": 100, "after_name": None}),
+}
+
+# 인덱스 없이 라벨/전체 스캔을 하는 연산자 (schema 리포트에서 경고)
+SCAN_OPERATORS = ("AllNodesScan", "NodeByLabelScan")
+
+# 누적 범위: flush 윈도우 단위 / 실행(run) 전체 단위
+AGGREGATE_SCOPES = ("window", "run")
+
+# 쓰기 lane 분배 기준: 간선의 시작 노드 / 정렬된 (노드, 노드) 쌍
+PARTITION_KEYS = ("start", "pair")
+
+
+@dataclass
+class _FlushBatch:
+    """flush 한 번에 적재할 내용 (실패하면 writer 에 남겨 두었다가 다음 flush 에서 다시 적재)"""
+
+    keywords: List[str]
+    statements: List[Tuple[str, List[Any]]]
+    tokens: List[Any]
+    # router: 간선 트랜잭션이 커밋된 lane (재시도 시 건너뛴다)
+    done_lanes: Set[int] = field(default_factory=set)
+
+
+class _BatchWriterBase:
+    """
+    동기 / async 배치 writer 공통 부분: delta 누적, token 과 flush listener,
+    재개 시 이미 적재된 token 걸러내기, flush 배치 만들기와 적재 후 처리.
+    실제 트랜잭션 실행(_write)만 각 writer 가 구현한다.
+    """
+
+    def __init__(
+        self,
+        driver,
+        batch_size: int = 1000,
+        flush_interval: float = 5.0,
+        known_keywords: Optional[KnownKeywordCache] = None,
+        router: Optional["Neo4jWriteRouter"] = None,
+        token_scope: Optional[str] = None,
+        applied: Optional[Dict[Any, Set[str]]] = None,
+    ):
+        self._driver = driver
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.known_keywords = known_keywords
+        self.router = router
+        self.token_scope = token_scope
+        self.applied = applied or {}
+
+        self._acc = EdgeAccumulator()
+        self._last_flush = time.monotonic()
+        self._failed: Optional[_FlushBatch] = None
+
+        # merge(token=...) 로 넘어온 토큰(PCID 등)은 해당 delta 가 실제로
+        # 적재된 뒤에 flush listener 로 전달된다 (체크포인트 기록용)
+        self._tokens: List[Any] = []
+        self._flush_listeners: List[Callable[[List[Any]], None]] = []
+
+    @property
+    def pending(self) -> int:
+        return len(self._acc)
+
+    def add_flush_listener(self, listener: Callable[[List[Any]], None]):
+        """flush 성공 후 그 사이 merge 된 token 목록을 받을 콜백 등록"""
+        self._flush_listeners.append(listener)
+
+    def _merge(self, acc: EdgeAccumulator, token: Any):
+        if token is not None:
+            acc = self._unapplied(acc, token)
+            self._tokens.append(token)
+        if acc is not None:
+            self._acc.merge(acc)
+
+    def _unapplied(self, acc: EdgeAccumulator, token: Any) -> Optional[EdgeAccumulator]:
+        """이전 실행에서 이미 커밋된 token 의 delta 를 뺀다 (전부 반영됐으면 None)"""
+        parts = self.applied.get(token)
+        if not parts:
+            return acc
+        if APPLIED_ALL in parts:
+            return None
+        if self.router is None:
+            raise ValueError(
+                f"token={token} 은 write lane 으로 일부만 적재된 상태입니다. "
+                "같은 write_lanes / write_partition 설정으로 재개해야 합니다."
+            )
+        lanes = self.router.lanes_of_parts(parts)
+        return acc.filter_edges(lambda a, b: self.router.edge_lane(a, b) not in lanes)
+
+    def _flush_due(self) -> bool:
+        return (
+            self.pending >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def _batches(self) -> Iterator[_FlushBatch]:
+        """
+        이번 flush 에 적재할 배치: 직전에 실패한 배치가 있으면 그것부터
+        (그 사이 merge 된 delta 와 섞지 않고), 그 다음 지금 버퍼.
+        """
+        self._last_flush = time.monotonic()
+        if self._failed is not None:
+            batch, self._failed = self._failed, None
+            yield batch
+        yield self._take()
+
+    def _take(self) -> _FlushBatch:
+        """버퍼를 flush 배치로 떼어 내고 비운다"""
+        keywords, statements = (
+            _flush_statements(self._acc, self.known_keywords) if self.pending else ([], [])
+        )
+        batch = _FlushBatch(keywords, statements, self._tokens)
+        self._acc = EdgeAccumulator()
+        self._tokens = []
+        return batch
+
+    def _applied_marker(self, batch: _FlushBatch, part: Optional[str] = None):
+        """트랜잭션 함수에 넘길 AppliedBatch 파라미터 (token_scope 가 없으면 None)"""
+        if self.token_scope is None or not batch.tokens:
+            return None
+        return {"scope": self.token_scope, "part": part, "tokens": batch.tokens}
+
+    def _committed(self, batch: _FlushBatch, started: float):
+        # 트랜잭션이 모두 성공한 뒤에만 "있는 키워드" 로 기록
+        if self.known_keywords is not None:
+            self.known_keywords.add_all(batch.keywords)
+        _log_flush(batch.statements, started)
+
+    def _notify_flushed(self, batch: _FlushBatch):
+        if batch.tokens:
+            for listener in self._flush_listeners:
+                listener(batch.tokens)
+
+
+class Neo4jBatchWriter(_BatchWriterBase):
+    """
+    Keyword MERGE / NEXT / FAIL_NEXT 증가분을 EdgeAccumulator 에 합산해 두었다가
+    flush 마다 UNWIND 배치 쿼리들을 write 트랜잭션 하나로 적재한다.
+    서로 다른 간선마다 `count = count + delta` 한 번만 실행되고,
+    flush 가 실패하면 아무것도 커밋되지 않으므로 다시 flush 해도 delta 가 두 번 더해지지 않는다.
+
+    - batch_size     : 버퍼에 쌓인 (서로 다른) 행 수가 이 값을 넘으면 flush
+                       (트랜잭션 안에서도 쿼리 하나의 행 수를 이 값으로 자른다)
+    - flush_interval : 마지막 flush 이후 이 시간(초)이 지나면 flush
+    - aggregate_scope: "window" 면 위 조건으로 flush,
+                       "run" 이면 실행 전체를 누적해서 close() 시 한 번만 flush
+    - known_keywords : 이미 MERGE 된 Keyword 캐시. 여기 있는 키워드는 노드 MERGE 를 생략
+    - router         : 있으면 flush 를 Neo4jWriteRouter 의 lane 으로 나눠 적재
+                       (트랜잭션은 lane 마다 하나, 실패한 flush 를 다시 적재할 때는 커밋된 lane 을 건너뛴다)
+    - token_scope    : 주면 flush 에 포함된 token(PCID) 목록을 같은 트랜잭션에 AppliedBatch 노드로 남긴다.
+                       중단 후 재개할 때 applied(Neo4jService.applied_tokens 결과)를 넘기면
+                       이미 반영된 token 의 delta 는 merge 에서 다시 더하지 않는다.
+    """
+
+    def __init__(
+        self,
+        driver,
+        batch_size: int = 1000,
+        flush_interval: float = 5.0,
+        aggregate_scope: str = "window",
+        known_keywords: Optional[KnownKeywordCache] = None,
+        router: Optional["Neo4jWriteRouter"] = None,
+        token_scope: Optional[str] = None,
+        applied: Optional[Dict[Any, Set[str]]] = None,
+    ):
+        if aggregate_scope not in AGGREGATE_SCOPES:
+            raise ValueError(f"지원하지 않는 aggregate_scope: {aggregate_scope}")
+
+        super().__init__(
+            driver,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            known_keywords=known_keywords,
+            router=router,
+            token_scope=token_scope,
+            applied=applied,
+        )
+        self.aggregate_scope = aggregate_scope
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def merge_keyword(self, name: str):
+        self._acc.merge_keyword(name)
+        self._maybe_flush()
+
+    def add_next(self, from_kw: str, to_kw: str, delta: int = 1):
+        self._acc.add_next(from_kw, to_kw, delta)
+        self._maybe_flush()
+
+    def add_fail_next(self, from_kw: str, to_kw: str, ts: str, delta: int = 1):
+        self._acc.add_fail_next(from_kw, to_kw, ts, delta)
+        self._maybe_flush()
+
+    def merge(self, acc: EdgeAccumulator, token: Any = None):
+        """
+        미리 누적된 delta 를 한꺼번에 버퍼에 합친다.
+        token 을 넘기면 이 delta 가 적재된 직후 flush listener 에 전달된다.
+        """
+        self._merge(acc, token)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self.aggregate_scope == "run":
+            return
+        if self._flush_due():
+            self.flush()
+
+    def flush(self):
+        for batch in self._batches():
+            self._write(batch)
+
+    def _write(self, batch: _FlushBatch):
+        if batch.statements:
+            started = time.monotonic()
+            try:
+                if self.router is not None:
+                    self.router.write(
+                        batch.statements, batch.done_lanes, self._applied_marker(batch)
+                    )
+                else:
+                    with self._driver.session() as session:
+                        _execute_write_with_retry(
+                            session,
+                            _run_statements,
+                            batch.statements,
+                            self.batch_size,
+                            self._applied_marker(batch, APPLIED_ALL),
+                        )
+            except BaseException:
+                self._failed = batch
+                raise
+            self._committed(batch, started)
+        self._notify_flushed(batch)
+
+    def close(self):
+        self.flush()
+
+
+class Neo4jWriteRouter:
+    """
+    flush 행을 해시로 고정 개수의 단일 writer lane 에 나눠 적재한다.
+
+    병렬 워커들이 "테라" 같은 허브 키워드 주변 간선을 동시에 갱신하면 노드 락에서
+    직렬화되거나 교착(DeadlockDetected)이 난다. 같은 키의 행은 항상 같은 lane(스레드 하나)
+    으로 가므로 그 키를 두고는 lane 끼리 다투지 않는다.
+    단 간선은 양 끝 노드의 락을 모두 잡으므로, 다른 키의 간선이 같은 끝 노드를 가리키면
+    lane 끼리도 여전히 다툴 수 있다 (교착은 재시도로 흡수).
+
+    - 노드 MERGE 는 이름 해시로, 간선은 partition 에 따라
+      "start" = 시작 노드 해시 / "pair" = 정렬된 (노드, 노드) 쌍 해시 로 lane 을 고른다.
+      "start" 는 같은 시작 노드의 간선을 한 lane 에 모으고,
+      "pair" 는 A→B 와 B→A 를 한 lane 에 모은다. 어느 쪽도 허브 끝 노드로 들어오는
+      간선들의 경합은 없애지 못한다.
+    - write() 는 노드 단계를 모든 lane 에서 끝낸 뒤(배리어) 간선 단계를 시작한다
+      (간선 쿼리의 MATCH 가 노드를 찾을 수 있도록).
+    - 단계마다 lane 하나가 트랜잭션 하나다. lane 끼리는 따로 커밋되므로, 간선 단계의
+      트랜잭션에는 AppliedBatch 표시를 lane 이름(lane_part)으로 남기고 커밋된 lane 을 done 에 기록한다.
+    - 여러 batch writer(워커 스레드)가 router 하나를 공유한다. write() 는 자기 행이
+      모두 적재될 때까지 기다리며, 실패하면 첫 예외를 그대로 올린다.
+    """
+
+    def __init__(
+        self,
+        driver,
+        lanes: int = 4,
+        partition: str = "start",
+        batch_size: int = 1000,
+    ):
+        if lanes < 1:
+            raise ValueError("lanes 는 1 이상이어야 합니다.")
+        if partition not in PARTITION_KEYS:
+            raise ValueError(f"지원하지 않는 partition: {partition}")
+
+        self._driver = driver
+        self.lanes = lanes
+        self.partition = partition
+        self.batch_size = batch_size
+        # lane 마다 스레드 하나 → lane 안에서는 항상 한 트랜잭션씩
+        self._lanes = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"neo4j-lane-{i}")
+            for i in range(lanes)
+        ]
+
+    def lane_of(self, key: str) -> int:
+        # 프로세스마다 달라지는 hash() 대신 crc32 (같은 키는 항상 같은 lane)
+        return zlib.crc32(key.encode("utf-8")) % self.lanes
+
+    def _edge_key(self, from_kw: str, to_kw: str) -> str:
+        if self.partition == "pair":
+            a, b = sorted((from_kw, to_kw))
+            return f"{a}\x00{b}"
+        return from_kw
+
+    def edge_lane(self, from_kw: str, to_kw: str) -> int:
+        return self.lane_of(self._edge_key(from_kw, to_kw))
+
+    def lane_part(self, lane: int) -> str:
+        """AppliedBatch.part 에 남기는 lane 이름 (분배 설정이 같아야 같은 lane)"""
+        return f"{self.partition}:{self.lanes}:{lane}"
+
+    def lanes_of_parts(self, parts: Iterable[str]) -> Set[int]:
+        """lane_part 이름들 → lane 번호. 다른 분배 설정으로 남은 이름이면 ValueError"""
+        lanes = set()
+        prefix = f"{self.partition}:{self.lanes}:"
+        for part in parts:
+            if not part.startswith(prefix):
+                raise ValueError(
+                    f"AppliedBatch part={part} 는 현재 write lane 설정({prefix}*)과 다릅니다. "
+                    "같은 write_lanes / write_partition 설정으로 재개해야 합니다."
+                )
+            lanes.add(int(part[len(prefix):]))
+        return lanes
+
+    def write(
+        self,
+        statements: List[Tuple[str, List[Any]]],
+        done: Optional[Set[int]] = None,
+        applied: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        _flush_statements 결과(노드 → NEXT → FAIL_NEXT 순)를 lane 으로 나눠 적재.
+        done 에는 간선 트랜잭션이 커밋된 lane 을 더하고, 이미 있는 lane 은 건너뛴다.
+        applied 를 주면 간선 트랜잭션마다 AppliedBatch 표시를 함께 남긴다.
+        """
+        done = set() if done is None else done
+        (node_query, keywords), *edge_statements = statements
+
+        # 1) 노드 MERGE (모든 lane 완료까지 대기, 다시 실행해도 결과가 같다)
+        node_parts: List[List[Tuple[str, List[Any]]]] = [[] for _ in range(self.lanes)]
+        for lane, rows in enumerate(self._split(keywords, lambda name: name)):
+            if rows:
+                node_parts[lane].append((node_query, rows))
+        self._wait(self._submit(node_parts, None), set())
+
+        # 2) 간선 (lane 안에서는 NEXT → FAIL_NEXT 순, 행은 정렬 순서 유지)
+        edge_parts: List[List[Tuple[str, List[Any]]]] = [[] for _ in range(self.lanes)]
+        for query, rows in edge_statements:
+            parts = self._split(rows, lambda row: self._edge_key(row["from_kw"], row["to_kw"]))
+            for lane, lane_rows in enumerate(parts):
+                if lane_rows and lane not in done:
+                    edge_parts[lane].append((query, lane_rows))
+        self._wait(self._submit(edge_parts, applied), done)
+
+    def _split(self, rows: List[Any], key: Callable[[Any], str]) -> List[List[Any]]:
+        parts: List[List[Any]] = [[] for _ in range(self.lanes)]
+        for row in rows:
+            parts[self.lane_of(key(row))].append(row)
+        return parts
+
+    def _submit(
+        self,
+        parts: List[List[Tuple[str, List[Any]]]],
+        applied: Optional[Dict[str, Any]],
+    ) -> Dict[int, Future]:
+        return {
+            lane: self._lanes[lane].submit(
+                self._run_lane,
+                statements,
+                dict(applied, part=self.lane_part(lane)) if applied is not None else None,
+            )
+            for lane, statements in enumerate(parts)
+            if statements
+        }
+
+    def _run_lane(
+        self,
+        statements: List[Tuple[str, List[Any]]],
+        applied: Optional[Dict[str, Any]],
+    ):
+        with self._driver.session() as session:
+            _execute_write_with_retry(
+                session, _run_statements, statements, self.batch_size, applied
+            )
+
+    @staticmethod
+    def _wait(futures: Dict[int, Future], done: Set[int]):
+        # 모두 끝날 때까지 기다린 뒤 첫 예외를 올린다 (다른 lane 작업이 도중에 버려지지 않도록)
+        errors = []
+        for lane, future in futures.items():
+            error = future.exception()
+            if error is None:
+                done.add(lane)
+            else:
+                errors.append(error)
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        for lane in self._lanes:
+            lane.shutdown(wait=True)
+
+
+class AsyncNeo4jBatchWriter(_BatchWriterBase):
+    """
+    Neo4jBatchWriter 의 async 버전 (AsyncGraphDatabase 드라이버, async 파이프라인용).
+    merge 로 PCID 단위 delta 를 합치고 maybe_flush / close 를 await 한다.
+    누적, flush 배치, token/flush listener, known_keywords 처리는 _BatchWriterBase 를 함께 쓰고
+    flush 한 번이 write 트랜잭션 하나인 것도 같다 (router 는 쓰지 않는다).
+    """
+
+    def __init__(
+        self,
+        driver,
+        batch_size: int = 1000,
+        flush_interval: float = 5.0,
+        known_keywords: Optional[KnownKeywordCache] = None,
+        token_scope: Optional[str] = None,
+        applied: Optional[Dict[Any, Set[str]]] = None,
+    ):
+        super().__init__(
+            driver,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            known_keywords=known_keywords,
+            token_scope=token_scope,
+            applied=applied,
+        )
+        self.flushes = 0
+
+    def merge(self, acc: EdgeAccumulator, token: Any = None):
+        self._merge(acc, token)
+
+    async def maybe_flush(self):
+        if self._flush_due():
+            await self.flush()
+
+    async def flush(self):
+        for batch in self._batches():
+            await self._write(batch)
+
+    async def _write(self, batch: _FlushBatch):
+        if batch.statements:
+            started = time.monotonic()
+            try:
+                async with self._driver.session() as session:
+                    await _aexecute_write_with_retry(
+                        session,
+                        _arun_statements,
+                        batch.statements,
+                        self.batch_size,
+                        self._applied_marker(batch, APPLIED_ALL),
+                    )
+            except BaseException:
+                self._failed = batch
+                raise
+            self._committed(batch, started)
+            self.flushes += 1
+        self._notify_flushed(batch)
+
+    async def close(self):
+        await self.flush()
+
+
+def _flush_statements(
+    acc: EdgeAccumulator,
+    known_keywords: Optional[KnownKeywordCache],
+) -> Tuple[List[str], List[Tuple[str, List[Any]]]]:
+    """
+    flush 할 (MERGE 할 키워드, [(UNWIND 쿼리, 행 목록), ...]) - 적재 순서대로.
+    이미 MERGE 된 키워드(known_keywords)는 노드 MERGE 에서 뺀다.
+    """
+    keywords = acc.keyword_rows()
+    if known_keywords is not None:
+        keywords = known_keywords.filter_unknown(keywords)
+    # 노드를 먼저 MERGE 해야 관계 쿼리의 MATCH 가 성공한다
+    return keywords, [
+        (UNWIND_MERGE_KEYWORDS, keywords),
+        (UNWIND_NEXT_RELATIONS, acc.next_rows()),
+        (UNWIND_FAIL_NEXT_RELATIONS, acc.fail_rows()),
+    ]
+
+
+def _log_flush(statements: List[Tuple[str, List[Any]]], started: float):
+    (_, keywords), (_, next_rows), (_, fail_rows) = statements
+    logger.debug(
+        "Neo4j 배치 flush: keywords=%d, next=%d, fail_next=%d (%.1fms)",
+        len(keywords),
+        len(next_rows),
+        len(fail_rows),
+        (time.monotonic() - started) * 1000,
+    )
+
+
+def _chunks(rows: List[Any], size: int) -> Iterator[List[Any]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _run_unwind(tx, query: str, rows: List[Any]):
+    tx.run(query, rows=rows).consume()
+
+
+def _run_statements(
+    tx,
+    statements: List[Tuple[str, List[Any]]],
+    batch_size: int,
+    applied: Optional[Dict[str, Any]] = None,
+):
+    """flush 의 UNWIND 쿼리들을 (batch_size 행씩 잘라) 한 트랜잭션에서 실행하고 AppliedBatch 를 남긴다"""
+    for query, rows in statements:
+        for chunk in _chunks(rows, batch_size):
+            tx.run(query, rows=chunk).consume()
+    if applied is not None:
+        tx.run(CREATE_APPLIED_BATCH, **applied).consume()
+
+
+# managed 트랜잭션(execute_write) 자체 재시도가 끝난 뒤에도 남는 일시 오류
+# (DeadlockDetected, 리더 교체, 연결 끊김 등) 재시도 횟수 / 대기 상한(초)
+WRITE_MAX_RETRIES = 5
+WRITE_RETRY_BASE_DELAY = 0.05
+WRITE_RETRY_MAX_DELAY = 2.0
+
+
+# Neo4j 가 아직 뜨는 중이면(ServiceUnavailable 등 DriverError) 스키마 생성을 백오프로 재시도
+SCHEMA_MAX_RETRIES = 6
+SCHEMA_RETRY_BASE_DELAY = 1.0
+SCHEMA_RETRY_MAX_DELAY = 30.0
+
+
+def schema_retry_delay(attempt: int) -> float:
+    """attempt 번째 스키마 생성 재시도 전 대기 시간(초): 1, 2, 4, ... 최대 30"""
+    return min(SCHEMA_RETRY_MAX_DELAY, SCHEMA_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+
+
+def _execute_write_with_retry(session, work: Callable[..., Any], *args: Any):
+    """execute_write(work, *args) 에 full jitter 지수 백오프 재시도를 한 겹 더 씌운다"""
+    attempt = 0
+    while True:
+        try:
+            return session.execute_write(work, *args)
+        except (Neo4jError, DriverError) as e:
+            if not e.is_retryable() or attempt >= WRITE_MAX_RETRIES:
+                raise
+            attempt += 1
+            time.sleep(_retry_delay(attempt, e))
+
+
+async def _aexecute_write_with_retry(session, work: Callable[..., Any], *args: Any):
+    """_execute_write_with_retry 의 async 버전 (AsyncSession.execute_write)"""
+    attempt = 0
+    while True:
+        try:
+            return await session.execute_write(work, *args)
+        except (Neo4jError, DriverError) as e:
+            if not e.is_retryable() or attempt >= WRITE_MAX_RETRIES:
+                raise
+            attempt += 1
+            await asyncio.sleep(_retry_delay(attempt, e))
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """attempt 번째 재시도 전 대기 시간(초)"""
+    # 같은 노드를 다투던 트랜잭션들이 동시에 다시 부딪히지 않도록 대기 시간을 흩뜨린다
+    delay = random.uniform(
+        0, min(WRITE_RETRY_MAX_DELAY, WRITE_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    )
+    logger.warning(
+        "Neo4j 쓰기 재시도 %d/%d (%.0fms 후): %s",
+        attempt,
+        WRITE_MAX_RETRIES,
+        delay * 1000,
+        error,
+    )
+    return delay
+
+
+async def _arun_statements(
+    tx,
+    statements: List[Tuple[str, List[Any]]],
+    batch_size: int,
+    applied: Optional[Dict[str, Any]] = None,
+):
+    """_run_statements 의 async 버전"""
+    for query, rows in statements:
+        for chunk in _chunks(rows, batch_size):
+            result = await tx.run(query, rows=chunk)
+            await result.consume()
+    if applied is not None:
+        result = await tx.run(CREATE_APPLIED_BATCH, **applied)
+        await result.consume()
+
+
 class Neo4jService:
-    def __init__(self, uri: str, user: str, password: str):
+    def __init__(
+        self,
+        uri: str,
+        user: str,
+        password: str,
+        batch_size: int = 1000,
+        flush_interval: float = 5.0,
+        aggregate_scope: str = "window",
+        ensure_schema: bool = True,
+        known_keyword_cache_size: int = 500_000,
+        write_lanes: int = 1,
+        write_partition: str = "start",
+    ):
         logger.info("Neo4j 드라이버 초기화: %s", uri)
-        self._driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.uri = uri
+        self._auth = (user, password)
+        self._driver = GraphDatabase.driver(uri, auth=self._auth)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.aggregate_scope = aggregate_scope
+        # 실행 동안 모든 batch_writer 가 공유하는 "MERGE 완료" 키워드 캐시 (0 이면 사용 안 함)
+        self.known_keywords = (
+            KnownKeywordCache(known_keyword_cache_size) if known_keyword_cache_size > 0 else None
+        )
+        # write_lanes > 1 이면 모든 batch_writer 의 flush 를 해시 분할 lane 으로 적재
+        # (lane 끼리 같은 키를 두고 다투지 않을 뿐, 허브 끝 노드로 들어오는 간선은 여전히 경합)
+        self.router = (
+            Neo4jWriteRouter(
+                self._driver, lanes=write_lanes, partition=write_partition, batch_size=batch_size
+            )
+            if write_lanes > 1
+            else None
+        )
+
+        if ensure_schema:
+            self.ensure_schema()
+
+    # ---------------------------------------------------------
+    # 스키마 (제약조건/인덱스)
+    # ---------------------------------------------------------
+    def ensure_schema(self):
+        """
+        Keyword.name 유니크 제약조건과 관계 count 인덱스를 없으면 생성.
+        Neo4j 에 아직 연결되지 않으면(DriverError) 백오프로 재시도하고, 끝내 안 되면 에러 로그만 남긴다.
+        """
+        attempt = 0
+        while True:
+            try:
+                self._create_schema()
+                return
+            except DriverError as e:
+                if attempt >= SCHEMA_MAX_RETRIES:
+                    logger.error("Neo4j 에 연결하지 못해 스키마를 만들지 못했습니다: %s", e)
+                    return
+                attempt += 1
+                delay = schema_retry_delay(attempt)
+                logger.warning(
+                    "Neo4j 연결 대기 %d/%d (%.0fs 후 재시도): %s",
+                    attempt,
+                    SCHEMA_MAX_RETRIES,
+                    delay,
+                    e,
+                )
+                time.sleep(delay)
+
+    def _create_schema(self):
+        with self._driver.session() as session:
+            for name, statement in SCHEMA_STATEMENTS.items():
+                try:
+                    session.run(statement).consume()
+                except Neo4jError as e:
+                    # 예: 중복 Keyword 가 이미 있으면 유니크 제약조건 생성 실패
+                    logger.warning("스키마 생성 실패: %s (%s)", name, e.message)
+        logger.info("Neo4j 스키마 확인 완료: %s", ", ".join(SCHEMA_STATEMENTS))
+
+    def missing_schema(self) -> List[str]:
+        """SCHEMA_STATEMENTS 중 DB 에 아직 없는 제약조건/인덱스 이름"""
+        with self._driver.session() as session:
+            existing = {
+                record["name"]
+                for record in session.run("SHOW INDEXES YIELD name RETURN name")
+            }
+            existing.update(
+                record["name"]
+                for record in session.run("SHOW CONSTRAINTS YIELD name RETURN name")
+            )
+        return [name for name in SCHEMA_STATEMENTS if name not in existing]
+
+    def explain_queries(self) -> Dict[str, List[str]]:
+        """SHIPPED_QUERIES 를 EXPLAIN 해서 쿼리별 실행 계획 연산자 목록을 반환"""
+        plans: Dict[str, List[str]] = {}
+        with self._driver.session() as session:
+            for name, (query, params) in SHIPPED_QUERIES.items():
+                summary = session.run("EXPLAIN " + query, **params).consume()
+                plans[name] = _plan_operators(summary.plan)
+        return plans
+
+    def batch_writer(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        aggregate_scope: Optional[str] = None,
+        token_scope: Optional[str] = None,
+        applied: Optional[Dict[Any, Set[str]]] = None,
+    ) -> Neo4jBatchWriter:
+        """UNWIND 배치 적재기 생성 (with 블록 종료 시 남은 버퍼 flush)"""
+        return Neo4jBatchWriter(
+            self._driver,
+            batch_size=batch_size or self.batch_size,
+            flush_interval=flush_interval if flush_interval is not None else self.flush_interval,
+            aggregate_scope=aggregate_scope or self.aggregate_scope,
+            known_keywords=self.known_keywords,
+            router=self.router,
+            token_scope=token_scope,
+            applied=applied,
+        )
+
+    def applied_tokens(self, scope: str) -> Dict[str, Set[str]]:
+        """token_scope 로 적재된 token → 커밋된 part 집합 (AppliedBatch.part)"""
+        applied: Dict[str, Set[str]] = {}
+        with self._driver.session() as session:
+            for record in session.run(APPLIED_BATCHES, scope=scope):
+                for token in record["tokens"]:
+                    applied.setdefault(token, set()).add(record["part"])
+        return applied
+
+    def clear_applied_tokens(self, scope: str):
+        """실행이 끝나 더 필요 없는 AppliedBatch 표시를 지운다"""
+        with self._driver.session() as session:
+            session.run(DELETE_APPLIED_BATCHES, scope=scope).consume()
+
+    def async_driver(self):
+        """같은 DB 에 붙는 AsyncGraphDatabase 드라이버 (호출한 쪽에서 await close())"""
+        return AsyncGraphDatabase.driver(self.uri, auth=self._auth)
+
+    def async_batch_writer(
+        self,
+        driver,
+        token_scope: Optional[str] = None,
+        applied: Optional[Dict[Any, Set[str]]] = None,
+    ) -> AsyncNeo4jBatchWriter:
+        """async_driver() 로 만든 드라이버에 붙는 async 배치 적재기"""
+        return AsyncNeo4jBatchWriter(
+            driver,
+            batch_size=self.batch_size,
+            flush_interval=self.flush_interval,
+            known_keywords=self.known_keywords,
+            token_scope=token_scope,
+            applied=applied,
+        )
+
+    def prewarm_known_keywords(self) -> int:
+        """그래프의 Keyword 이름으로 캐시를 채운다 (캐시 크기까지). 채운 수 반환"""
+        if self.known_keywords is None:
+            return 0
+
+        started = time.monotonic()
+        names = islice(self.iter_keyword_names(), self.known_keywords.max_size)
+        self.known_keywords.add_all(names)
+        logger.info(
+            "Keyword MERGE 캐시 prewarm: %d개 (%.1fs)",
+            len(self.known_keywords),
+            time.monotonic() - started,
+        )
+        return len(self.known_keywords)
 
     def close(self):
+        if self.known_keywords is not None and (
+            self.known_keywords.hits or self.known_keywords.misses
+        ):
+            self.known_keywords.log_stats()
+        if self.router is not None:
+            self.router.close()
         logger.info("Neo4j 드라이버 종료")
         self._driver.close()
 
@@ -27,50 +1115,90 @@ class Neo4jService:
         logger.warning("모든 노드/관계를 삭제합니다.")
         with self._driver.session() as session:
             session.run("MATCH (n) DETACH DELETE n").consume()
+        if self.known_keywords is not None:
+            self.known_keywords.clear()
 
     def create_keyword(self, name: str):
         logger.debug("키워드 노드 생성: %s", name)
-        query = "CREATE (k:Keyword {name:$name}) RETURN k"
         with self._driver.session() as session:
-            result = session.run(query, name=name)
+            result = session.run(CREATE_KEYWORD, name=name)
             return result.single()  # 여기서 바로 소비
 
     def create_next_relation(self, from_kw: str, to_kw: str):
         logger.debug("NEXT 관계 생성/증가: %s -> %s", from_kw, to_kw)
-        query = """
-        MATCH (a:Keyword {name:$from_kw}), (b:Keyword {name:$to_kw})
-        MERGE (a)-[r:NEXT]->(b)
-        ON CREATE SET r.count = 1
-        ON MATCH SET r.count = r.count + 1
-        RETURN r
-        """
         with self._driver.session() as session:
-            result = session.run(query, from_kw=from_kw, to_kw=to_kw)
+            result = session.run(CREATE_NEXT_RELATION, from_kw=from_kw, to_kw=to_kw)
             return result.single()
 
     def get_next_list(self, name: str):
         logger.debug("NEXT 리스트 조회: %s", name)
-        query = """
-        MATCH (a:Keyword {name:$name})-[r:NEXT]->(b)
-        RETURN b.name AS next, r.count AS count
-        ORDER BY count DESC
-        """
         with self._driver.session() as session:
-            result = session.run(query, name=name)
+            result = session.run(GET_NEXT_LIST, name=name)
             return result.data()  # 리스트로 한 번에 가져오기
 
+    def iter_top_successors(self, top_n: int) -> Iterator[Tuple[str, List, List]]:
+        """
+        모든 Keyword 에 대해 (name, NEXT 상위 top_n, FAIL_NEXT 상위 top_n) 을 스트리밍한다.
+        각 목록은 [name, count] 쌍의 count 내림차순 리스트.
+        """
+        with self._driver.session() as session:
+            result = session.run(TOP_SUCCESSORS, top_n=top_n)
+            for record in result:
+                yield record["name"], record["next"], record["fail_next"]
+
+    def iter_next_edges(self) -> Iterator[Tuple[str, str, int]]:
+        """모든 NEXT 간선을 (from_kw, to_kw, count) 로 스트리밍한다"""
+        with self._driver.session() as session:
+            result = session.run(ALL_NEXT_EDGES)
+            for record in result:
+                yield record["from_kw"], record["to_kw"], record["count"]
+
+    def iter_keyword_names(self) -> Iterator[str]:
+        """모든 Keyword.name 을 스트리밍한다"""
+        with self._driver.session() as session:
+            result = session.run(ALL_KEYWORD_NAMES)
+            for record in result:
+                yield record["name"]
+
+    def merge_keyword_variants(self, variants: Dict[str, str]) -> int:
+        """
+        {기존 이름: 정규화된 이름} 대로 Keyword 노드를 합치고 간선 count 를 합산한다.
+        batch_size 행씩 트랜잭션을 나눠 실행하며, 합친(삭제된) 노드 수를 반환.
+        """
+        groups: Dict[str, List[str]] = {}
+        for name, target in variants.items():
+            groups.setdefault(target, []).append(name)
+        rows = [
+            {"name": name, "target": target, "group": sorted(groups[target])}
+            for name, target in sorted(variants.items())
+        ]
+        with self._driver.session() as session:
+            for chunk in _chunks(rows, self.batch_size):
+                _execute_write_with_retry(
+                    session, _run_unwind, UNWIND_MERGE_KEYWORD_VARIANTS, chunk
+                )
+        # 합쳐진(삭제된) 노드는 더 이상 있는 키워드가 아니다
+        if self.known_keywords is not None:
+            self.known_keywords.discard_all(variants)
+        return len(rows)
+
     def merge_keyword(self, name: str):
-        query = "MERGE (k:Keyword {name:$name}) RETURN k"
         with self._driver.session() as session:
-            return session.run(query, name=name).single()
+            return session.run(MERGE_KEYWORD, name=name).single()
 
     def create_fail_next_relation(self, from_kw: str, to_kw: str, ts: str):
-        query = """
-        MATCH (a:Keyword {name:$from_kw}), (b:Keyword {name:$to_kw})
-        MERGE (a)-[r:FAIL_NEXT]->(b)
-        ON CREATE SET r.count = 1, r.first_seen = $ts, r.last_seen = $ts
-        ON MATCH SET r.count = r.count + 1, r.last_seen = $ts
-        RETURN r
-        """
         with self._driver.session() as session:
-            return session.run(query, from_kw=from_kw, to_kw=to_kw, ts=ts).single()
\ No newline at end of file
+            return session.run(
+                CREATE_FAIL_NEXT_RELATION, from_kw=from_kw, to_kw=to_kw, ts=ts
+            ).single()
+
+
+def _plan_operators(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """EXPLAIN plan 트리를 전위 순회하며 연산자 이름을 모은다"""
+    if not plan:
+        return []
+    # Neo4j 5 의 operatorType 은 "NodeIndexSeek@neo4j" 형태
+    operators = [plan.get("operatorType", "").split("@")[0]]
+    for child in plan.get("children", []):
+        operators.extend(_plan_operators(child))
+    return operators
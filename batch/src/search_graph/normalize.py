@@ -0,0 +1,108 @@
+# src/search_graph/normalize.py
+"""
+검색어 → Keyword.name 정규화 (배치 적재 / API 조회 공통).
+
+"테라 ", "ＴＥＲＲＡ", "terra" 처럼 표기만 다른 검색어가 서로 다른 Keyword 노드가 되지 않도록
+아래 순서로 정규화한다. 배치와 API 가 같은 규칙을 써야 조회 키가 맞는다.
+
+1) NFKC     : 전각/반각, 호환 문자 통일 (ＴＥＲＲＡ → TERRA, ㈜ → (주))
+2) casefold : 대소문자 통일 (TERRA → terra)
+3) 공백     : 앞뒤 공백 제거 + 연속 공백(탭/줄바꿈 포함)을 공백 하나로
+4) replacements : 설정의 [정규식, 치환 문자열] 규칙을 순서대로 적용하고 1)~3) 을 다시 적용.
+                   치환 결과가 다시 규칙에 걸릴 수 있으므로 더 바뀌지 않을 때까지 반복한다
+                   (정규화 결과를 다시 정규화해도 같아야 API 조회 키와 Keyword.name 이 맞는다)
+
+같은 검색어가 계속 반복되므로 결과를 LRU 로 메모이즈하고, 결과 문자열은 sys.intern 해서
+전이 처리 루프의 dict 키들이 같은 객체를 공유하게 한다.
+"""
+import re
+import sys
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# 치환 규칙 반복 상한 (문자열을 늘리기만 하는 규칙이 있어도 끝나도록)
+MAX_REPLACEMENT_ROUNDS = 8
+
+
+@dataclass
+class NormalizeConfig:
+    enabled: bool = True
+    nfkc: bool = True
+    casefold: bool = True
+    collapse_whitespace: bool = True
+    # [정규식, 치환 문자열] 목록 (예: ["[\"'`]", ""] → 따옴표 제거)
+    replacements: List[Tuple[str, str]] = field(default_factory=list)
+    # 메모이즈할 서로 다른 원문 수
+    cache_size: int = 1 << 18
+
+    @classmethod
+    def from_dict(cls, section: Optional[Dict[str, Any]]) -> "NormalizeConfig":
+        """config.yml 의 normalize 섹션 → NormalizeConfig (없는 키는 기본값)"""
+        section = section or {}
+        return cls(
+            enabled=bool(section.get("enabled", True)),
+            nfkc=bool(section.get("nfkc", True)),
+            casefold=bool(section.get("casefold", True)),
+            collapse_whitespace=bool(section.get("collapse_whitespace", True)),
+            replacements=[(str(p), str(r)) for p, r in section.get("replacements") or []],
+            cache_size=int(section.get("cache_size", 1 << 18)),
+        )
+
+
+class KeywordNormalizer:
+    def __init__(self, config: Optional[NormalizeConfig] = None):
+        self.config = config or NormalizeConfig()
+        self._replacements = [
+            (re.compile(pattern), repl) for pattern, repl in self.config.replacements
+        ]
+        self._cached = lru_cache(maxsize=self.config.cache_size)(self._normalize)
+
+    def __call__(self, raw: Optional[str]) -> str:
+        if not raw:
+            return ""
+        return self._cached(raw)
+
+    def _normalize(self, raw: str) -> str:
+        cfg = self.config
+        if not cfg.enabled:
+            return sys.intern(raw.strip())
+
+        text = self._basic(raw)
+        if self._replacements:
+            for _ in range(MAX_REPLACEMENT_ROUNDS):
+                replaced = text
+                for pattern, repl in self._replacements:
+                    replaced = pattern.sub(repl, replaced)
+                replaced = self._basic(replaced)
+                if replaced == text:
+                    break
+                text = replaced
+
+        return sys.intern(text)
+
+    def _basic(self, text: str) -> str:
+        """1) NFKC → 2) casefold → 3) 공백"""
+        cfg = self.config
+        if cfg.nfkc:
+            text = unicodedata.normalize("NFKC", text)
+        if cfg.casefold:
+            text = text.casefold()
+            if cfg.nfkc:
+                # casefold 결과가 NFKC 가 아닐 수 있어 한 번 더 (정규화 결과를 다시 정규화해도 같도록)
+                text = unicodedata.normalize("NFKC", text)
+        if cfg.collapse_whitespace:
+            return " ".join(text.split())
+        return text.strip()
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+
+# 설정 없이 쓰는 기본 정규화기 (NormalizeConfig 기본값)
+default_normalizer = KeywordNormalizer()
+
+
+def normalize_keyword(raw: Optional[str]) -> str:
+    return default_normalizer(raw)
@@ -0,0 +1,155 @@
+# src/search_graph/recommend_snapshot.py
+"""
+다음 검색어 추천 스냅샷 파일 포맷 (배치가 쓰고 API 가 읽는다).
+
+디렉토리 구조
+    <snapshot_dir>/recommend-<version>.json.gz   : 스냅샷 본문
+    <snapshot_dir>/LATEST                        : 현재 스냅샷 파일명 (원자적 교체)
+    새 스냅샷을 쓰면 최신 keep 개만 남기고 이전 스냅샷 파일은 지운다.
+
+본문(gzip JSON)
+    {"format_version": 1, "version": "...", "created_at": "...", "top_n": 20,
+     "items": {"<keyword>": {"next": [[name, count], ...], "fail_next": [[name, count], ...]}}}
+"""
+import gzip
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+LATEST_FILE = "LATEST"
+# 교체 직전에 LATEST 를 읽은 API 가 이전 파일을 열 수 있도록 최소 2 개는 남긴다
+KEEP_SNAPSHOTS = 3
+
+Successors = List[Tuple[str, int]]
+
+
+@dataclass
+class RecommendSnapshot:
+    version: str
+    created_at: str
+    top_n: int
+    items: Dict[str, Dict[str, Successors]] = field(default_factory=dict)
+
+
+def write_snapshot(
+    snapshot_dir: str,
+    rows: Iterable[Tuple[str, Successors, Successors]],
+    top_n: int,
+    keep: int = KEEP_SNAPSHOTS,
+) -> str:
+    """
+    (keyword, next 상위 목록, fail_next 상위 목록) 스트림을 새 스냅샷 파일로 쓰고
+    LATEST 를 원자적으로 교체한다. 최신 keep 개 밖의 스냅샷은 지운다. 생성된 스냅샷 경로를 반환.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    now = datetime.now(timezone.utc)
+    version = now.strftime("%Y%m%dT%H%M%S%fZ")
+    filename = f"recommend-{version}.json.gz"
+    path = os.path.join(snapshot_dir, filename)
+    tmp_path = path + ".tmp"
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "created_at": now.isoformat(timespec="seconds"),
+        "top_n": top_n,
+    }
+
+    count = 0
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        # items 는 한 줄씩 이어 써서 전체 테이블을 메모리에 올리지 않는다
+        f.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "items": {')
+        for keyword, next_list, fail_list in rows:
+            if count:
+                f.write(",")
+            f.write(json.dumps(keyword, ensure_ascii=False))
+            f.write(":")
+            f.write(json.dumps({"next": next_list, "fail_next": fail_list}, ensure_ascii=False))
+            count += 1
+        f.write("}}")
+
+    os.replace(tmp_path, path)
+    _write_latest(snapshot_dir, filename)
+    prune_snapshots(snapshot_dir, "recommend-", keep)
+
+    logger.info("추천 스냅샷 저장: %s (keywords=%d, top_n=%d)", path, count, top_n)
+    return path
+
+
+def _write_latest(snapshot_dir: str, filename: str):
+    latest = os.path.join(snapshot_dir, LATEST_FILE)
+    tmp = latest + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(filename)
+    os.replace(tmp, latest)
+
+
+def prune_snapshots(snapshot_dir: str, prefix: str, keep: int) -> List[str]:
+    """
+    prefix 로 시작하는 스냅샷 파일을 이름(= 생성 시각) 순으로 최신 keep 개만 남기고 지운다.
+    LATEST 가 가리키는 파일은 항상 남긴다. 지운 파일명 목록을 반환.
+    쓰는 중인 .tmp 파일은 건드리지 않는다.
+    """
+    latest = latest_snapshot_path(snapshot_dir)
+    current = os.path.basename(latest) if latest else None
+    names = sorted(
+        name
+        for name in os.listdir(snapshot_dir)
+        if name.startswith(prefix) and not name.endswith(".tmp")
+    )
+
+    removed = []
+    for name in names[: -max(keep, 1)]:
+        if name == current:
+            continue
+        try:
+            os.remove(os.path.join(snapshot_dir, name))
+        except FileNotFoundError:
+            continue
+        except OSError:
+            logger.warning("이전 스냅샷 삭제 실패: %s", name, exc_info=True)
+            continue
+        removed.append(name)
+
+    if removed:
+        logger.info("이전 스냅샷 %d 개 삭제 (%s)", len(removed), snapshot_dir)
+    return removed
+
+
+def latest_snapshot_path(snapshot_dir: str) -> Optional[str]:
+    """LATEST 가 가리키는 스냅샷 경로 (없으면 None)"""
+    try:
+        with open(os.path.join(snapshot_dir, LATEST_FILE), encoding="utf-8") as f:
+            filename = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(snapshot_dir, filename) if filename else None
+
+
+def load_snapshot(path: str) -> RecommendSnapshot:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        raw = json.load(f)
+
+    if raw.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 추천 스냅샷 포맷: {raw.get('format_version')}")
+
+    items = {
+        keyword: {
+            "next": [(name, count) for name, count in entry.get("next", [])],
+            "fail_next": [(name, count) for name, count in entry.get("fail_next", [])],
+        }
+        for keyword, entry in raw.get("items", {}).items()
+    }
+    return RecommendSnapshot(
+        version=raw["version"],
+        created_at=raw["created_at"],
+        top_n=raw["top_n"],
+        items=items,
+    )
@@ -1,10 +1,23 @@
 # src/search_graph/search_log_processor.py
 import logging
+import threading
 from collections import Counter
-from typing import Any, Dict, Tuple, List
-
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import groupby
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple, Optional, Union
+
+from .async_pipeline import AsyncPcidPipeline, PipelineConfig
+from .bulk_import import write_import_csvs
+from .checkpoint import CheckpointStore
+from .edge_accumulator import EdgeAccumulator
 from .es_client import ElasticsearchService
-from .neo4j_client import Neo4jService
+from .events import SearchEvent, event_source_fields, is_fail_event, iter_events
+from .fail_pairs import CounterAggregator, FailPairAggregator, write_fail_pairs_csv
+from .hit_cache import HitCache
+from .neo4j_client import Neo4jBatchWriter, Neo4jService
+from .normalize import KeywordNormalizer, default_normalizer
+from .sources import ElasticsearchEventSource, EventSource, date_range_filter
 
 logger = logging.getLogger(__name__)
 
@@ -13,11 +26,17 @@ class SearchLogProcessor:
     def __init__(
         self,
         es: ElasticsearchService,
-        neo: Neo4jService,
+        # rebuild / dump / verify_transitions 처럼 Neo4j 에 연결하지 않는 모드는 None
+        neo: Optional[Neo4jService],
         index_name: str,
         query_file: str,
         key_field: str = "query_log",
         fail_pair_csv_path: str = "./result/fail_pair_candidates.csv",
+        checkpoint: Optional[CheckpointStore] = None,
+        source: Optional[EventSource] = None,
+        hit_cache: Optional[HitCache] = None,
+        fail_pair_aggregator: Callable[[], FailPairAggregator] = CounterAggregator,
+        normalizer: Optional[KeywordNormalizer] = None,
     ):
         self.es = es
         self.neo = neo
@@ -25,6 +44,18 @@ class SearchLogProcessor:
         self.query_file = query_file
         self.key_field = key_field
         self.fail_pair_csv_path = fail_pair_csv_path
+        self.checkpoint = checkpoint
+        # 단일 패스 처리(process_range / rebuild) 입력. 기본은 운영 ES
+        self.source = source or ElasticsearchEventSource(es, index_name, key_field=key_field)
+        # PCID 별 조회 결과 디스크 캐시 (fetch_hits_by_pcid)
+        self.hit_cache = hit_cache
+        # 실행 전체 FAIL_NEXT 후보 집계기 생성 함수 (memory / sqlite spill / top-k)
+        self.fail_pair_aggregator = fail_pair_aggregator
+        # search_query → Keyword.name 정규화 (API 와 같은 규칙이어야 한다)
+        self.normalizer = normalizer or default_normalizer
+        # flush 를 기다리는 PCID 별 FAIL_NEXT 후보 (완료 기록과 함께 체크포인트에 저장)
+        self._pending_fail_pairs: Dict[str, Counter[Tuple[str, str]]] = {}
+        self._pending_lock = threading.Lock()
 
     # ---------------------------------------------------------
     # 1) 기존 전체 로그 처리 (query_file 기반)
@@ -38,15 +69,16 @@ class SearchLogProcessor:
             self.key_field,
         )
 
-        response = self.es.search_with_query_file(
+        # PIT + search_after 스트리밍 (10,000건 제한 없음)
+        hits = self.es.iter_query_file_hits(
             index_name=self.index_name,
             query_file=self.query_file,
+            source_fields=event_source_fields(self.key_field),
         )
 
-        hits = response.get("hits", {}).get("hits", [])
-
         # 공통 로직 재사용
-        fail_pairs = self.process_hits(hits)
+        fail_pairs = self.fail_pair_aggregator()
+        fail_pairs.update(self.process_hits(hits))
 
         # FAIL_NEXT 후보 CSV 출력
         self._write_fail_pairs_csv(fail_pairs)
@@ -56,22 +88,19 @@ class SearchLogProcessor:
     # ---------------------------------------------------------
     # 2) FAIL_NEXT 후보 CSV 저장
     # ---------------------------------------------------------
-    def _write_fail_pairs_csv(self, fail_pairs: Counter[Tuple[str, str]]):
-        import os
-
-        # 결과 디렉토리 없으면 만들기
-        os.makedirs(os.path.dirname(self.fail_pair_csv_path), exist_ok=True)
-
-        with open(self.fail_pair_csv_path, "w", encoding="utf-8") as f:
-            f.write("A,B,pair_count\n")
-            for (a, b), c in fail_pairs.most_common():
-                f.write(f"{a},{b},{c}\n")
+    def _write_fail_pairs_csv(self, fail_pairs: FailPairAggregator) -> int:
+        """count 내림차순으로 스트리밍 저장 후 집계기를 닫는다. 저장한 행 수 반환"""
+        try:
+            rows = write_fail_pairs_csv(fail_pairs, self.fail_pair_csv_path)
+        finally:
+            fail_pairs.close()
 
         logger.info(
             "FAIL_NEXT 후보 CSV 저장: %s (rows=%d)",
             self.fail_pair_csv_path,
-            len(fail_pairs),
+            rows,
         )
+        return rows
 
     # ---------------------------------------------------------
     # 3) user_pcid 집계 → CSV 저장
@@ -130,68 +159,83 @@ class SearchLogProcessor:
         gte: str,
         lte: str,
         size: int = 10000,
-    ) -> List[Dict[str, Any]]:
+        exclusive_start: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
         """
         특정 pcid에 대한 로그를 시간순으로 조회.
         기존 query file 방식이 아닌, processor 내부에서 쿼리를 직접 생성한다.
+
+        결과는 PIT + search_after 로 size 건씩 페이지를 넘기며 스트리밍되므로
+        건수 제한 없이 전부 읽고, 메모리에는 한 페이지만 유지된다.
+        대부분의 PCID 는 한 페이지에 다 들어오므로 먼저 PIT 없이 한 번 검색하고,
+        한 페이지가 가득 찼을 때만 PIT 를 연다 (try_single_page).
+        hit_cache 가 있으면 (pcid, 기간, 쿼리) 가 같은 조회는 디스크 캐시에서 읽는다.
         """
         logger.info("PCID별 로그 조회 시작: pcid=%s", pcid)
 
-        body = {
+        body = self._pcid_query_body(pcid, gte, lte, exclusive_start)
+
+        if self.hit_cache is None:
+            return self.es.iter_hits(self.index_name, body, page_size=size, try_single_page=True)
+
+        key = HitCache.make_key(self.index_name, pcid, gte, lte, body)
+        cached = self.hit_cache.get(key)
+        if cached is not None:
+            return iter(cached)
+        return self.hit_cache.cached(
+            key, self.es.iter_hits(self.index_name, body, page_size=size, try_single_page=True)
+        )
+
+    def _pcid_query_body(
+        self, pcid: str, gte: str, lte: str, exclusive_start: bool = False
+    ) -> Dict[str, Any]:
+        """PCID 한 명의 기간 내 로그를 시간순으로 받는 검색 body"""
+        return {
             "query": {
                 "bool": {
                     "must": [
                         {"term": {"query_log.user_pcid.keyword": pcid}},
                     ],
                     "filter": [
-                        {
-                            "range": {
-                                "query_log.created_date_time": {
-                                    "gte": gte,
-                                    "lte": lte,
-                                }
-                            }
-                        }
+                        date_range_filter(gte, lte, exclusive_start),
                     ],
                 }
             },
             "sort": [{"query_log.created_date_time": {"order": "asc"}}],
-            "size": size,
+            # 전이 처리에 필요한 필드만 받는다
+            "_source": event_source_fields(self.key_field),
         }
 
-        response = self.es.client.search(
-            index=self.index_name,
-            body=body,
-        )
-
-        hits = response.get("hits", {}).get("hits", [])
-        logger.info("PCID=%s hits 개수: %d", pcid, len(hits))
-
-        return hits
-
     # ---------------------------------------------------------
     # 5) hits 배열 하나를 받아서 그래프/FAIL_NEXT 처리
     #    (공통 처리 로직)
+    #    - writer 를 넘기지 않으면 배치 writer 를 하나 열어서
+    #      처리가 끝날 때 flush 한다.
+    #    - writer 자리에 EdgeAccumulator 를 넘기면 그래프에 쓰지 않고
+    #      delta 만 누적한다.
     # ---------------------------------------------------------
-    def process_hits(self, hits: List[Dict[str, Any]]) -> Counter[Tuple[str, str]]:
+    def process_hits(
+        self,
+        hits: Iterable[Union[Dict[str, Any], SearchEvent]],
+        writer: Optional[Union[Neo4jBatchWriter, EdgeAccumulator]] = None,
+    ) -> Counter[Tuple[str, str]]:
+        if writer is None:
+            with self.neo.batch_writer() as own_writer:
+                return self.process_hits(hits, writer=own_writer)
+
         prev_key = ""
         prev_date = ""
         pending_fail_A = ""
         fail_pairs: Counter[Tuple[str, str]] = Counter()
 
-        for hit in hits:
-            source: Dict[str, Any] = hit.get("_source", {})
-            query_log: Dict[str, Any] = source.get(self.key_field, {})
-
-            # A/B는 일단 search_query 기준 (원하면 input_query로 바꿀 수 있음)
-            key = str(query_log.get("search_query") or "").strip()
-            created_dt = str(query_log.get("created_date_time") or "")
-            created_date = created_dt[:10] if created_dt else ""
+        for event in iter_events(hits, self.key_field, self.normalizer):
+            # A/B는 일단 search_query 기준 (SearchEvent.from_hit 에서 정규화)
+            key = event.query
+            created_dt = event.created_dt
+            created_date = created_dt[:10]
 
-            # TODO: 실제 운영에서는 result_count == 0 인 경우만 실패로 볼 예정
-            # result_count = query_log.get("result_count", None)
-            # is_fail = (result_count == 0)
-            is_fail = True  # 현재는 MVP용: 일단 모두 실패로 간주
+            # 실패 기준은 is_fail_event 한 곳에서 관리 (현재 MVP: 모두 실패)
+            is_fail = is_fail_event(event)
 
             if not key or not created_date:
                 continue
@@ -202,16 +246,16 @@ class SearchLogProcessor:
                 pending_fail_A = ""
 
             # 1) Keyword 노드 MERGE
-            self.neo.merge_keyword(key)
+            writer.merge_keyword(key)
 
             # 2) 인접 전이 NEXT (같은 날짜 내에서만)
             if prev_key and created_date == prev_date and prev_key != key:
-                self.neo.create_next_relation(prev_key, key)
+                writer.add_next(prev_key, key)
 
             # 3) 실패쌍 FAIL_NEXT 후보: "A가 실패였고 다음 검색어가 B"
             if pending_fail_A and pending_fail_A != key:
                 # Neo4j에 FAIL_NEXT 누적
-                self.neo.create_fail_next_relation(pending_fail_A, key, created_dt)
+                writer.add_fail_next(pending_fail_A, key, created_dt)
                 # CSV 집계 누적
                 fail_pairs[(pending_fail_A, key)] += 1
                 # 한 번 매칭하면 대기 해제 (A 다음 검색 1개만 붙이는 MVP)
@@ -239,13 +283,18 @@ class SearchLogProcessor:
         gte: str,
         lte: str,
         size: int = 10000,
+        writer: Optional[Neo4jBatchWriter] = None,
+        exclusive_start: bool = False,
     ) -> Counter[Tuple[str, str]]:
         """
         하나의 PCID에 대해 검색 시퀀스를 Neo4j에 반영하고,
         fail_next 후보를 Counter로 반환한다.
+
+        PCID 하나의 delta 를 먼저 모은 뒤 writer 에 한꺼번에 합치므로
+        flush 는 항상 PCID 경계에서 일어난다 (체크포인트 완료 기록 단위).
         """
-        hits = self.fetch_hits_by_pcid(pcid, gte, lte, size)
-        fail_pairs = self.process_hits(hits)
+        hits = self.fetch_hits_by_pcid(pcid, gte, lte, size, exclusive_start)
+        fail_pairs = self._process_sequence(pcid, hits, writer)
 
         logger.info(
             "PCID 처리 완료: pcid=%s, fail_pairs=%d",
@@ -258,6 +307,8 @@ class SearchLogProcessor:
     # 7) user_pcid 리스트 전체 처리
     #    - CSV(user_pcid_list.csv)를 읽어서
     #      각 PCID에 대해 process_pcid 수행
+    #    - workers > 1 이면 워커 풀에서 PCID 를 병렬 처리
+    #    - pipeline 을 주면 asyncio 파이프라인(ES 조회/전이 계산/적재 동시 진행)으로 처리
     #    - 최종 FAIL_NEXT 후보를 CSV로 저장
     # ---------------------------------------------------------
     def process_all_pcids(
@@ -266,32 +317,463 @@ class SearchLogProcessor:
         gte: str,
         lte: str,
         size: int = 10000,
-    ) -> Counter[Tuple[str, str]]:
+        workers: int = 1,
+        exclusive_start: bool = False,
+        pipeline: Optional[PipelineConfig] = None,
+    ) -> int:
         """
         CSV에 담긴 user_pcid 리스트를 읽어서
         각 PCID에 대해 process_pcid() 수행 후,
-        FAIL_NEXT 후보를 합산하여 CSV로 저장한다.
+        FAIL_NEXT 후보를 합산하여 CSV로 저장한다. (저장한 후보 행 수 반환)
+
+        checkpoint 가 있으면 같은 기간에 이미 적재가 끝난 PCID 는 건너뛰고,
+        FAIL_NEXT 후보는 이전 실행에서 완료된 PCID 몫부터 이어서 집계한다.
+        PCID 목록은 기간 전체 로그가 아닐 수 있으므로 watermark 는 갱신하지 않는다
+        (watermark 는 기간 전체를 처리하는 process_range 만 옮긴다).
         """
+        range_key = CheckpointStore.range_key(gte, lte)
+        pcids = self._load_pcids(pcid_list_file, range_key)
+        token_scope = self._token_scope("pcids", range_key)
+        applied = self._applied_tokens(token_scope)
+
+        logger.info(
+            "PCID 전체 처리 시작: %d명 (workers=%d, pipeline=%s)",
+            len(pcids),
+            workers,
+            pipeline is not None,
+        )
+
+        total_fail_pairs = self._fail_pair_totals(range_key)
+
+        if pipeline is not None:
+            AsyncPcidPipeline(self, pipeline).run(
+                pcids, gte, lte, size, range_key, exclusive_start, total_fail_pairs, applied
+            )
+        elif workers > 1:
+            self._process_pcids_parallel(
+                pcids,
+                gte,
+                lte,
+                size,
+                workers,
+                range_key,
+                exclusive_start,
+                total_fail_pairs,
+                applied,
+            )
+        else:
+            # 전체 PCID 를 하나의 배치 writer 로 적재 (batch_size 단위 flush)
+            with self._pcid_writer(range_key, applied) as writer:
+                for pcid in pcids:
+                    fail_pairs = self.process_pcid(
+                        pcid, gte, lte, size, writer=writer, exclusive_start=exclusive_start
+                    )
+                    total_fail_pairs.update(fail_pairs)
+
+        if token_scope is not None:
+            # 모든 PCID 의 완료 기록이 끝났으므로 Neo4j 쪽 적재 표시는 더 필요 없다
+            self.neo.clear_applied_tokens(token_scope)
+
+        logger.info(
+            "PCID 전체 처리 완료: 총 fail_pairs=%d",
+            len(total_fail_pairs),
+        )
+        if self.hit_cache is not None:
+            self.hit_cache.log_stats()
+
+        # 전체 PCID 기반 FAIL_NEXT 후보를 CSV로 저장
+        return self._write_fail_pairs_csv(total_fail_pairs)
+
+    def _load_pcids(self, pcid_list_file: str, range_key: str) -> List[str]:
+        """user_pcid 리스트 CSV 를 읽고, 체크포인트에 완료로 기록된 PCID 는 뺀다"""
         import csv
 
         with open(pcid_list_file, encoding="utf-8") as f:
             reader = csv.DictReader(f)
             pcids = [row["user_pcid"] for row in reader]
 
-        logger.info("PCID 전체 처리 시작: %d명", len(pcids))
+        if self.checkpoint is not None:
+            completed = self.checkpoint.completed_pcids(range_key)
+            if completed:
+                pcids = [pcid for pcid in pcids if pcid not in completed]
+                logger.info("체크포인트 재개: 완료된 PCID %d명 건너뜀", len(completed))
+        return pcids
 
-        total_fail_pairs: Counter[Tuple[str, str]] = Counter()
+    def _process_pcids_parallel(
+        self,
+        pcids: List[str],
+        gte: str,
+        lte: str,
+        size: int,
+        workers: int,
+        range_key: str,
+        exclusive_start: bool,
+        total_fail_pairs: FailPairAggregator,
+        applied: Optional[Dict[str, Set[str]]] = None,
+    ):
+        """
+        워커 스레드마다 자기 배치 writer 를 하나씩 두고
+        PCID 단위로 fetch_hits_by_pcid + process_hits 를 수행한다.
+        PCID 별 fail_pairs 는 공유 집계기(total_fail_pairs)에 바로 합산한다.
+
+        여러 워커가 같은 키워드/간선을 동시에 갱신해도 안전하도록
+        - flush 행은 (from_kw, to_kw) 정렬 순서로 적재해 락 획득 순서를 맞추고
+        - managed write 트랜잭션(execute_write)이 DeadlockDetected 같은
+          transient 에러를 자동 재시도한다.
 
-        for pcid in pcids:
-            fail_pairs = self.process_pcid(pcid, gte, lte, size)
+        PCID 는 워커 수의 2배까지만 미리 제출한다. 한 PCID 가 실패하면 아직 시작하지 않은
+        PCID 는 취소하고 (실행 중인 것만 기다린 뒤) 바로 예외를 올린다.
+        """
+        local = threading.local()
+        writers: List[Neo4jBatchWriter] = []
+        writers_lock = threading.Lock()
+
+        def run(pcid: str):
+            if not hasattr(local, "writer"):
+                local.writer = self._pcid_writer(range_key, applied)
+                with writers_lock:
+                    writers.append(local.writer)
+
+            fail_pairs = self.process_pcid(
+                pcid, gte, lte, size, writer=local.writer, exclusive_start=exclusive_start
+            )
             total_fail_pairs.update(fail_pairs)
 
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pcid-worker")
+        pending = set()
+        try:
+            for pcid in pcids:
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(pool.submit(run, pcid))
+            for future in wait(pending).done:
+                future.result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            # 워커별 남은 버퍼 flush
+            for writer in writers:
+                writer.close()
+
+    def _pcid_writer(
+        self, range_key: str, applied: Optional[Dict[str, Set[str]]] = None
+    ) -> Neo4jBatchWriter:
+        """
+        flush 가 끝난 PCID 를 체크포인트에 완료로 기록하는 배치 writer.
+        flush 트랜잭션에 PCID 목록(AppliedBatch)도 남기므로, Neo4j 커밋 뒤 완료 기록 전에
+        중단돼도 재개 시 applied 로 그 PCID 의 delta 를 다시 더하지 않는다.
+        """
+        writer = self.neo.batch_writer(
+            token_scope=self._token_scope("pcids", range_key), applied=applied
+        )
+        if self.checkpoint is not None:
+            writer.add_flush_listener(lambda pcids: self._complete_pcids(range_key, pcids))
+        return writer
+
+    def _token_scope(self, kind: str, range_key: str) -> Optional[str]:
+        """AppliedBatch 표시 범위 (checkpoint 가 없으면 재개하지 않으므로 남기지 않는다)"""
+        if self.checkpoint is None:
+            return None
+        return f"{kind}:{self.index_name}:{range_key}"
+
+    def _applied_tokens(self, token_scope: Optional[str]) -> Optional[Dict[str, Set[str]]]:
+        """이전 실행이 Neo4j 에 적재했다고 남긴 PCID (완료 기록 전에 중단된 flush 포함)"""
+        if token_scope is None:
+            return None
+        applied = self.neo.applied_tokens(token_scope)
+        if applied:
+            logger.info("체크포인트 재개: Neo4j 적재 표시가 남은 PCID %d명", len(applied))
+        return applied
+
+    def _fail_pair_totals(self, range_key: str) -> FailPairAggregator:
+        """실행 전체 FAIL_NEXT 후보 집계기. 재개면 체크포인트에 저장된 완료 PCID 몫부터 채운다"""
+        total_fail_pairs = self.fail_pair_aggregator()
+        if self.checkpoint is not None:
+            restored = 0
+            for chunk in self.checkpoint.iter_fail_pairs(range_key):
+                total_fail_pairs.update(chunk)
+                restored += len(chunk)
+            if restored:
+                logger.info("체크포인트 재개: FAIL_NEXT 후보 %d쌍 복원", restored)
+        return total_fail_pairs
+
+    def _remember_fail_pairs(self, pcid: str, fail_pairs: Counter[Tuple[str, str]]):
+        """PCID 의 delta 가 flush 될 때까지 FAIL_NEXT 후보를 들고 있는다 (체크포인트 저장용)"""
+        if self.checkpoint is None:
+            return
+        with self._pending_lock:
+            self._pending_fail_pairs[pcid] = fail_pairs
+
+    def _take_fail_pairs(self, pcids: Iterable[str]) -> Counter[Tuple[str, str]]:
+        taken: Counter[Tuple[str, str]] = Counter()
+        with self._pending_lock:
+            for pcid in pcids:
+                taken.update(self._pending_fail_pairs.pop(pcid, Counter()))
+        return taken
+
+    def _complete_pcids(self, range_key: str, pcids: List[str]):
+        """flush listener: 적재가 끝난 PCID 와 그 FAIL_NEXT 후보를 한 번에 체크포인트에 기록"""
+        self.checkpoint.mark_completed(range_key, pcids, self._take_fail_pairs(pcids))
+
+    def _process_sequence(
+        self,
+        pcid: str,
+        hits: Iterable[Dict[str, Any]],
+        writer: Optional[Neo4jBatchWriter],
+    ) -> Counter[Tuple[str, str]]:
+        """PCID 한 명의 시퀀스를 누적한 뒤 writer 에 token=pcid 로 합친다"""
+        acc = EdgeAccumulator()
+        fail_pairs = self.process_hits(hits, writer=acc)
+
+        if writer is None:
+            with self.neo.batch_writer() as own_writer:
+                own_writer.merge(acc)
+        else:
+            # merge 안에서 flush 되면 listener 가 바로 꺼내 가므로 먼저 넣어 둔다
+            self._remember_fail_pairs(pcid, fail_pairs)
+            writer.merge(acc, token=pcid)
+        return fail_pairs
+
+    # ---------------------------------------------------------
+    # 8) 기간 전체 단일 패스 처리 (sessionizer)
+    #    - PCID 목록 집계/CSV 없이 [gte, lte] 기간 로그를
+    #      user_pcid → created_date_time 순으로 한 번만 스트리밍
+    #    - 스트림을 PCID 경계에서 잘라 process_hits 에 그대로 넘긴다
+    # ---------------------------------------------------------
+    def iter_range_sequences(
+        self,
+        gte: str,
+        lte: str,
+        size: int = 10000,
+        exclusive_start: bool = False,
+        after_pcid: Optional[str] = None,
+    ) -> Iterator[Tuple[str, Iterator[SearchEvent]]]:
+        """
+        기간 내 전체 로그를 (pcid, 해당 pcid 의 시간순 SearchEvent) 단위로 나눠 yield 한다.
+        소스(ES PIT 스트림 또는 덤프 파일)를 한 번만 읽고, 한 사용자 시퀀스도 메모리에 올리지 않는다.
+        after_pcid 를 주면 그 PCID 다음부터 읽는다 (중단 후 재개용).
+        """
+        hits = self.source.iter_hits(
+            gte, lte, page_size=size, exclusive_start=exclusive_start, after_pcid=after_pcid
+        )
+        return groupby(iter_events(hits, self.key_field, self.normalizer), key=attrgetter("pcid"))
+
+    def process_range(
+        self,
+        gte: str,
+        lte: str,
+        size: int = 10000,
+        exclusive_start: bool = False,
+    ) -> int:
+        """
+        [gte, lte] 기간 로그를 한 번의 스트림으로 읽어 PCID 별 전이를 적재하고,
+        FAIL_NEXT 후보를 합산하여 CSV로 저장한다. (저장한 후보 행 수 반환)
+        (export_pcid → process_all_pcids 의 N+1 쿼리를 대체)
+
+        checkpoint 가 있으면 flush 가 끝난 마지막 PCID 와 그때까지의 FAIL_NEXT 후보를 기록해 두고
+        재실행 시 그 다음 PCID 부터 (후보 집계도 이어서) 처리한다.
+        이미 완료된 기간은 다시 적재하지 않고 건너뛴다 (count 가 두 번 더해지므로).
+        """
+        range_key = CheckpointStore.range_key(gte, lte)
+        token_scope = self._token_scope("range", range_key)
+        after_pcid = None
+        if self.checkpoint is not None:
+            if self.checkpoint.is_range_completed(range_key):
+                logger.warning("이미 완료된 기간이라 건너뜁니다: %s", range_key)
+                # 완료 기록 직후 중단됐다면 남아 있을 수 있는 AppliedBatch 정리
+                self.neo.clear_applied_tokens(token_scope)
+                return 0
+            after_pcid = self.checkpoint.get_progress(range_key)
+            if after_pcid:
+                logger.info("체크포인트 재개: pcid > %s 부터 처리", after_pcid)
+
+        logger.info("기간 단일 패스 처리 시작: gte=%s, lte=%s, size=%d", gte, lte, size)
+
+        total_fail_pairs = self._fail_pair_totals(range_key)
+        sequences = 0
+
+        writer = self.neo.batch_writer(
+            token_scope=token_scope, applied=self._applied_tokens(token_scope)
+        )
+        if self.checkpoint is not None:
+            writer.add_flush_listener(
+                lambda pcids: self.checkpoint.set_progress(
+                    range_key, pcids[-1], self._take_fail_pairs(pcids)
+                )
+            )
+
+        with writer:
+            for pcid, hits in self.iter_range_sequences(
+                gte, lte, size, exclusive_start=exclusive_start, after_pcid=after_pcid
+            ):
+                if not pcid:
+                    continue
+                total_fail_pairs.update(self._process_sequence(pcid, hits, writer))
+                sequences += 1
+
+        if self.checkpoint is not None:
+            self.checkpoint.complete_range(range_key, self.index_name, lte)
+            self.neo.clear_applied_tokens(token_scope)
+
         logger.info(
-            "PCID 전체 처리 완료: 총 fail_pairs=%d",
+            "기간 단일 패스 처리 완료: pcids=%d, 총 fail_pairs=%d",
+            sequences,
             len(total_fail_pairs),
         )
 
-        # 전체 PCID 기반 FAIL_NEXT 후보를 CSV로 저장
+        return self._write_fail_pairs_csv(total_fail_pairs)
+
+    # ---------------------------------------------------------
+    # 9) 전체 재구축: 트랜잭션 적재 대신 neo4j-admin import CSV 생성
+    #    - process_range 와 같은 단일 스트림을 EdgeAccumulator 하나에 모두 합산
+    #    - Neo4j 에는 쓰지 않는다 (적재는 DB 를 멈추고 neo4j-admin 으로)
+    # ---------------------------------------------------------
+    def rebuild(
+        self,
+        gte: str,
+        lte: str,
+        output_dir: str,
+        size: int = 10000,
+        vectorized: bool = False,
+        chunk_events: int = 1_000_000,
+    ) -> Dict[str, str]:
+        """
+        [gte, lte] 기간 전체를 집계해 import CSV 를 쓰고 {종류: 경로} 를 반환.
+        vectorized 면 chunk_events 건씩(PCID 경계 유지) NumPy 컬럼 구현으로 전이를 계산한다.
+        """
+        logger.info(
+            "전체 재구축 집계 시작: gte=%s, lte=%s, size=%d, vectorized=%s",
+            gte, lte, size, vectorized,
+        )
+
+        acc = EdgeAccumulator()
+        total_fail_pairs = self.fail_pair_aggregator()
+        sequences = 0
+
+        if vectorized:
+            from .vector_transitions import columns_from_events, extract_transitions
+
+            for chunk, pcids in self._iter_event_chunks(gte, lte, size, chunk_events):
+                part, fail_pairs = extract_transitions(columns_from_events(chunk))
+                acc.merge(part)
+                total_fail_pairs.update(fail_pairs)
+                sequences += pcids
+        else:
+            for pcid, events in self.iter_range_sequences(gte, lte, size):
+                if not pcid:
+                    continue
+                total_fail_pairs.update(self.process_hits(events, writer=acc))
+                sequences += 1
+
+        logger.info(
+            "전체 재구축 집계 완료: pcids=%d, keywords=%d, next=%d, fail_next=%d",
+            sequences,
+            len(acc.keywords),
+            len(acc.next_counts),
+            len(acc.fail_counts),
+        )
+
+        paths = write_import_csvs(acc, output_dir)
         self._write_fail_pairs_csv(total_fail_pairs)
+        return paths
 
-        return total_fail_pairs
+    def _iter_event_chunks(
+        self,
+        gte: str,
+        lte: str,
+        size: int,
+        chunk_events: int,
+    ) -> Iterator[Tuple[List[SearchEvent], int]]:
+        """기간 스트림을 PCID 경계에서 끊어 (이벤트 목록, PCID 수) 묶음으로 yield"""
+        chunk: List[SearchEvent] = []
+        pcids = 0
+        for pcid, events in self.iter_range_sequences(gte, lte, size):
+            if not pcid:
+                continue
+            chunk.extend(events)
+            pcids += 1
+            if len(chunk) >= chunk_events:
+                yield chunk, pcids
+                chunk, pcids = [], 0
+        if chunk:
+            yield chunk, pcids
+
+    # ---------------------------------------------------------
+    # 10) 전이 계산 검증: 같은 입력에 대해 루프(process_hits)와
+    #     NumPy 컬럼 구현의 NEXT/FAIL_NEXT 결과가 같은지 비교
+    # ---------------------------------------------------------
+    def verify_transitions(
+        self,
+        gte: str,
+        lte: str,
+        size: int = 10000,
+        chunk_events: int = 1_000_000,
+    ) -> List[str]:
+        """불일치 목록을 반환 (비어 있으면 두 구현의 결과가 같다)"""
+        from .vector_transitions import (
+            columns_from_events,
+            diff_accumulators,
+            extract_transitions,
+        )
+
+        loop_acc = EdgeAccumulator()
+        vector_acc = EdgeAccumulator()
+        loop_fail_pairs: Counter[Tuple[str, str]] = Counter()
+        vector_fail_pairs: Counter[Tuple[str, str]] = Counter()
+        events_total = 0
+
+        for chunk, _ in self._iter_event_chunks(gte, lte, size, chunk_events):
+            for _, events in groupby(chunk, key=attrgetter("pcid")):
+                loop_fail_pairs.update(self.process_hits(events, writer=loop_acc))
+
+            part, fail_pairs = extract_transitions(columns_from_events(chunk))
+            vector_acc.merge(part)
+            vector_fail_pairs.update(fail_pairs)
+            events_total += len(chunk)
+
+        diffs = diff_accumulators(loop_acc, vector_acc)
+        if loop_fail_pairs != vector_fail_pairs:
+            diffs.append("fail_pairs(CSV 후보) 집계가 다릅니다")
+
+        logger.info(
+            "전이 계산 검증: events=%d, next=%d, fail_next=%d, 불일치=%d",
+            events_total,
+            len(loop_acc.next_counts),
+            len(loop_acc.fail_counts),
+            len(diffs),
+        )
+        return diffs
+
+    # ---------------------------------------------------------
+    # 11) 기존 Keyword 정규화 마이그레이션
+    #     - 정규화 전에 적재된 "테라 " / "TERRA" 같은 노드를 정규화된 이름 하나로 합침
+    #     - NEXT / FAIL_NEXT count 는 합산
+    # ---------------------------------------------------------
+    def normalize_existing_keywords(self, dry_run: bool = False) -> Dict[str, str]:
+        """{기존 이름: 정규화된 이름} 합칠 목록을 반환 (dry_run 이면 DB 는 바꾸지 않음)"""
+        variants: Dict[str, str] = {}
+        names = 0
+        for name in self.neo.iter_keyword_names():
+            names += 1
+            target = self.normalizer(name)
+            if target == name:
+                continue
+            if not target:
+                logger.warning("정규화하면 빈 키워드라 건너뜀: %r", name)
+                continue
+            variants[name] = target
+
+        logger.info(
+            "Keyword 정규화 대상: 전체=%d, 합칠 노드=%d, 대상 이름=%d",
+            names,
+            len(variants),
+            len(set(variants.values())),
+        )
+        for name, target in list(variants.items())[:20]:
+            logger.info("  %r → %r", name, target)
+
+        if variants and not dry_run:
+            merged = self.neo.merge_keyword_variants(variants)
+            logger.info("Keyword 정규화 마이그레이션 완료: 합친 노드=%d", merged)
+        return variants
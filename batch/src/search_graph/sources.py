@@ -0,0 +1,203 @@
+# src/search_graph/sources.py
+"""
+검색 로그 이벤트 소스.
+
+SearchLogProcessor 의 단일 패스 처리(process_range / rebuild)는 소스가 돌려주는
+hit 을 user_pcid → created_date_time 오름차순이라고 보고 PCID 경계에서 자른다.
+user_pcid 나 created_date_time 이 없는 이벤트는 시퀀스에 넣을 수 없으므로 두 소스 모두 건너뛴다
+(ES 는 정렬 값이 없는 문서를 맨 뒤로 보내므로, 섞여 있으면 덤프 재생의 순서 검사와 어긋난다).
+
+- ElasticsearchEventSource : 운영 ES 를 PIT + search_after 로 스트리밍
+- FileEventSource          : ES hit / _source 덤프(NDJSON, .gz / .zst) 를 한 줄씩 재생
+"""
+import gzip
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from .es_client import ElasticsearchService
+from .events import event_source_fields
+
+logger = logging.getLogger(__name__)
+
+
+class EventSource(ABC):
+    @abstractmethod
+    def iter_hits(
+        self,
+        gte: str,
+        lte: str,
+        page_size: int = 10000,
+        exclusive_start: bool = False,
+        after_pcid: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        기간 내 hit 을 user_pcid → created_date_time 오름차순으로 yield 한다.
+        after_pcid 를 주면 그 PCID 다음부터 (중단 후 재개용).
+        """
+
+
+class ElasticsearchEventSource(EventSource):
+    def __init__(self, es: ElasticsearchService, index_name: str, key_field: str = "query_log"):
+        self.es = es
+        self.index_name = index_name
+        self.key_field = key_field
+
+    def iter_hits(
+        self,
+        gte: str,
+        lte: str,
+        page_size: int = 10000,
+        exclusive_start: bool = False,
+        after_pcid: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        filters: List[Dict[str, Any]] = [
+            date_range_filter(gte, lte, exclusive_start, key_field=self.key_field),
+            # 기간 필터가 created_date_time 없는 문서를 빼듯 user_pcid 없는 문서도 뺀다
+            {"exists": {"field": f"{self.key_field}.user_pcid.keyword"}},
+        ]
+        if after_pcid:
+            filters.append({"range": {f"{self.key_field}.user_pcid.keyword": {"gt": after_pcid}}})
+
+        body = {
+            "query": {
+                "bool": {
+                    "filter": filters,
+                }
+            },
+            "sort": [
+                {f"{self.key_field}.user_pcid.keyword": {"order": "asc"}},
+                {f"{self.key_field}.created_date_time": {"order": "asc"}},
+            ],
+            # 전이 처리에 필요한 필드만 받는다
+            "_source": event_source_fields(self.key_field),
+        }
+        return self.es.iter_hits(self.index_name, body, page_size=page_size)
+
+
+class FileEventSource(EventSource):
+    """
+    NDJSON 덤프 파일에서 hit 을 읽는다. 한 줄에 하나씩
+    ES hit({"_source": {...}}) 또는 _source 문서({"query_log": {...}}) 모두 허용.
+
+    - 확장자 .gz 는 gzip, .zst 는 zstd(zstandard 패키지 필요), 그 외는 평문
+    - 파일은 user_pcid → created_date_time 오름차순이어야 한다
+      (dump 모드로 만든 파일은 이미 이 순서). 순서가 어긋나면 ValueError.
+      user_pcid / created_date_time 이 없는 줄은 ES 소스와 같이 순서 검사 전에 건너뛴다.
+    - 기간/after_pcid 조건은 읽으면서 걸러내며, 한 줄씩 처리하므로 메모리 사용량은 일정하다.
+    """
+
+    def __init__(self, paths: Iterable[str], key_field: str = "query_log"):
+        self.paths = list(paths)
+        self.key_field = key_field
+
+    def iter_hits(
+        self,
+        gte: str,
+        lte: str,
+        page_size: int = 10000,
+        exclusive_start: bool = False,
+        after_pcid: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        last_key = None
+        lines = 0
+        yielded = 0
+        skipped = 0
+
+        for path in self.paths:
+            logger.info("이벤트 파일 재생: %s", path)
+            with open_text(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    lines += 1
+
+                    hit = json.loads(line)
+                    if "_source" not in hit:
+                        hit = {"_source": hit}
+
+                    log = hit["_source"].get(self.key_field, {})
+                    pcid = str(log.get("user_pcid") or "")
+                    ts = log.get("created_date_time") or ""
+                    if not pcid or not ts:
+                        skipped += 1
+                        continue
+
+                    key = (pcid, ts)
+                    if last_key is not None and key < last_key:
+                        raise ValueError(
+                            f"{path}:{lines} 이벤트가 user_pcid, created_date_time 순으로 "
+                            f"정렬되어 있지 않습니다: {last_key} → {key}"
+                        )
+                    last_key = key
+
+                    if after_pcid and pcid <= after_pcid:
+                        continue
+                    if ts < gte or ts > lte or (exclusive_start and ts == gte):
+                        continue
+
+                    yielded += 1
+                    yield hit
+
+        logger.info(
+            "이벤트 파일 재생 완료: lines=%d, hits=%d, user_pcid/시각 없음=%d",
+            lines,
+            yielded,
+            skipped,
+        )
+
+
+def open_text(path: str, mode: str = "rt") -> TextIO:
+    """확장자에 따라 gzip / zstd / 평문 텍스트 파일을 연다 ("rt" / "wt")"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError(".zst 파일을 읽으려면 zstandard 패키지가 필요합니다 (pip install zstandard)")
+        return zstandard.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_ndjson(path: str, hits: Iterable[Dict[str, Any]]) -> int:
+    """hit 의 _source 를 한 줄씩 NDJSON 으로 저장 (임시 파일에 쓰고 교체). 저장 건수 반환"""
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+
+    # .gz/.zst 판별을 위해 확장자는 유지
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp{ext}"
+
+    count = 0
+    with open_text(tmp_path, "wt") as f:
+        for hit in hits:
+            f.write(json.dumps(hit.get("_source", {}), ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    os.replace(tmp_path, path)
+
+    logger.info("이벤트 덤프 저장: %s (hits=%d)", path, count)
+    return count
+
+
+def date_range_filter(
+    gte: str,
+    lte: str,
+    exclusive_start: bool = False,
+    key_field: str = "query_log",
+) -> Dict[str, Any]:
+    """created_date_time 기간 필터 (exclusive_start 면 시작 시각 자체는 제외)"""
+    start_op = "gt" if exclusive_start else "gte"
+    return {
+        "range": {
+            f"{key_field}.created_date_time": {
+                start_op: gte,
+                "lte": lte,
+            }
+        }
+    }
@@ -0,0 +1,141 @@
+# src/search_graph/vector_transitions.py
+"""
+process_hits 전이 규칙의 컬럼(NumPy) 구현 - 대량 오프라인 재구축용.
+
+process_hits 루프를 한 시퀀스(같은 group = 한 번의 process_hits 호출) 안에서 풀어 쓰면
+(검색어/날짜가 비어 있는 이벤트는 먼저 제외)
+
+    NEXT(i)      : group[i-1] == group[i] and date[i-1] == date[i] and key[i-1] != key[i]
+    FAIL_NEXT(i) : NEXT(i) and is_fail[i-1]
+
+이다. 루프의 pending_fail_A 는 매 이벤트 끝에 key(실패) 또는 ""(성공) 로 덮어써지고
+날짜가 바뀌면 비워지므로, 결국 "바로 앞 이벤트가 같은 날 실패였는가" 와 같다.
+FAIL_NEXT 의 first_seen / last_seen 은 간선별 created_dt 의 min / max.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .edge_accumulator import EdgeAccumulator
+from .events import SearchEvent, is_fail_event
+
+
+@dataclass
+class EventColumns:
+    group: np.ndarray  # int64  시퀀스 경계 (연속된 같은 값이 한 시퀀스)
+    date: np.ndarray  # int64  created_dt[:10] 코드
+    key: np.ndarray  # int64  keywords 인덱스
+    is_fail: np.ndarray  # bool
+    ts: np.ndarray  # int64  timestamps 인덱스 (정렬된 코드라 대소 비교 가능)
+    keywords: List[str]
+    timestamps: List[str]
+
+    def __len__(self) -> int:
+        return len(self.key)
+
+
+def columns_from_events(events: Iterable[SearchEvent], by_pcid: bool = True) -> EventColumns:
+    """
+    SearchEvent 스트림을 컬럼으로 바꾼다 (검색어/날짜가 비면 제외).
+    by_pcid=False 면 전체를 한 시퀀스로 본다 (process_hits 한 번 호출과 같은 의미).
+    """
+    valid = [e for e in events if e.query and e.created_dt[:10]]
+
+    kw_index: Dict[str, int] = {}
+    keys = [kw_index.setdefault(e.query, len(kw_index)) for e in valid]
+    date_index: Dict[str, int] = {}
+    dates = [date_index.setdefault(e.created_dt[:10], len(date_index)) for e in valid]
+    if by_pcid:
+        group_index: Dict[str, int] = {}
+        groups = [group_index.setdefault(e.pcid, len(group_index)) for e in valid]
+    else:
+        groups = [0] * len(valid)
+
+    # 문자열 시각을 정렬된 코드로 (코드 대소 == 문자열 대소)
+    ts_index: Dict[str, int] = {}
+    ts_first = [ts_index.setdefault(e.created_dt, len(ts_index)) for e in valid]
+    timestamps = sorted(ts_index)
+    rank = np.empty(len(timestamps), dtype=np.int64)
+    rank[[ts_index[t] for t in timestamps]] = np.arange(len(timestamps))
+
+    return EventColumns(
+        group=np.asarray(groups, dtype=np.int64),
+        date=np.asarray(dates, dtype=np.int64),
+        key=np.asarray(keys, dtype=np.int64),
+        is_fail=np.fromiter((is_fail_event(e) for e in valid), dtype=bool, count=len(valid)),
+        ts=rank[np.asarray(ts_first, dtype=np.int64)],
+        keywords=list(kw_index),
+        timestamps=timestamps,
+    )
+
+
+def extract_transitions(cols: EventColumns) -> Tuple[EdgeAccumulator, Counter]:
+    """
+    컬럼에서 NEXT / FAIL_NEXT 증가분을 한 번에 계산한다.
+    반환: (EdgeAccumulator, FAIL_NEXT 후보 Counter) - process_hits 와 같은 결과
+    """
+    acc = EdgeAccumulator()
+    acc.keywords.update(cols.keywords)
+
+    if len(cols) < 2:
+        return acc, Counter()
+
+    prev, cur = slice(None, -1), slice(1, None)
+    is_next = (
+        (cols.group[prev] == cols.group[cur])
+        & (cols.date[prev] == cols.date[cur])
+        & (cols.key[prev] != cols.key[cur])
+    )
+    n_kw = len(cols.keywords)
+    keywords = np.asarray(cols.keywords, dtype=object)
+    pair_of = cols.key[prev] * n_kw + cols.key[cur]
+
+    # NEXT: (src, dst) 쌍별 개수
+    pairs, counts = np.unique(pair_of[is_next], return_counts=True)
+    acc.next_counts = Counter(
+        dict(zip(zip(keywords[pairs // n_kw], keywords[pairs % n_kw]), counts.tolist()))
+    )
+
+    # FAIL_NEXT: 앞 이벤트가 실패인 NEXT 만, 시각은 뒤 이벤트(B) 기준
+    is_fail_next = is_next & cols.is_fail[prev]
+    f_pairs = pair_of[is_fail_next]
+    f_ts = cols.ts[cur][is_fail_next]
+    if len(f_pairs) == 0:
+        return acc, Counter()
+
+    order = np.lexsort((f_ts, f_pairs))
+    f_pairs, f_ts = f_pairs[order], f_ts[order]
+    starts = np.flatnonzero(np.r_[True, f_pairs[1:] != f_pairs[:-1]])
+    ends = np.r_[starts[1:], len(f_pairs)]
+
+    timestamps = np.asarray(cols.timestamps, dtype=object)
+    pairs = f_pairs[starts]
+    edges = list(zip(keywords[pairs // n_kw], keywords[pairs % n_kw]))
+    counts = (ends - starts).tolist()
+
+    acc.fail_counts = Counter(dict(zip(edges, counts)))
+    acc.fail_first_seen = dict(zip(edges, timestamps[f_ts[starts]]))
+    acc.fail_last_seen = dict(zip(edges, timestamps[f_ts[ends - 1]]))
+    return acc, Counter(acc.fail_counts)
+
+
+def diff_accumulators(expected: EdgeAccumulator, actual: EdgeAccumulator) -> List[str]:
+    """두 누적기의 노드/NEXT/FAIL_NEXT 차이를 사람이 읽을 수 있는 문자열 목록으로"""
+    diffs = []
+    if expected.keywords != actual.keywords:
+        diffs.append(
+            f"keywords: 누락 {len(expected.keywords - actual.keywords)}, "
+            f"추가 {len(actual.keywords - expected.keywords)}"
+        )
+    for name, exp, act in (
+        ("next", expected.next_counts, actual.next_counts),
+        ("fail_next", expected.fail_counts, actual.fail_counts),
+        ("first_seen", expected.fail_first_seen, actual.fail_first_seen),
+        ("last_seen", expected.fail_last_seen, actual.fail_last_seen),
+    ):
+        for edge in set(exp) | set(act):
+            if exp.get(edge) != act.get(edge):
+                diffs.append(f"{name} {edge}: loop={exp.get(edge)} vector={act.get(edge)}")
+    return diffs
@@ -0,0 +1,40 @@
+# tests/fake_es.py
+"""async 파이프라인 테스트용 AsyncElasticsearchService 대역"""
+import asyncio
+from typing import Any, Dict, List, Optional
+
+
+class FakeAsyncSearch:
+    """
+    body 의 user_pcid term 으로 PCID 시퀀스를 돌려준다.
+    delays 로 PCID 별 응답 지연(초)을, fail_pcids 로 조회가 실패할 PCID 를 정한다.
+    processor.es 자리에 넣으면 async_service() 가 자기 자신을 돌려준다.
+    """
+
+    def __init__(
+        self,
+        hits: Dict[str, List[Dict[str, Any]]],
+        delays: Optional[Dict[str, float]] = None,
+        fail_pcids=(),
+    ):
+        self.hits = hits
+        self.delays = delays or {}
+        self.fail_pcids = set(fail_pcids)
+        self.searched: List[str] = []  # 조회를 시작한 순서
+        self.returned: List[str] = []  # 응답한 순서
+        self.closed = False
+
+    def async_service(self) -> "FakeAsyncSearch":
+        return self
+
+    async def search_all(self, index_name, body, page_size=1000, try_single_page=False):
+        pcid = body["query"]["bool"]["must"][0]["term"]["query_log.user_pcid.keyword"]
+        self.searched.append(pcid)
+        await asyncio.sleep(self.delays.get(pcid, 0))
+        if pcid in self.fail_pcids:
+            raise RuntimeError(f"ES 조회 실패: {pcid}")
+        self.returned.append(pcid)
+        return list(self.hits.get(pcid, []))
+
+    async def close(self):
+        self.closed = True
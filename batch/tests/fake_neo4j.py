@@ -0,0 +1,232 @@
+# tests/fake_neo4j.py
+"""
+배치 writer 테스트용 메모리 Neo4j 드라이버.
+
+실제 쿼리를 해석하지 않고 neo4j_client 의 쿼리 상수로 동작을 고른다.
+트랜잭션 안의 tx.run 은 기록만 해 두었다가 트랜잭션 함수가 예외 없이 끝났을 때만
+한꺼번에 반영한다 (실패한 트랜잭션은 아무것도 남기지 않는다).
+"""
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from search_graph import neo4j_client as nc
+
+Edge = Tuple[str, str]
+
+
+class FakeResult:
+    def __init__(self, records: Optional[List[Dict[str, Any]]] = None):
+        self._records = records or []
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def consume(self):
+        return None
+
+
+class FakeGraph:
+    def __init__(self):
+        self.keywords: Set[str] = set()
+        self.next: Dict[Edge, int] = {}
+        self.fail: Dict[Edge, List[Any]] = {}  # edge → [count, first_seen, last_seen]
+        self.applied: List[Dict[str, Any]] = []
+        self.commits = 0
+        # (query, params) 를 받아 예외를 던지면 그 tx.run 이 실패한다
+        self.fail_hook: Optional[Callable[[str, Dict[str, Any]], None]] = None
+        self._lock = threading.Lock()
+
+    def driver(self) -> "FakeDriver":
+        return FakeDriver(self)
+
+    def async_driver(self) -> "FakeAsyncDriver":
+        return FakeAsyncDriver(self)
+
+    def commit(self, ops: List[Tuple[str, Dict[str, Any]]]):
+        with self._lock:
+            for query, params in ops:
+                self._apply(query, params)
+            self.commits += 1
+
+    def _apply(self, query: str, params: Dict[str, Any]):
+        if query == nc.UNWIND_MERGE_KEYWORDS:
+            self.keywords.update(params["rows"])
+        elif query == nc.UNWIND_NEXT_RELATIONS:
+            for row in params["rows"]:
+                edge = (row["from_kw"], row["to_kw"])
+                if set(edge) <= self.keywords:
+                    self.next[edge] = self.next.get(edge, 0) + row["delta"]
+        elif query == nc.UNWIND_FAIL_NEXT_RELATIONS:
+            for row in params["rows"]:
+                edge = (row["from_kw"], row["to_kw"])
+                if not set(edge) <= self.keywords:
+                    continue
+                if edge in self.fail:
+                    rel = self.fail[edge]
+                    rel[0] += row["delta"]
+                    rel[1] = min(rel[1], row["first_seen"])
+                    rel[2] = max(rel[2], row["last_seen"])
+                else:
+                    self.fail[edge] = [row["delta"], row["first_seen"], row["last_seen"]]
+        elif query == nc.UNWIND_MERGE_KEYWORD_VARIANTS:
+            for row in params["rows"]:
+                self._merge_variant(row["name"], row["target"], set(row["group"]))
+        elif query == nc.CREATE_APPLIED_BATCH:
+            self.applied.append(dict(params, tokens=list(params["tokens"])))
+        elif query == nc.DELETE_APPLIED_BATCHES:
+            self.applied = [b for b in self.applied if b["scope"] != params["scope"]]
+        else:
+            raise AssertionError(f"처리하지 않는 쿼리: {query}")
+
+    def _merge_variant(self, v: str, t: str, group: Set[str]):
+        """UNWIND_MERGE_KEYWORD_VARIANTS 한 행: v 의 간선을 t 로 옮겨 합산하고 v 를 지운다"""
+        if v not in self.keywords:
+            return
+        self.keywords.add(t)
+
+        def moved(edge: Edge) -> Optional[Edge]:
+            a, b = edge
+            if a == v and b != t and b not in group:
+                return t, b
+            if b == v and a != t and a not in group:
+                return a, t
+            return None
+
+        for edge, count in list(self.next.items()):
+            target = moved(edge)
+            if target is not None:
+                self.next[target] = self.next.get(target, 0) + count
+        for edge, (count, first, last) in list(self.fail.items()):
+            target = moved(edge)
+            if target is None:
+                continue
+            if target in self.fail:
+                rel = self.fail[target]
+                rel[0] += count
+                rel[1] = min(rel[1], first)
+                rel[2] = max(rel[2], last)
+            else:
+                self.fail[target] = [count, first, last]
+
+        # DETACH DELETE v
+        self.keywords.discard(v)
+        self.next = {edge: c for edge, c in self.next.items() if v not in edge}
+        self.fail = {edge: rel for edge, rel in self.fail.items() if v not in edge}
+
+    def read(self, query: str, params: Dict[str, Any]) -> FakeResult:
+        with self._lock:
+            if query == nc.ALL_KEYWORD_NAMES:
+                return FakeResult([{"name": name} for name in sorted(self.keywords)])
+            if query == nc.APPLIED_BATCHES:
+                return FakeResult(
+                    [
+                        {"part": b["part"], "tokens": list(b["tokens"])}
+                        for b in self.applied
+                        if b["scope"] == params["scope"]
+                    ]
+                )
+        self.commit([(query, params)])
+        return FakeResult()
+
+
+class FakeTx:
+    def __init__(self, graph: FakeGraph):
+        self._graph = graph
+        self.ops: List[Tuple[str, Dict[str, Any]]] = []
+
+    def run(self, query: str, **params):
+        if self._graph.fail_hook is not None:
+            self._graph.fail_hook(query, params)
+        self.ops.append((query, params))
+        return FakeResult()
+
+
+class FakeSession:
+    def __init__(self, graph: FakeGraph):
+        self._graph = graph
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work, *args):
+        tx = FakeTx(self._graph)
+        result = work(tx, *args)
+        self._graph.commit(tx.ops)
+        return result
+
+    def run(self, query: str, **params):
+        return self._graph.read(query, params)
+
+
+class FakeDriver:
+    def __init__(self, graph: FakeGraph):
+        self._graph = graph
+
+    def session(self):
+        return FakeSession(self._graph)
+
+    def close(self):
+        pass
+
+
+class FakeAsyncResult(FakeResult):
+    async def consume(self):
+        return None
+
+
+class FakeAsyncTx(FakeTx):
+    async def run(self, query: str, **params):
+        FakeTx.run(self, query, **params)
+        return FakeAsyncResult()
+
+
+class FakeAsyncSession:
+    def __init__(self, graph: FakeGraph):
+        self._graph = graph
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute_write(self, work, *args):
+        tx = FakeAsyncTx(self._graph)
+        result = await work(tx, *args)
+        self._graph.commit(tx.ops)
+        return result
+
+
+class FakeAsyncDriver:
+    def __init__(self, graph: FakeGraph):
+        self._graph = graph
+
+    def session(self):
+        return FakeAsyncSession(self._graph)
+
+    async def close(self):
+        pass
+
+
+def fake_service(graph: FakeGraph, **options) -> nc.Neo4jService:
+    """드라이버만 FakeGraph 로 바꾼 Neo4jService (write_lanes 는 1 로 둔다)"""
+    service = nc.Neo4jService("bolt://localhost:7687", "neo4j", "test", ensure_schema=False, **options)
+    service._driver.close()
+    service._driver = graph.driver()
+    service.async_driver = graph.async_driver
+    return service
+
+
+def fail_once(query: str, error: BaseException) -> Callable[[str, Dict[str, Any]], None]:
+    """query 가 처음 실행될 때 한 번만 error 를 던지는 fail_hook"""
+    state = {"raised": False}
+
+    def hook(q: str, params: Dict[str, Any]):
+        if q == query and not state["raised"]:
+            state["raised"] = True
+            raise error
+
+    return hook
@@ -0,0 +1,142 @@
+# tests/test_async_pipeline.py
+"""AsyncPcidPipeline: 완료 순서가 섞여도 결과가 같고, 한 단계가 실패하면 멈춘다"""
+import asyncio
+import random
+
+import pytest
+from neo4j.exceptions import ClientError
+
+from search_graph import neo4j_client as nc
+from search_graph.async_pipeline import AsyncPcidPipeline, PipelineConfig
+from search_graph.fail_pairs import CounterAggregator
+from search_graph.search_log_processor import SearchLogProcessor
+
+from fake_es import FakeAsyncSearch
+from fake_neo4j import FakeGraph, fake_service
+
+GTE, LTE = "2024-12-01T00:00:00.000", "2024-12-31T23:59:59.999"
+WORDS = ["테라", "카스", "맥주", "치킨", "콜라", "안주"]
+
+
+def hit(pcid, query, minute):
+    return {
+        "_source": {
+            "query_log": {
+                "user_pcid": pcid,
+                "search_query": query,
+                "created_date_time": f"2024-12-01T10:{minute:02d}:00.000",
+                "result_count": 0,
+            }
+        }
+    }
+
+
+def make_hits(pcids, seed=0):
+    rng = random.Random(seed)
+    return {
+        pcid: [hit(pcid, rng.choice(WORDS), minute) for minute in range(rng.randint(1, 6))]
+        for pcid in pcids
+    }
+
+
+def make_processor(graph, hits, **es_options):
+    processor = SearchLogProcessor(
+        es=FakeAsyncSearch(hits, **es_options),
+        neo=fake_service(graph, batch_size=2),
+        index_name="idx",
+        query_file="",
+    )
+    processor.fetch_hits_by_pcid = lambda pcid, *args, **kwargs: iter(hits[pcid])
+    return processor
+
+
+def run_pipeline(processor, pcids, config, timeout=10):
+    """파이프라인을 끝까지 실행 (교착이면 timeout 으로 실패)"""
+    pipeline = AsyncPcidPipeline(processor, config)
+    totals = CounterAggregator()
+
+    async def run():
+        return await asyncio.wait_for(
+            pipeline._run(pcids, GTE, LTE, 100, "r", False, totals, None), timeout
+        )
+
+    return asyncio.run(run()), totals
+
+
+def test_out_of_order_completion_matches_sequential():
+    pcids = [f"p{i:03d}" for i in range(60)]
+    hits = make_hits(pcids)
+    # 뒤쪽 PCID 가 먼저 끝나도록 조회 지연을 섞는다
+    rng = random.Random(1)
+    delays = {pcid: rng.random() * 0.005 for pcid in pcids}
+
+    sequential_graph = FakeGraph()
+    sequential = make_processor(sequential_graph, hits)
+    with sequential.neo.batch_writer() as writer:
+        expected_pairs = CounterAggregator()
+        for pcid in pcids:
+            expected_pairs.update(sequential.process_pcid(pcid, GTE, LTE, 100, writer=writer))
+
+    graph = FakeGraph()
+    processor = make_processor(graph, hits, delays=delays)
+    stats, totals = run_pipeline(
+        processor, pcids, PipelineConfig(fetchers=8, transformers=3, writers=2, queue_size=2)
+    )
+
+    assert processor.es.returned != pcids  # 실제로 완료 순서가 섞였다
+    assert graph.next == sequential_graph.next
+    assert graph.fail == sequential_graph.fail
+    assert list(totals.iter_top()) == list(expected_pairs.iter_top())
+    assert (stats.pcids, stats.transformed, stats.written) == (60, 60, 60)
+    assert stats.max_seq_queue <= 2 and stats.max_write_queue <= 2
+
+
+def _fail_fetch(processor, graph):
+    processor.es.fail_pcids.add("p010")
+
+
+def _fail_transform(processor, graph):
+    process_hits = processor.process_hits
+
+    def failing(hits, *args, **kwargs):
+        hits = list(hits)
+        if hits and hits[0]["_source"]["query_log"]["user_pcid"] == "p010":
+            raise RuntimeError("전이 계산 실패")
+        return process_hits(hits, *args, **kwargs)
+
+    processor.process_hits = failing
+
+
+def _fail_write(processor, graph):
+    def hook(query, params):
+        if query == nc.UNWIND_NEXT_RELATIONS:
+            raise ClientError("적재 실패")
+
+    graph.fail_hook = hook
+
+
+@pytest.mark.parametrize(
+    "fail, error",
+    [(_fail_fetch, RuntimeError), (_fail_transform, RuntimeError), (_fail_write, ClientError)],
+)
+def test_failing_stage_cancels_the_rest(fail, error):
+    pcids = [f"p{i:03d}" for i in range(500)]
+    graph = FakeGraph()
+    # 모든 PCID 가 간선을 하나 이상 만들도록 두 검색어 이상
+    hits = {pcid: [hit(pcid, "테라", 1), hit(pcid, "카스", 2)] for pcid in pcids}
+    processor = make_processor(graph, hits)
+    fail(processor, graph)
+
+    with pytest.raises(error):
+        run_pipeline(
+            processor, pcids, PipelineConfig(fetchers=2, transformers=1, writers=1, queue_size=1)
+        )
+
+    # 큐가 꽉 차 대기 중이던 단계까지 취소되어 나머지 PCID 는 조회하지 않았다
+    assert len(processor.es.searched) < 50
+    assert processor.es.closed
+
+
+def test_invalid_config_is_rejected():
+    with pytest.raises(ValueError):
+        AsyncPcidPipeline(None, PipelineConfig(queue_size=0))
@@ -0,0 +1,66 @@
+# tests/test_async_writer.py
+import asyncio
+
+import pytest
+from neo4j.exceptions import ClientError, TransientError
+
+from search_graph import neo4j_client as nc
+from search_graph.edge_accumulator import EdgeAccumulator
+from search_graph.neo4j_client import AsyncNeo4jBatchWriter
+
+from fake_neo4j import FakeGraph, fail_once
+
+
+def make_acc(*edges):
+    acc = EdgeAccumulator()
+    for a, b in edges:
+        acc.add_next(a, b)
+    return acc
+
+
+def test_async_flush_is_one_transaction_with_applied_batch():
+    graph = FakeGraph()
+    flushed = []
+
+    async def run():
+        writer = AsyncNeo4jBatchWriter(graph.async_driver(), batch_size=1, token_scope="s")
+        writer.add_flush_listener(flushed.extend)
+        writer.merge(make_acc(("a", "b"), ("b", "c")), token="p1")
+        await writer.close()
+
+    asyncio.run(run())
+    assert graph.commits == 1
+    assert graph.next == {("a", "b"): 1, ("b", "c"): 1}
+    assert graph.applied == [{"scope": "s", "part": nc.APPLIED_ALL, "tokens": ["p1"]}]
+    assert flushed == ["p1"]
+
+
+def test_async_transient_error_is_retried(monkeypatch):
+    monkeypatch.setattr(nc, "WRITE_RETRY_BASE_DELAY", 0.0)
+    graph = FakeGraph()
+    graph.fail_hook = fail_once(nc.UNWIND_NEXT_RELATIONS, TransientError("deadlock"))
+
+    async def run():
+        writer = AsyncNeo4jBatchWriter(graph.async_driver())
+        writer.merge(make_acc(("a", "b")))
+        await writer.close()
+
+    asyncio.run(run())
+    assert graph.next == {("a", "b"): 1}
+
+
+def test_async_failed_flush_is_retried_once():
+    graph = FakeGraph()
+    graph.fail_hook = fail_once(nc.UNWIND_NEXT_RELATIONS, ClientError("boom"))
+
+    async def run():
+        writer = AsyncNeo4jBatchWriter(graph.async_driver())
+        writer.merge(make_acc(("a", "b")), token="p1")
+        with pytest.raises(ClientError):
+            await writer.flush()
+        assert graph.next == {}
+        writer.merge(make_acc(("a", "b")), token="p2")
+        await writer.close()
+
+    asyncio.run(run())
+    assert graph.next == {("a", "b"): 2}
@@ -0,0 +1,177 @@
+# tests/test_batch_writer.py
+import pytest
+from neo4j.exceptions import ClientError
+
+from search_graph import neo4j_client as nc
+from search_graph.edge_accumulator import EdgeAccumulator
+from search_graph.neo4j_client import Neo4jBatchWriter, Neo4jWriteRouter
+
+from fake_neo4j import FakeGraph, fail_once
+
+TS = "2024-12-01T00:00:00.000"
+
+
+def make_acc(*edges, fail=()):
+    acc = EdgeAccumulator()
+    for a, b in edges:
+        acc.add_next(a, b)
+    for a, b in fail:
+        acc.add_fail_next(a, b, TS)
+    return acc
+
+
+def applied_tokens(graph, scope):
+    applied = {}
+    for batch in graph.applied:
+        if batch["scope"] == scope:
+            for token in batch["tokens"]:
+                applied.setdefault(token, set()).add(batch["part"])
+    return applied
+
+
+def test_flush_is_one_transaction():
+    graph = FakeGraph()
+    writer = Neo4jBatchWriter(graph.driver(), batch_size=2)
+    writer.merge(make_acc(("a", "b"), ("b", "c"), ("c", "d"), fail=[("a", "c")]))
+    writer.flush()
+
+    # 행이 batch_size 를 넘어 쿼리가 여러 번 나뉘어도 커밋은 한 번
+    assert graph.commits == 1
+    assert graph.next == {("a", "b"): 1, ("b", "c"): 1, ("c", "d"): 1}
+    assert graph.fail[("a", "c")][0] == 1
+
+
+def test_failed_flush_commits_nothing_and_retry_counts_once():
+    graph = FakeGraph()
+    graph.fail_hook = fail_once(nc.UNWIND_FAIL_NEXT_RELATIONS, ClientError("boom"))
+    flushed = []
+    writer = Neo4jBatchWriter(graph.driver(), batch_size=1, aggregate_scope="run")
+    writer.add_flush_listener(flushed.extend)
+    writer.merge(make_acc(("a", "b"), ("a", "b"), fail=[("b", "a")]), token="p1")
+
+    with pytest.raises(ClientError):
+        writer.flush()
+    assert graph.commits == 0
+    assert graph.keywords == set() and graph.next == {}
+    assert flushed == []
+
+    # 실패한 배치와 그 뒤에 merge 된 delta 를 각각 한 번씩만 적재
+    writer.merge(make_acc(("a", "b")), token="p2")
+    writer.close()
+    assert graph.next == {("a", "b"): 3}
+    assert graph.fail[("b", "a")][0] == 1
+    assert flushed == ["p1", "p2"]
+
+
+def test_token_scope_records_applied_batch_in_same_transaction():
+    graph = FakeGraph()
+    writer = Neo4jBatchWriter(graph.driver(), token_scope="s")
+    writer.merge(make_acc(("a", "b")), token="p1")
+    writer.merge(make_acc(("b", "c")), token="p2")
+    writer.flush()
+
+    assert graph.commits == 1
+    assert applied_tokens(graph, "s") == {"p1": {nc.APPLIED_ALL}, "p2": {nc.APPLIED_ALL}}
+
+
+def test_resume_skips_tokens_already_applied():
+    graph = FakeGraph()
+    with Neo4jBatchWriter(graph.driver(), token_scope="s") as writer:
+        writer.merge(make_acc(("a", "b")), token="p1")
+
+    # SQLite 에 완료 기록을 남기기 전에 죽었다고 보고 같은 PCID 를 다시 처리
+    flushed = []
+    resumed = Neo4jBatchWriter(graph.driver(), token_scope="s", applied=applied_tokens(graph, "s"))
+    resumed.add_flush_listener(flushed.extend)
+    resumed.merge(make_acc(("a", "b")), token="p1")
+    resumed.merge(make_acc(("a", "b")), token="p2")
+    resumed.close()
+
+    assert graph.next == {("a", "b"): 2}
+    assert flushed == ["p1", "p2"]
+
+
+def _lane_failure(router, lane):
+    """간선 단계에서 lane 의 트랜잭션을 한 번 실패시키는 fail_hook"""
+    state = {"raised": False}
+
+    def hook(query, params):
+        if query != nc.UNWIND_NEXT_RELATIONS or state["raised"]:
+            return
+        if router.edge_lane(params["rows"][0]["from_kw"], params["rows"][0]["to_kw"]) == lane:
+            state["raised"] = True
+            raise ClientError("lane down")
+
+    return hook
+
+
+def _two_lane_edges(router):
+    """서로 다른 lane 으로 가는 시작 노드 두 개"""
+    by_lane = {}
+    for i in range(100):
+        by_lane.setdefault(router.lane_of(f"k{i}"), f"k{i}")
+        if len(by_lane) == 2:
+            break
+    return [(by_lane[0], "x"), (by_lane[1], "x")]
+
+
+def test_router_retry_skips_committed_lanes():
+    graph = FakeGraph()
+    router = Neo4jWriteRouter(graph.driver(), lanes=2, partition="start")
+    edges = _two_lane_edges(router)
+    graph.fail_hook = _lane_failure(router, 1)
+
+    writer = Neo4jBatchWriter(graph.driver(), router=router)
+    writer.merge(make_acc(*edges), token="p1")
+    with pytest.raises(ClientError):
+        writer.flush()
+    assert graph.next == {edges[0]: 1}
+
+    writer.close()
+    router.close()
+    assert graph.next == {edges[0]: 1, edges[1]: 1}
+
+
+def test_router_resume_filters_committed_lanes():
+    graph = FakeGraph()
+    router = Neo4jWriteRouter(graph.driver(), lanes=2, partition="start")
+    edges = _two_lane_edges(router)
+    graph.fail_hook = _lane_failure(router, 1)
+
+    writer = Neo4jBatchWriter(graph.driver(), router=router, token_scope="s")
+    writer.merge(make_acc(*edges), token="p1")
+    with pytest.raises(ClientError):
+        writer.flush()
+    assert applied_tokens(graph, "s") == {"p1": {router.lane_part(0)}}
+
+    # 프로세스가 죽고 재개: 커밋된 lane 0 의 delta 는 빼고 lane 1 만 적재
+    resumed = Neo4jBatchWriter(
+        graph.driver(), router=router, token_scope="s", applied=applied_tokens(graph, "s")
+    )
+    resumed.merge(make_acc(*edges), token="p1")
+    resumed.close()
+    router.close()
+    assert graph.next == {edges[0]: 1, edges[1]: 1}
+
+
+def test_resume_with_different_lane_setting_is_rejected():
+    graph = FakeGraph()
+    router = Neo4jWriteRouter(graph.driver(), lanes=4, partition="start")
+    writer = Neo4jBatchWriter(
+        graph.driver(), router=router, applied={"p1": {"start:2:0"}}
+    )
+    with pytest.raises(ValueError):
+        writer.merge(make_acc(("a", "b")), token="p1")
+    router.close()
+
+
+def test_pair_partition_puts_both_directions_in_one_lane():
+    graph = FakeGraph()
+    start = Neo4jWriteRouter(graph.driver(), lanes=8, partition="start")
+    pair = Neo4jWriteRouter(graph.driver(), lanes=8, partition="pair")
+    edges = [(f"k{i}", f"k{i * 7 + 1}") for i in range(50)]
+
+    assert all(pair.edge_lane(a, b) == pair.edge_lane(b, a) for a, b in edges)
+    assert all(start.edge_lane(a, b) == start.lane_of(a) for a, b in edges)
+    start.close()
+    pair.close()
@@ -0,0 +1,58 @@
+# tests/test_bulk_import.py
+"""neo4j-admin import CSV 헤더/따옴표 처리와 import 명령"""
+import csv
+
+from search_graph.bulk_import import import_command, write_import_csvs
+from search_graph.edge_accumulator import EdgeAccumulator
+
+
+def _read_lines(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.read().splitlines(keepends=True)
+
+
+def _accumulator():
+    acc = EdgeAccumulator()
+    acc.merge_keyword("외톨이")
+    acc.add_next('치킨 "반반"', "맥주,카스", 2)
+    acc.add_fail_next("줄\n바꿈", "치킨", "2024-01-01T00:00:00.000", 1)
+    return acc
+
+
+def test_csv_headers_and_quote_all(tmp_path):
+    paths = write_import_csvs(_accumulator(), str(tmp_path))
+
+    assert _read_lines(paths["keywords"])[0] == '"name:ID(Keyword)",":LABEL"\r\n'
+    assert _read_lines(paths["next"]) == [
+        '":START_ID(Keyword)",":END_ID(Keyword)","count:long",":TYPE"\r\n',
+        '"치킨 ""반반""","맥주,카스","2","NEXT"\r\n',
+    ]
+    assert _read_lines(paths["fail_next"]) == [
+        '":START_ID(Keyword)",":END_ID(Keyword)","count:long","first_seen","last_seen",":TYPE"\r\n',
+        '"줄\n',
+        '바꿈","치킨","1","2024-01-01T00:00:00.000","2024-01-01T00:00:00.000","FAIL_NEXT"\r\n',
+    ]
+
+
+def test_keywords_include_every_edge_endpoint(tmp_path):
+    paths = write_import_csvs(_accumulator(), str(tmp_path))
+
+    with open(paths["keywords"], encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))[1:]
+
+    assert all(label == "Keyword" for _, label in rows)
+    assert sorted(name for name, _ in rows) == sorted(
+        ["외톨이", '치킨 "반반"', "맥주,카스", "줄\n바꿈", "치킨"]
+    )
+
+
+def test_import_command():
+    paths = {"keywords": "/out/keywords.csv", "next": "/out/next.csv", "fail_next": "/out/fail_next.csv"}
+
+    assert import_command(paths, database="graph") == (
+        "neo4j-admin database import full graph --overwrite-destination "
+        "--multiline-fields=true "
+        "--nodes=/out/keywords.csv "
+        "--relationships=/out/next.csv "
+        "--relationships=/out/fail_next.csv"
+    )
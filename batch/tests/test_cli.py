@@ -0,0 +1,60 @@
+# tests/test_cli.py
+"""Neo4j 를 쓰지 않는 모드는 Neo4jService 를 만들지 않는다 (DB 없이 실행 가능)"""
+import os
+
+import pytest
+
+from search_graph import cli
+from search_graph.sources import FileEventSource, write_ndjson
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yml")
+
+
+def hit(pcid, minute, query):
+    return {
+        "_source": {
+            "query_log": {
+                "user_pcid": pcid,
+                "search_query": query,
+                "created_date_time": f"2024-12-01T10:{minute:02d}:00.000",
+            }
+        }
+    }
+
+
+@pytest.fixture
+def no_neo4j(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError("Neo4jService 를 만들면 안 됩니다")
+
+    monkeypatch.setattr(cli, "Neo4jService", refuse)
+
+
+@pytest.mark.parametrize("mode", ["dump", "verify_transitions", "rebuild"])
+def test_offline_modes_run_without_neo4j(mode, tmp_path, monkeypatch, no_neo4j):
+    events = str(tmp_path / "in.ndjson")
+    write_ndjson(events, [hit("p1", 1, "테라"), hit("p1", 2, "카스"), hit("p2", 3, "테라")])
+    output = str(tmp_path / "out.ndjson")
+    # rebuild 는 fail_pair_candidates.csv 를 ./result 에 쓴다
+    monkeypatch.chdir(tmp_path)
+
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "search-graph",
+            mode,
+            "--config", CONFIG,
+            "--input", events,
+            "--output", output,
+            "--output-dir", str(tmp_path / "import"),
+            "--gte", "2024-12-01T00:00:00.000",
+            "--lte", "2024-12-31T23:59:59.999",
+        ],
+    )
+    cli.main()
+
+    if mode == "dump":
+        replayed = FileEventSource([output]).iter_hits(
+            "2024-12-01T00:00:00.000", "2024-12-31T23:59:59.999"
+        )
+        assert len(list(replayed)) == 3
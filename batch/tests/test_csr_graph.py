@@ -0,0 +1,135 @@
+# tests/test_csr_graph.py
+"""
+shortest_path 가 홉 제한 안에서 전수 탐색과 같은 최단 비용을 내는지,
+personalized_pagerank 가 손으로 푼 값과 같고 확률 질량을 보존하는지
+"""
+import os
+import random
+
+import pytest
+
+from search_graph.csr_graph import (
+    build_csr,
+    load_csr,
+    personalized_pagerank,
+    shortest_path,
+    top_k,
+    write_graph,
+)
+
+
+def random_graph(rng, nodes=12, edges=30):
+    weights = {}
+    for _ in range(edges):
+        a, b = rng.sample(range(nodes), 2)
+        weights[(f"k{a}", f"k{b}")] = rng.randint(1, 20)
+    return build_csr((a, b, c) for (a, b), c in weights.items())
+
+
+def edge_costs(graph):
+    costs = {}
+    for u in range(graph.num_nodes):
+        for pos in range(graph.indptr[u], graph.indptr[u + 1]):
+            costs[(u, int(graph.indices[pos]))] = 1.0 / max(float(graph.counts[pos]), 1.0)
+    return costs
+
+
+def brute_force(costs, source, target, max_hops):
+    """max_hops 이하 모든 경로의 최소 비용 (없으면 None)"""
+    best = None
+    frontier = {source: 0.0}
+    for _ in range(max_hops):
+        nxt = {}
+        for u, d in frontier.items():
+            for (a, b), c in costs.items():
+                if a == u and d + c < nxt.get(b, float("inf")):
+                    nxt[b] = d + c
+        if target in nxt and (best is None or nxt[target] < best):
+            best = nxt[target]
+        frontier = nxt
+    return best
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_shortest_path_matches_brute_force(seed):
+    rng = random.Random(seed)
+    graph = random_graph(rng)
+    costs = edge_costs(graph)
+
+    for _ in range(10):
+        source, target = rng.sample(range(graph.num_nodes), 2)
+        max_hops = rng.randint(1, 4)
+        expected = brute_force(costs, source, target, max_hops)
+        found = shortest_path(graph, source, target, max_hops=max_hops, fanout=graph.num_nodes)
+
+        if expected is None:
+            assert found is None
+            continue
+        path, cost = found
+        assert path[0] == source and path[-1] == target
+        assert len(path) - 1 <= max_hops
+        assert cost == pytest.approx(sum(costs[(a, b)] for a, b in zip(path, path[1:])))
+        assert cost == pytest.approx(expected)
+
+
+# 치킨 -> 맥주(3), 치킨 -> 콜라(1), 맥주 -> 치킨(1), 콜라 는 나가는 간선 없음 (seed 로 재시작).
+# seed=치킨 이면 맥주/콜라로 간 질량은 모두 한 번에 치킨으로 돌아오므로
+#   pi(치킨) = a + (1-a)^2 pi(치킨)  ->  pi(치킨) = 1 / (2 - a)
+#   pi(맥주) = (1-a) * 3/4 * pi(치킨),  pi(콜라) = (1-a) * 1/4 * pi(치킨)
+SMALL_EDGES = [("치킨", "맥주", 3), ("치킨", "콜라", 1), ("맥주", "치킨", 1)]
+
+
+@pytest.mark.parametrize("alpha", [0.15, 0.5])
+def test_personalized_pagerank_matches_hand_computed(alpha):
+    graph = build_csr(iter(SMALL_EDGES))
+    seed = graph.index["치킨"]
+
+    nodes, scores = personalized_pagerank(graph, [seed], alpha=alpha, epsilon=1e-10, max_rounds=1000)
+    result = {graph.keywords[i]: score for i, score in zip(nodes, scores)}
+
+    home = 1.0 / (2.0 - alpha)
+    assert result == pytest.approx(
+        {
+            "치킨": home,
+            "맥주": (1 - alpha) * 0.75 * home,
+            "콜라": (1 - alpha) * 0.25 * home,
+        },
+        abs=1e-5,
+    )
+    assert sum(result.values()) == pytest.approx(1.0, abs=1e-5)
+    assert max(result, key=result.get) == "치킨"
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_personalized_pagerank_conserves_mass(seed):
+    rng = random.Random(seed)
+    graph = random_graph(rng, nodes=30, edges=80)
+    source = rng.randrange(graph.num_nodes)
+
+    nodes, scores = personalized_pagerank(graph, [source], alpha=0.2, epsilon=1e-9, max_rounds=1000)
+
+    assert (scores > 0).all()
+    assert len(set(nodes.tolist())) == len(nodes)
+    # 남은 잔차만큼만 모자라고 1 을 넘지 않는다
+    assert scores.sum() == pytest.approx(1.0, abs=1e-4)
+    assert scores.sum() <= 1.0 + 1e-6
+    # seed 는 재시작 확률만큼은 항상 받는다
+    assert dict(zip(nodes.tolist(), scores))[source] >= 0.2
+
+
+def test_top_k_excludes_seed_and_orders_by_score():
+    graph = build_csr(iter(SMALL_EDGES))
+    seed = graph.index["치킨"]
+    nodes, scores = personalized_pagerank(graph, [seed], epsilon=1e-10)
+
+    ranked = top_k(nodes, scores, 10, exclude=[seed])
+
+    assert [graph.keywords[i] for i, _ in ranked] == ["맥주", "콜라"]
+
+
+def test_write_graph_keeps_only_latest_files(tmp_path):
+    paths = [write_graph(str(tmp_path), build_csr(iter([("a", "b", i + 1)])), keep=2) for i in range(3)]
+
+    names = sorted(os.path.basename(p) for p in paths[1:])
+    assert sorted(os.listdir(tmp_path)) == ["LATEST"] + names
+    assert load_csr(paths[-1]).counts.tolist() == [3.0]
@@ -0,0 +1,89 @@
+# tests/test_es_client.py
+"""PCID 조회 왕복 수: 한 페이지에 들어오면 PIT 없이 검색 한 번"""
+import asyncio
+
+from search_graph.es_client import AsyncElasticsearchService, ElasticsearchService
+
+
+def make_hits(n):
+    return [{"_id": str(i), "sort": [i, i]} for i in range(n)]
+
+
+class FakeClient:
+    """search / PIT 호출을 기록하고, search_after 는 sort 값 위치로 흉내낸다"""
+
+    def __init__(self, hits):
+        self.hits = hits
+        self.calls = []
+
+    def open_point_in_time(self, index, keep_alive):
+        self.calls.append("open_pit")
+        return {"id": "pit-1"}
+
+    def close_point_in_time(self, body):
+        self.calls.append("close_pit")
+
+    def search(self, body, index=None):
+        self.calls.append("search_pit" if "pit" in body else "search")
+        start = 0
+        if "search_after" in body:
+            start = [h["sort"] for h in self.hits].index(body["search_after"]) + 1
+        return {"hits": {"hits": self.hits[start : start + body["size"]]}}
+
+
+class FakeAsyncClient(FakeClient):
+    async def open_point_in_time(self, index, keep_alive):
+        return FakeClient.open_point_in_time(self, index, keep_alive)
+
+    async def close_point_in_time(self, body):
+        FakeClient.close_point_in_time(self, body)
+
+    async def search(self, body, index=None):
+        return FakeClient.search(self, body, index)
+
+
+def sync_service(client):
+    service = object.__new__(ElasticsearchService)
+    service.client = client
+    return service
+
+
+def async_service(client):
+    service = object.__new__(AsyncElasticsearchService)
+    service.client = client
+    return service
+
+
+BODY = {"query": {"match_all": {}}, "sort": [{"ts": {"order": "asc"}}]}
+
+
+def test_small_result_is_one_search_without_pit():
+    client = FakeClient(make_hits(3))
+    hits = list(sync_service(client).iter_hits("idx", BODY, page_size=10, try_single_page=True))
+
+    assert [h["_id"] for h in hits] == ["0", "1", "2"]
+    assert client.calls == ["search"]
+
+
+def test_full_first_page_falls_back_to_pit_from_start():
+    client = FakeClient(make_hits(25))
+    hits = list(sync_service(client).iter_hits("idx", BODY, page_size=10, try_single_page=True))
+
+    assert [h["_id"] for h in hits] == [str(i) for i in range(25)]
+    assert client.calls == ["search", "open_pit", "search_pit", "search_pit", "search_pit", "close_pit"]
+
+
+def test_async_search_all_single_page():
+    small = FakeAsyncClient(make_hits(3))
+    large = FakeAsyncClient(make_hits(12))
+
+    async def run():
+        return (
+            await async_service(small).search_all("idx", BODY, page_size=10, try_single_page=True),
+            await async_service(large).search_all("idx", BODY, page_size=10, try_single_page=True),
+        )
+
+    small_hits, large_hits = asyncio.run(run())
+    assert len(small_hits) == 3 and small.calls == ["search"]
+    assert [h["_id"] for h in large_hits] == [str(i) for i in range(12)]
+    assert large.calls == ["search", "open_pit", "search_pit", "search_pit", "close_pit"]
@@ -0,0 +1,57 @@
+# tests/test_events.py
+"""SearchEvent.from_hit: 필드가 빠지거나 null 인 hit"""
+import pytest
+
+from search_graph.events import SearchEvent
+
+
+def _fields(event):
+    return (event.pcid, event.query, event.created_dt, event.result_count)
+
+
+def test_from_hit_reads_query_log():
+    hit = {
+        "_source": {
+            "query_log": {
+                "user_pcid": 123,
+                "search_query": "  치킨  ",
+                "created_date_time": "2024-01-01T00:00:00.000",
+                "result_count": 0,
+            }
+        }
+    }
+
+    assert _fields(SearchEvent.from_hit(hit)) == ("123", "치킨", "2024-01-01T00:00:00.000", 0)
+
+
+@pytest.mark.parametrize(
+    "hit",
+    [
+        {},
+        {"_source": None},
+        {"_source": {}},
+        {"_source": {"query_log": None}},
+        {"_source": {"query_log": {}}},
+        {"_source": {"other_field": {"user_pcid": "p1"}}},
+        {
+            "_source": {
+                "query_log": {
+                    "user_pcid": None,
+                    "search_query": None,
+                    "created_date_time": None,
+                    "result_count": None,
+                }
+            }
+        },
+    ],
+)
+def test_from_hit_missing_or_null_fields_are_empty(hit):
+    assert _fields(SearchEvent.from_hit(hit)) == ("", "", "", None)
+
+
+def test_from_hit_custom_key_field_and_normalizer():
+    hit = {"_source": {"log": {"user_pcid": "p1", "search_query": "Beer"}}}
+
+    event = SearchEvent.from_hit(hit, key_field="log", normalizer=str.upper)
+
+    assert _fields(event) == ("p1", "BEER", "", None)
@@ -0,0 +1,124 @@
+# tests/test_fail_pairs.py
+import csv
+import os
+import random
+from collections import Counter
+
+import pytest
+
+from search_graph.fail_pairs import (
+    CounterAggregator,
+    SqliteSpillAggregator,
+    TopKAggregator,
+    make_fail_pair_aggregator,
+    write_fail_pairs_csv,
+)
+
+
+def pcid_batches(seed=0, pcids=300):
+    """PCID 별 fail_pairs Counter. 앞쪽 몇 쌍에 몰리고 count 동률이 많다"""
+    rng = random.Random(seed)
+    heavy = [(f"인기{i}", f"후속{i}") for i in range(5)]
+    batches = []
+    for p in range(pcids):
+        pairs = Counter()
+        for _ in range(rng.randint(1, 4)):
+            pairs[rng.choice(heavy)] += 1
+        pairs[(f"꼬리{p}", f"후속{p % 7}")] += 1
+        batches.append(pairs)
+    return batches
+
+
+def feed(aggregator, batches):
+    for pairs in batches:
+        aggregator.update(pairs)
+    return aggregator
+
+
+def expected_top(batches):
+    total = Counter()
+    for pairs in batches:
+        total.update(pairs)
+    return sorted(((a, b, c) for (a, b), c in total.items()), key=lambda row: (-row[2], row[0], row[1]))
+
+
+def test_aggregators_agree_on_top_n(tmp_path):
+    batches = pcid_batches()
+    expected = expected_top(batches)
+
+    memory = feed(CounterAggregator(), batches)
+    spill = feed(SqliteSpillAggregator(str(tmp_path / "pairs.sqlite"), spill_threshold=10), batches)
+    topk = feed(TopKAggregator(k=20, width=1 << 16), batches)
+
+    assert list(memory.iter_top()) == expected
+    assert list(spill.iter_top()) == expected
+    # topk 는 근사(꼬리 쌍은 잘린다)지만 뚜렷한 상위 쌍은 count 와 순서까지 같다
+    assert list(topk.iter_top())[:5] == expected[:5]
+    assert len(list(topk.iter_top())) == 20
+    spill.close()
+
+
+def test_sqlite_counts_are_exact_after_spills():
+    batches = pcid_batches(seed=1)
+    aggregator = SqliteSpillAggregator(spill_threshold=3)
+
+    feed(aggregator, batches)
+    # 마지막 버퍼는 아직 SQLite 에 없다
+    assert aggregator.spills > 0
+
+    assert list(aggregator.iter_top()) == expected_top(batches)
+    assert len(aggregator) == len(expected_top(batches))
+    aggregator.close()
+
+
+def test_sqlite_temp_file_is_removed_on_close():
+    aggregator = SqliteSpillAggregator()
+    path = aggregator.path
+    assert os.path.exists(path)
+
+    aggregator.close()
+
+    assert not os.path.exists(path)
+
+
+def test_topk_stays_bounded():
+    aggregator = TopKAggregator(k=50, width=1 << 12)
+
+    for i in range(5000):
+        aggregator.update({(f"a{i}", "b"): 1})
+        assert len(aggregator._top) <= 2 * aggregator.k
+
+    assert len(aggregator) == 50
+    assert len(list(aggregator.iter_top())) == 50
+
+
+def test_topk_keeps_heavy_hitter_seen_late():
+    aggregator = TopKAggregator(k=10, width=1 << 16)
+    for i in range(1000):
+        aggregator.update({(f"a{i}", "b"): 1})
+    aggregator.update({("늦게", "인기"): 500})
+
+    assert next(aggregator.iter_top()) == ("늦게", "인기", 500)
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        make_fail_pair_aggregator("bloom")
+
+
+def test_csv_quotes_keywords_with_commas_and_quotes(tmp_path):
+    aggregator = CounterAggregator()
+    aggregator.update({("맥주,소주", '치킨 "반반"'): 2, ("줄\n바꿈", "평범"): 1})
+    path = tmp_path / "out" / "fail_pairs.csv"
+
+    rows = write_fail_pairs_csv(aggregator, str(path))
+
+    assert rows == 2
+    raw = path.read_text(encoding="utf-8")
+    assert raw.splitlines()[1] == '"맥주,소주","치킨 ""반반""",2'
+    with open(path, encoding="utf-8", newline="") as f:
+        assert list(csv.reader(f)) == [
+            ["A", "B", "pair_count"],
+            ["맥주,소주", '치킨 "반반"', "2"],
+            ["줄\n바꿈", "평범", "1"],
+        ]
@@ -0,0 +1,125 @@
+# tests/test_hit_cache.py
+import os
+
+import pytest
+
+from search_graph.hit_cache import HitCache, _decode, _encode
+
+
+def _hit(i):
+    return {"_source": {"query_log": {"user_pcid": "p1", "search_query": f"검색어{i}", "result_count": i}}}
+
+
+@pytest.mark.parametrize(
+    "hits",
+    [
+        [],
+        [_hit(1), _hit(2)],
+        # 필드 구성이 hit 마다 다르고, 빈 dict / 리스트 값이 있는 경우
+        [
+            {"_source": {"a": {"b": 1}, "tags": ["x", "y"]}},
+            {"_source": {"a": {"c": "두번째"}, "empty": {}}},
+            {"_source": {}},
+        ],
+        # 점이 들어간 필드명과 같은 경로의 중첩 필드가 섞인 경우
+        [
+            {"_source": {"query_log.search_query": "점 필드", "query_log": {"search_query": "중첩"}}},
+            {"_source": {"a.b": {"c.d": 1}}},
+        ],
+    ],
+)
+def test_encode_decode_round_trip(hits):
+    assert _decode(_encode(hits)) == hits
+
+
+def test_decode_drops_null_fields():
+    hits = [{"_source": {"a": None, "b": 1}}]
+
+    assert _decode(_encode(hits)) == [{"_source": {"b": 1}}]
+
+
+def test_get_put_counts_hits_and_misses(tmp_path):
+    cache = HitCache(str(tmp_path))
+    key = HitCache.make_key("idx", "p1", "gte", "lte", {"query": {}})
+
+    assert cache.get(key) is None
+    cache.put(key, [_hit(1)])
+    assert cache.get(key) == [_hit(1)]
+    assert cache.get(key) == [_hit(1)]
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 1, 0.667)
+
+
+def test_corrupt_file_is_a_miss_and_removed(tmp_path):
+    cache = HitCache(str(tmp_path))
+    cache.put("ab01", [_hit(1)])
+    path = cache._path("ab01")
+    with open(path, "wb") as f:
+        f.write(b"not zlib")
+
+    assert cache.get("ab01") is None
+    assert not os.path.exists(path)
+    assert cache.stats()["misses"] == 1
+
+
+def test_make_key_depends_on_body():
+    base = HitCache.make_key("idx", "p1", "gte", "lte", {"size": 10, "query": {}})
+
+    assert base == HitCache.make_key("idx", "p1", "gte", "lte", {"query": {}, "size": 10})
+    assert base != HitCache.make_key("idx", "p1", "gte", "lte", {"query": {}, "size": 11})
+    assert base != HitCache.make_key("idx", "p2", "gte", "lte", {"size": 10, "query": {}})
+
+
+def test_evicts_least_recently_used_by_mtime(tmp_path):
+    probe = HitCache(str(tmp_path / "probe"))
+    probe.put("00", [_hit(1)])
+    size = probe.total_bytes
+
+    # 3 개까지 들어가고 4 번째에서 90% 아래로 줄이면 1 개만 지워진다
+    cache = HitCache(str(tmp_path / "cache"), max_bytes=int(size * 3.5))
+    for t, key in enumerate(["aa", "bb", "cc"]):
+        cache.put(key, [_hit(1)])
+        os.utime(cache._path(key), (1000 + t, 1000 + t))
+
+    # aa 를 읽으면 mtime 이 갱신되어 가장 최근 사용이 된다
+    assert cache.get("aa") is not None
+    cache.put("dd", [_hit(1)])
+
+    assert cache.get("bb") is None
+    assert all(cache.get(key) is not None for key in ("aa", "cc", "dd"))
+    assert cache.stats()["evictions"] == 1
+    assert cache.total_bytes == 3 * size
+
+
+def test_total_bytes_survives_restart(tmp_path):
+    cache = HitCache(str(tmp_path))
+    cache.put("aa", [_hit(1)])
+    cache.put("aa", [_hit(1), _hit(2)])
+
+    assert HitCache(str(tmp_path)).total_bytes == cache.total_bytes == os.path.getsize(cache._path("aa"))
+
+
+def test_cached_stores_after_full_read(tmp_path):
+    cache = HitCache(str(tmp_path))
+    hits = [_hit(i) for i in range(5)]
+
+    stream = cache.cached("aa", iter(hits))
+    assert next(stream) == hits[0]
+    assert cache.get("aa") is None  # 끝까지 읽기 전에는 저장하지 않는다
+    assert list(stream) == hits[1:]
+
+    assert cache.get("aa") == hits
+
+
+def test_cached_skips_sequences_over_max_hits(tmp_path):
+    cache = HitCache(str(tmp_path), max_hits=3)
+    hits = [_hit(i) for i in range(10)]
+
+    assert list(cache.cached("aa", iter(hits))) == hits
+    cache.put("bb", hits)
+
+    assert cache.get("aa") is None
+    assert cache.get("bb") is None
+    assert cache.stats()["skipped"] == 2
+    assert cache.total_bytes == 0
@@ -0,0 +1,152 @@
+# tests/test_keyword_cache.py
+import asyncio
+
+import pytest
+from neo4j.exceptions import ClientError
+
+from search_graph import neo4j_client as nc
+from search_graph.edge_accumulator import EdgeAccumulator
+from search_graph.keyword_cache import KnownKeywordCache
+from search_graph.neo4j_client import AsyncNeo4jBatchWriter, Neo4jBatchWriter
+
+from fake_neo4j import FakeGraph, fail_once, fake_service
+
+
+def make_acc(*edges):
+    acc = EdgeAccumulator()
+    for a, b in edges:
+        acc.add_next(a, b)
+    return acc
+
+
+def record_merged(graph, hook=None):
+    """UNWIND_MERGE_KEYWORDS 로 보낸 키워드 목록을 tx.run 마다 기록"""
+    merged = []
+
+    def recorder(query, params):
+        if hook is not None:
+            hook(query, params)
+        if query == nc.UNWIND_MERGE_KEYWORDS:
+            merged.append(list(params["rows"]))
+
+    graph.fail_hook = recorder
+    return merged
+
+
+def test_known_keywords_are_skipped_in_node_merge():
+    graph = FakeGraph()
+    graph.keywords.update(["치킨"])
+    merged = record_merged(graph)
+    cache = KnownKeywordCache()
+    cache.add_all(["치킨"])
+    writer = Neo4jBatchWriter(graph.driver(), known_keywords=cache)
+
+    writer.merge(make_acc(("치킨", "맥주"), ("맥주", "치킨")))
+    writer.flush()
+
+    assert merged == [["맥주"]]
+    assert graph.next == {("치킨", "맥주"): 1, ("맥주", "치킨"): 1}
+    assert "맥주" in cache
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_empty_merge_when_every_keyword_is_known():
+    graph = FakeGraph()
+    graph.keywords.update(["a", "b"])
+    merged = record_merged(graph)
+    cache = KnownKeywordCache()
+    cache.add_all(["a", "b"])
+    writer = Neo4jBatchWriter(graph.driver(), known_keywords=cache)
+
+    writer.merge(make_acc(("a", "b")))
+    writer.flush()
+
+    assert merged == []
+    assert graph.next == {("a", "b"): 1}
+
+
+def test_cache_is_filled_only_after_commit():
+    graph = FakeGraph()
+    merged = record_merged(graph, fail_once(nc.UNWIND_NEXT_RELATIONS, ClientError("boom")))
+    cache = KnownKeywordCache()
+    writer = Neo4jBatchWriter(graph.driver(), known_keywords=cache)
+    writer.merge(make_acc(("a", "b")))
+
+    with pytest.raises(ClientError):
+        writer.flush()
+    assert graph.commits == 0
+    assert len(cache) == 0
+
+    # 재시도하는 배치는 키워드 MERGE 를 다시 보낸다
+    writer.flush()
+    assert merged == [["a", "b"], ["a", "b"]]
+    assert graph.next == {("a", "b"): 1}
+    assert "a" in cache and "b" in cache
+
+
+def test_async_writer_fills_cache_only_after_commit():
+    graph = FakeGraph()
+    graph.fail_hook = fail_once(nc.UNWIND_NEXT_RELATIONS, ClientError("boom"))
+    cache = KnownKeywordCache()
+    writer = AsyncNeo4jBatchWriter(graph.async_driver(), known_keywords=cache)
+
+    async def run():
+        writer.merge(make_acc(("a", "b")))
+        with pytest.raises(ClientError):
+            await writer.flush()
+        assert len(cache) == 0
+        await writer.flush()
+
+    asyncio.run(run())
+    assert "a" in cache and "b" in cache
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = KnownKeywordCache(max_size=2)
+    cache.add_all(["a", "b"])
+
+    # a 를 조회하면 최근 사용이 되어 b 가 먼저 빠진다
+    assert cache.filter_unknown(["a", "x"]) == ["x"]
+    cache.add_all(["c"])
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+        "evictions": 1,
+        "size": 2,
+    }
+
+
+def test_discard_all_forgets_deleted_nodes():
+    cache = KnownKeywordCache()
+    cache.add_all(["a", "b"])
+
+    cache.discard_all(["a", "missing"])
+
+    assert cache.filter_unknown(["a", "b"]) == ["a"]
+
+
+def test_prewarm_loads_graph_names_up_to_cache_size():
+    graph = FakeGraph()
+    graph.keywords.update(["a", "b", "c"])
+    service = fake_service(graph, known_keyword_cache_size=2)
+
+    assert service.prewarm_known_keywords() == 2
+    known = service.known_keywords
+    assert "a" in known and "b" in known and "c" not in known
+
+    merged = record_merged(graph)
+    with service.batch_writer() as writer:
+        writer.merge(make_acc(("a", "c")))
+    assert merged == [["c"]]
+
+
+def test_prewarm_without_cache_is_noop():
+    graph = FakeGraph()
+    graph.keywords.update(["a"])
+    service = fake_service(graph, known_keyword_cache_size=0)
+
+    assert service.known_keywords is None
+    assert service.prewarm_known_keywords() == 0
@@ -0,0 +1,125 @@
+# tests/test_normalize.py
+"""KeywordNormalizer 규칙과 기존 Keyword 정규화 마이그레이션"""
+import pytest
+
+from fake_neo4j import FakeGraph, fake_service
+from search_graph.normalize import KeywordNormalizer, NormalizeConfig, normalize_keyword
+from search_graph.search_log_processor import SearchLogProcessor
+
+SAMPLES = [
+    "ＴＥＲＲＡ",
+    "  테라\t\n맥주  ",
+    "Straße",
+    "㈜ 치킨",
+    "ﬁ LIGHT",
+    "'따옴표' \"검색어\"",
+    "ǅ",
+    "",
+]
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("ＴＥＲＲＡ", "terra"),  # NFKC 전각 → 반각 + casefold
+        ("TERRA ", "terra"),
+        ("  테라\t\n맥주  ", "테라 맥주"),
+        ("Straße", "strasse"),  # casefold 는 lower 보다 넓다
+        ("㈜", "(주)"),
+        ("", ""),
+        (None, ""),
+    ],
+)
+def test_default_rules(raw, expected):
+    assert normalize_keyword(raw) == expected
+
+
+def test_disabled_only_strips():
+    normalizer = KeywordNormalizer(NormalizeConfig(enabled=False))
+
+    assert normalizer("  ＴＥＲＲＡ  ") == "ＴＥＲＲＡ"
+
+
+@pytest.mark.parametrize(
+    "replacements",
+    [
+        [],
+        [["[\"'`]", ""]],
+        # 치환 결과에 대문자/공백이 생기는 규칙
+        [["맥주", " BEER  "]],
+        # 한 번 치환한 결과가 다시 규칙에 걸리는 규칙 (aaaa → aa → a)
+        [["aa", "a"]],
+        [["ｆｉ", "Ⅸ"], ["ix", "아홉"]],
+    ],
+)
+def test_idempotent_with_replacements(replacements):
+    normalizer = KeywordNormalizer(NormalizeConfig.from_dict({"replacements": replacements}))
+
+    for raw in SAMPLES + ["aaaa 맥주", "ﬁ", "Ⅸ"]:
+        once = normalizer(raw)
+        assert normalizer(once) == once, raw
+
+
+def test_replacements_are_normalized_again():
+    normalizer = KeywordNormalizer(
+        NormalizeConfig.from_dict({"replacements": [["맥주", " BEER  "], ["aa", "a"]]})
+    )
+
+    assert normalizer("테라맥주") == "테라 beer"
+    assert normalizer("aaaa") == "a"
+
+
+def test_result_is_interned():
+    normalizer = KeywordNormalizer()
+
+    assert normalizer("TERRA") is normalizer("terra ")
+
+
+def test_migration_merges_counts_and_drops_same_target_edges():
+    graph = FakeGraph()
+    graph.keywords.update(["terra", "TERRA", "Terra ", "맥주", "치킨", "Beer"])
+    graph.next.update(
+        {
+            ("TERRA", "맥주"): 3,
+            ("terra", "맥주"): 2,
+            ("Terra ", "맥주"): 1,
+            ("치킨", "TERRA"): 4,
+            ("치킨", "Terra "): 5,
+            # 같은 target 으로 합쳐지는 변형끼리 / target 과 변형 사이 간선은 자기 자신이 된다
+            ("TERRA", "Terra "): 7,
+            ("terra", "TERRA"): 8,
+            # 양 끝이 서로 다른 target 의 변형
+            ("TERRA", "Beer"): 6,
+        }
+    )
+    graph.fail.update(
+        {
+            ("TERRA", "치킨"): [1, "2024-01-02", "2024-01-03"],
+            ("terra", "치킨"): [2, "2024-01-01", "2024-01-02"],
+            ("Terra ", "치킨"): [1, "2024-01-05", "2024-01-09"],
+        }
+    )
+    service = fake_service(graph, batch_size=1)
+    processor = SearchLogProcessor(es=None, neo=service, index_name="idx", query_file="")
+
+    variants = processor.normalize_existing_keywords()
+
+    assert variants == {"TERRA": "terra", "Terra ": "terra", "Beer": "beer"}
+    assert graph.keywords == {"terra", "beer", "맥주", "치킨"}
+    assert graph.next == {
+        ("terra", "맥주"): 6,
+        ("치킨", "terra"): 9,
+        ("terra", "beer"): 6,
+    }
+    assert graph.fail == {("terra", "치킨"): [4, "2024-01-01", "2024-01-09"]}
+
+
+def test_migration_dry_run_does_not_write():
+    graph = FakeGraph()
+    graph.keywords.update(["TERRA", "맥주"])
+    graph.next[("TERRA", "맥주")] = 1
+    processor = SearchLogProcessor(es=None, neo=fake_service(graph), index_name="idx", query_file="")
+
+    assert processor.normalize_existing_keywords(dry_run=True) == {"TERRA": "terra"}
+    assert graph.keywords == {"TERRA", "맥주"}
+    assert graph.commits == 0
@@ -0,0 +1,36 @@
+# tests/test_parallel.py
+"""process_all_pcids 병렬 경로: 한 PCID 가 실패하면 남은 PCID 를 기다리지 않는다"""
+import threading
+
+import pytest
+
+from search_graph.fail_pairs import CounterAggregator
+from search_graph.search_log_processor import SearchLogProcessor
+
+from fake_neo4j import FakeGraph, fake_service
+
+
+def test_failure_cancels_pending_pcids(tmp_path):
+    processor = SearchLogProcessor(
+        es=None, neo=fake_service(FakeGraph()), index_name="idx", query_file=""
+    )
+    started = []
+    lock = threading.Lock()
+
+    def process_pcid(pcid, gte, lte, size, writer=None, exclusive_start=False):
+        with lock:
+            started.append(pcid)
+        if pcid == "p0005":
+            raise RuntimeError("ES down")
+        return {}
+
+    processor.process_pcid = process_pcid
+    pcids = [f"p{i:04d}" for i in range(1000)]
+
+    with pytest.raises(RuntimeError):
+        processor._process_pcids_parallel(
+            pcids, "gte", "lte", 100, workers=2, range_key="r",
+            exclusive_start=False, total_fail_pairs=CounterAggregator(),
+        )
+    # 실패 시점에 제출돼 있던 PCID (워커 수의 2배 + 실행 중) 정도만 시작됐다
+    assert len(started) < 20
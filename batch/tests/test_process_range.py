@@ -0,0 +1,70 @@
+# tests/test_process_range.py
+"""process_range: 기간 스트림 하나를 PCID 경계에서 나눠 PCID 별 처리와 같은 그래프를 만든다"""
+from search_graph.search_log_processor import SearchLogProcessor
+
+from fake_neo4j import FakeGraph, fake_service
+
+
+def hit(pcid, query, minute):
+    return {
+        "_source": {
+            "query_log": {
+                "user_pcid": pcid,
+                "search_query": query,
+                "created_date_time": f"2024-12-01T10:{minute:02d}:00.000",
+            }
+        }
+    }
+
+
+# (user_pcid, created_date_time) 순으로 정렬된 기간 스트림
+HITS = [
+    hit("p1", "테라", 1),
+    hit("p1", "카스", 2),
+    hit("p2", "맥주", 1),
+    hit("p2", "치킨", 3),
+    hit("p3", "치킨", 2),
+    hit("", "무시", 4),
+]
+
+
+class FakeSearch:
+    def __init__(self, hits):
+        self.hits = hits
+        self.bodies = []
+
+    def iter_hits(self, index_name, body, page_size=1000, **kwargs):
+        self.bodies.append(body)
+        return iter(self.hits)
+
+
+def make_processor(graph, tmp_path):
+    return SearchLogProcessor(
+        es=FakeSearch(HITS),
+        neo=fake_service(graph),
+        index_name="idx",
+        query_file="",
+        fail_pair_csv_path=str(tmp_path / "fail_pairs.csv"),
+    )
+
+
+def test_range_stream_matches_per_pcid_processing(tmp_path):
+    graph = FakeGraph()
+    processor = make_processor(graph, tmp_path)
+
+    rows = processor.process_range("gte", "lte", 100)
+
+    # PCID 가 바뀌는 곳(카스 → 맥주)에는 간선이 생기지 않는다
+    assert graph.next == {("테라", "카스"): 1, ("맥주", "치킨"): 1}
+    assert rows == 2
+    with open(tmp_path / "fail_pairs.csv", encoding="utf-8") as f:
+        assert sorted(f.read().splitlines()[1:]) == ["맥주,치킨,1", "테라,카스,1"]
+    assert "무시" not in graph.keywords
+    assert len(processor.es.bodies) == 1
+
+    expected = FakeGraph()
+    per_pcid = make_processor(expected, tmp_path)
+    for pcid in ("p1", "p2", "p3"):
+        per_pcid.process_hits([h for h in HITS if h["_source"]["query_log"]["user_pcid"] == pcid])
+    assert graph.next == expected.next
+    assert graph.fail == expected.fail
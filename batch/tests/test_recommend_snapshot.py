@@ -0,0 +1,70 @@
+# tests/test_recommend_snapshot.py
+import gzip
+import os
+
+import pytest
+
+from search_graph.recommend_snapshot import (
+    latest_snapshot_path,
+    load_snapshot,
+    prune_snapshots,
+    write_snapshot,
+)
+
+ROWS = [
+    ("치킨", [("맥주", 5), ("콜라", 2)], [("치킨무", 1)]),
+    ('따옴표"키워드', [], [("a,b", 3)]),
+]
+
+
+def test_write_then_load_round_trip(tmp_path):
+    path = write_snapshot(str(tmp_path), iter(ROWS), top_n=2)
+
+    assert latest_snapshot_path(str(tmp_path)) == path
+    snapshot = load_snapshot(path)
+    assert snapshot.top_n == 2
+    assert os.path.basename(path) == f"recommend-{snapshot.version}.json.gz"
+    assert snapshot.items == {
+        "치킨": {"next": [("맥주", 5), ("콜라", 2)], "fail_next": [("치킨무", 1)]},
+        '따옴표"키워드': {"next": [], "fail_next": [("a,b", 3)]},
+    }
+
+
+def test_empty_snapshot_round_trip(tmp_path):
+    path = write_snapshot(str(tmp_path), iter([]), top_n=20)
+
+    assert load_snapshot(path).items == {}
+
+
+def test_write_keeps_only_latest_snapshots(tmp_path):
+    paths = [write_snapshot(str(tmp_path), iter(ROWS), top_n=2, keep=2) for _ in range(4)]
+
+    remaining = sorted(n for n in os.listdir(tmp_path) if n.startswith("recommend-"))
+    assert remaining == sorted(os.path.basename(p) for p in paths[-2:])
+    assert latest_snapshot_path(str(tmp_path)) == paths[-1]
+
+
+def test_prune_never_removes_latest_or_tmp(tmp_path):
+    for name in ("recommend-1.json.gz", "recommend-2.json.gz", "recommend-3.json.gz.tmp"):
+        (tmp_path / name).write_bytes(b"")
+    # LATEST 가 가장 오래된 파일을 가리키는 경우 (되돌린 상태)
+    (tmp_path / "LATEST").write_text("recommend-1.json.gz")
+
+    removed = prune_snapshots(str(tmp_path), "recommend-", keep=1)
+
+    assert removed == []
+    assert sorted(os.listdir(tmp_path)) == [
+        "LATEST",
+        "recommend-1.json.gz",
+        "recommend-2.json.gz",
+        "recommend-3.json.gz.tmp",
+    ]
+
+
+@pytest.mark.parametrize("body", [b"not gzip", gzip.compress(b'{"format_version": 1, "items": {')])
+def test_load_corrupt_snapshot_raises(tmp_path, body):
+    path = tmp_path / "recommend-x.json.gz"
+    path.write_bytes(body)
+
+    with pytest.raises(Exception):
+        load_snapshot(str(path))
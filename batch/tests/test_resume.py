@@ -0,0 +1,285 @@
+# tests/test_resume.py
+"""체크포인트로 중단 후 재개했을 때 그래프와 FAIL_NEXT 후보 CSV 가 한 번에 끝낸 실행과 같은지"""
+import csv
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from search_graph import cli
+from search_graph.async_pipeline import PipelineConfig
+from search_graph.checkpoint import CheckpointStore
+from search_graph.search_log_processor import SearchLogProcessor
+from search_graph.sources import write_ndjson
+
+from fake_es import FakeAsyncSearch
+from fake_neo4j import FakeGraph, fake_service
+
+GTE, LTE = "2024-12-01T00:00:00.000", "2024-12-31T23:59:59.999"
+INDEX = "search-log"
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yml")
+
+
+def hit(pcid, query, minute):
+    return {
+        "_source": {
+            "query_log": {
+                "user_pcid": pcid,
+                "search_query": query,
+                "created_date_time": f"2024-12-01T10:{minute:02d}:00.000",
+                "result_count": 0,
+            }
+        }
+    }
+
+
+HITS = {
+    "p1": [hit("p1", "테라", 1), hit("p1", "카스", 2), hit("p1", "맥주", 3)],
+    "p2": [hit("p2", "카스", 1), hit("p2", "맥주", 2), hit("p2", "테라", 3)],
+    "p3": [hit("p3", "맥주", 1), hit("p3", "테라", 2)],
+    "p4": [hit("p4", "테라", 1), hit("p4", "카스", 2)],
+}
+
+
+class ListSource:
+    """user_pcid → created_date_time 순 스트림 (after_pcid 재개 지원)"""
+
+    def iter_hits(self, gte, lte, page_size=10000, exclusive_start=False, after_pcid=None):
+        for pcid in sorted(HITS):
+            if after_pcid is None or pcid > after_pcid:
+                yield from HITS[pcid]
+
+
+class Crash(BaseException):
+    """프로세스 강제 종료 대신 (except Exception 에 잡히지 않도록 BaseException)"""
+
+
+def crash_on_call(func, n):
+    """n 번째 호출에서 Crash 를 던지는 래퍼 (Neo4j 커밋 뒤 체크포인트 기록 전 중단)"""
+    calls = {"n": 0}
+
+    def wrapped(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == n:
+            raise Crash()
+        return func(*args, **kwargs)
+
+    return wrapped
+
+
+def make_processor(graph, tmp_path, checkpoint=None):
+    processor = SearchLogProcessor(
+        es=None,
+        neo=fake_service(graph, batch_size=1),
+        index_name=INDEX,
+        query_file="",
+        fail_pair_csv_path=str(tmp_path / "fail_pairs.csv"),
+        checkpoint=checkpoint,
+        source=ListSource(),
+    )
+    processor.fetch_hits_by_pcid = lambda pcid, *args, **kwargs: iter(HITS[pcid])
+    # --pipeline 경로용
+    processor.es = FakeAsyncSearch(HITS)
+    return processor
+
+
+def read_csv(path):
+    with open(path, encoding="utf-8") as f:
+        return sorted(tuple(row) for row in csv.reader(f))
+
+
+@pytest.fixture
+def pcid_list(tmp_path):
+    path = tmp_path / "pcids.csv"
+    path.write_text("user_pcid\n" + "\n".join(sorted(HITS)) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def reference(tmp_path, pcid_list):
+    """중단 없이 한 번에 처리한 결과"""
+    graph = FakeGraph()
+    ref_dir = tmp_path / "ref"
+    ref_dir.mkdir()
+    make_processor(graph, ref_dir).process_all_pcids(pcid_list, GTE, LTE)
+    return graph, read_csv(ref_dir / "fail_pairs.csv")
+
+
+def test_process_all_pcids_resume_after_crash(tmp_path, pcid_list, reference):
+    ref_graph, ref_csv = reference
+    graph = FakeGraph()
+    ck_path = str(tmp_path / "ck.db")
+
+    checkpoint = CheckpointStore(ck_path)
+    # p2 의 flush 가 Neo4j 에 커밋된 직후, 완료 기록 전에 중단
+    checkpoint.mark_completed = crash_on_call(checkpoint.mark_completed, 2)
+    with pytest.raises(Crash):
+        make_processor(graph, tmp_path, checkpoint).process_all_pcids(pcid_list, GTE, LTE)
+    checkpoint.close()
+
+    checkpoint = CheckpointStore(ck_path)
+    assert checkpoint.completed_pcids(CheckpointStore.range_key(GTE, LTE)) == {"p1"}
+    make_processor(graph, tmp_path, checkpoint).process_all_pcids(pcid_list, GTE, LTE)
+
+    assert graph.next == ref_graph.next
+    assert graph.fail == ref_graph.fail
+    # 재개한 실행의 CSV 도 이전 실행에서 완료된 PCID 몫을 포함한다
+    assert read_csv(tmp_path / "fail_pairs.csv") == ref_csv
+    assert graph.applied == []
+    # PCID 목록 처리는 기간 전체 watermark 를 옮기지 않는다
+    assert checkpoint.get_watermark(INDEX) is None
+    checkpoint.close()
+
+
+def test_process_all_pcids_rerun_after_completion_keeps_csv(tmp_path, pcid_list, reference):
+    ref_graph, ref_csv = reference
+    graph = FakeGraph()
+    checkpoint = CheckpointStore(str(tmp_path / "ck.db"))
+    make_processor(graph, tmp_path, checkpoint).process_all_pcids(pcid_list, GTE, LTE)
+    make_processor(graph, tmp_path, checkpoint).process_all_pcids(pcid_list, GTE, LTE)
+
+    assert graph.next == ref_graph.next
+    assert read_csv(tmp_path / "fail_pairs.csv") == ref_csv
+    checkpoint.close()
+
+
+def test_process_all_pcids_parallel_resume_after_crash(tmp_path, pcid_list, reference):
+    ref_graph, ref_csv = reference
+    graph = FakeGraph()
+    ck_path = str(tmp_path / "ck.db")
+
+    checkpoint = CheckpointStore(ck_path)
+    checkpoint.mark_completed = crash_on_call(checkpoint.mark_completed, 2)
+    with pytest.raises(Crash):
+        make_processor(graph, tmp_path, checkpoint).process_all_pcids(
+            pcid_list, GTE, LTE, workers=2
+        )
+    checkpoint.close()
+
+    checkpoint = CheckpointStore(ck_path)
+    make_processor(graph, tmp_path, checkpoint).process_all_pcids(
+        pcid_list, GTE, LTE, workers=2
+    )
+    assert graph.next == ref_graph.next
+    assert graph.fail == ref_graph.fail
+    assert read_csv(tmp_path / "fail_pairs.csv") == ref_csv
+    checkpoint.close()
+
+
+def test_process_all_pcids_pipeline_resume_after_crash(tmp_path, pcid_list, reference):
+    ref_graph, ref_csv = reference
+    graph = FakeGraph()
+    ck_path = str(tmp_path / "ck.db")
+    pipeline = PipelineConfig(fetchers=2, transformers=2, writers=1, queue_size=1)
+
+    checkpoint = CheckpointStore(ck_path)
+    checkpoint.mark_completed = crash_on_call(checkpoint.mark_completed, 2)
+    with pytest.raises(Crash):
+        make_processor(graph, tmp_path, checkpoint).process_all_pcids(
+            pcid_list, GTE, LTE, pipeline=pipeline
+        )
+    checkpoint.close()
+
+    checkpoint = CheckpointStore(ck_path)
+    completed = checkpoint.completed_pcids(CheckpointStore.range_key(GTE, LTE))
+    assert len(completed) == 1
+    processor = make_processor(graph, tmp_path, checkpoint)
+    processor.process_all_pcids(pcid_list, GTE, LTE, pipeline=pipeline)
+
+    # 완료 기록된 PCID 는 다시 조회하지 않는다
+    assert not completed & set(processor.es.searched)
+    assert graph.next == ref_graph.next
+    assert graph.fail == ref_graph.fail
+    assert read_csv(tmp_path / "fail_pairs.csv") == ref_csv
+    assert graph.applied == []
+    checkpoint.close()
+
+
+def test_process_range_resume_after_crash(tmp_path, reference):
+    ref_graph, ref_csv = reference
+    graph = FakeGraph()
+    ck_path = str(tmp_path / "ck.db")
+    range_key = CheckpointStore.range_key(GTE, LTE)
+
+    checkpoint = CheckpointStore(ck_path)
+    checkpoint.set_progress = crash_on_call(checkpoint.set_progress, 3)
+    with pytest.raises(Crash):
+        make_processor(graph, tmp_path, checkpoint).process_range(GTE, LTE)
+    checkpoint.close()
+
+    checkpoint = CheckpointStore(ck_path)
+    assert checkpoint.get_progress(range_key) == "p2"
+    make_processor(graph, tmp_path, checkpoint).process_range(GTE, LTE)
+
+    assert graph.next == ref_graph.next
+    assert graph.fail == ref_graph.fail
+    assert read_csv(tmp_path / "fail_pairs.csv") == ref_csv
+    assert graph.applied == []
+    assert checkpoint.get_watermark(INDEX) == LTE
+    assert checkpoint.get_progress(range_key) is None
+    assert list(checkpoint.iter_fail_pairs(range_key)) == []
+    checkpoint.close()
+
+
+def test_process_range_skips_completed_range(tmp_path, reference):
+    ref_graph, _ = reference
+    graph = FakeGraph()
+    checkpoint = CheckpointStore(str(tmp_path / "ck.db"))
+    make_processor(graph, tmp_path, checkpoint).process_range(GTE, LTE)
+    # 같은 기간을 다시 실행해도 count 를 두 번 더하지 않는다
+    assert make_processor(graph, tmp_path, checkpoint).process_range(GTE, LTE) == 0
+
+    assert graph.next == ref_graph.next
+    assert graph.fail == ref_graph.fail
+    checkpoint.close()
+
+
+class TickingClock:
+    """cli.datetime 대역: now() 를 부를 때마다 1분씩 흐른다 (재시도마다 현재 시각이 다르다)"""
+
+    current = datetime(2025, 1, 1)
+
+    @classmethod
+    def now(cls):
+        cls.current += timedelta(minutes=1)
+        return cls.current
+
+
+def test_since_checkpoint_resume_reuses_pinned_window(tmp_path, monkeypatch, reference):
+    ref_graph, ref_csv = reference
+    graph = FakeGraph()
+    events = str(tmp_path / "events.ndjson")
+    write_ndjson(events, [h for pcid in sorted(HITS) for h in HITS[pcid]])
+    ck_path = str(tmp_path / "ck.db")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "datetime", TickingClock)
+    monkeypatch.setattr(cli, "Neo4jService", lambda *args, **kwargs: fake_service(graph, batch_size=1))
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "search-graph", "process_range",
+            "--config", CONFIG,
+            "--checkpoint", ck_path,
+            "--since-checkpoint",
+            "--input", events,
+        ],
+    )
+
+    set_progress = CheckpointStore.set_progress
+    monkeypatch.setattr(CheckpointStore, "set_progress", crash_on_call(set_progress, 3))
+    with pytest.raises(Crash):
+        cli.main()
+
+    # --lte 없이 재시도: 현재 시각은 바뀌었지만 고정된 기간으로 재개
+    monkeypatch.setattr(CheckpointStore, "set_progress", set_progress)
+    cli.main()
+
+    assert graph.next == ref_graph.next
+    assert graph.fail == ref_graph.fail
+    assert read_csv(tmp_path / "result" / "fail_pair_candidates.csv") == ref_csv
+    assert graph.applied == []
+
+    # 완료 뒤 다음 증분 실행은 새 구간(새 로그 없음)만 본다
+    cli.main()
+    assert graph.next == ref_graph.next
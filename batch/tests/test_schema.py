@@ -0,0 +1,50 @@
+# tests/test_schema.py
+from neo4j.exceptions import ServiceUnavailable
+
+from search_graph import neo4j_client as nc
+
+from fake_neo4j import FakeGraph, FakeResult, fake_service
+
+
+class StartingDriver:
+    """처음 down 번은 ServiceUnavailable (Neo4j 가 아직 뜨는 중), 그 뒤 실행한 쿼리를 기록"""
+
+    def __init__(self, down):
+        self.down = down
+        self.ran = []
+
+    def session(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        if self.down:
+            self.down -= 1
+            raise ServiceUnavailable("Neo4j 연결 불가")
+        self.ran.append(query)
+        return FakeResult()
+
+
+def test_ensure_schema_retries_until_neo4j_is_up(monkeypatch):
+    delays = []
+    monkeypatch.setattr(nc.time, "sleep", delays.append)
+    service = fake_service(FakeGraph())
+    service._driver = StartingDriver(down=2)
+
+    service.ensure_schema()
+    assert delays == [nc.schema_retry_delay(1), nc.schema_retry_delay(2)]
+    assert service._driver.ran == list(nc.SCHEMA_STATEMENTS.values())
+
+
+def test_ensure_schema_gives_up_without_raising(monkeypatch):
+    monkeypatch.setattr(nc.time, "sleep", lambda delay: None)
+    service = fake_service(FakeGraph())
+    service._driver = StartingDriver(down=100)
+
+    service.ensure_schema()
+    assert service._driver.ran == []
@@ -0,0 +1,25 @@
+# tests/test_shipped_queries.py
+import re
+
+from search_graph.neo4j_client import SHIPPED_QUERIES
+
+_PARAM = re.compile(r"\$(\w+)")
+
+
+def test_sample_params_cover_every_query_parameter():
+    # schema 모드의 EXPLAIN 은 파라미터가 빠지면 실패한다
+    for name, (query, params) in SHIPPED_QUERIES.items():
+        assert set(_PARAM.findall(query)) <= set(params), name
+
+
+def test_api_queries_are_registered():
+    names = {name for name in SHIPPED_QUERIES if name.startswith("api_")}
+    assert {
+        "api_merge_next_click",
+        "api_unwind_next_deltas",
+        "api_unwind_next_deltas_return_counts",
+        "api_node_with_next",
+        "api_node_by_name",
+        "api_nodes_with_next",
+        "api_list_nodes",
+    } <= names
@@ -0,0 +1,88 @@
+# tests/test_sources.py
+"""dump(ES 소스 → NDJSON) 한 파일을 FileEventSource 로 재생하는 왕복"""
+import json
+
+from search_graph.sources import ElasticsearchEventSource, FileEventSource, write_ndjson
+
+GTE, LTE = "2024-12-01T00:00:00.000", "2024-12-31T23:59:59.999"
+
+
+def doc(pcid, minute, query="테라"):
+    log = {"search_query": query, "created_date_time": f"2024-12-01T10:{minute:02d}:00.000"}
+    if pcid is not None:
+        log["user_pcid"] = pcid
+    return {"_source": {"query_log": log}}
+
+
+DOCS = [
+    doc("p2", 1),
+    doc(None, 2),
+    doc("p1", 3),
+    doc("p1", 1),
+    doc(None, 0),
+    doc("p3", 5),
+]
+
+
+class FakeES:
+    """ElasticsearchService.iter_hits 대역: exists / 기간 필터와 정렬(값 없으면 맨 뒤)만 흉내"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.bodies = []
+
+    def iter_hits(self, index_name, body, page_size=10000):
+        self.bodies.append(body)
+        hits = [h for h in self.docs if all(self._match(h, f) for f in body["query"]["bool"]["filter"])]
+        # ES 기본값: 정렬 필드가 없는 문서는 asc 에서도 맨 뒤 (missing: _last)
+        return iter(
+            sorted(
+                hits,
+                key=lambda h: (
+                    "user_pcid" not in h["_source"]["query_log"],
+                    h["_source"]["query_log"].get("user_pcid", ""),
+                    h["_source"]["query_log"]["created_date_time"],
+                ),
+            )
+        )
+
+    @staticmethod
+    def _match(hit, clause):
+        log = hit["_source"]["query_log"]
+        if "exists" in clause:
+            return clause["exists"]["field"] == "query_log.user_pcid.keyword" and "user_pcid" in log
+        (field, cond), = clause["range"].items()
+        value = log.get(field.split(".", 1)[1].replace(".keyword", ""))
+        if value is None:
+            return False
+        return all(
+            {"gt": value > bound, "gte": value >= bound, "lte": value <= bound}[op]
+            for op, bound in cond.items()
+        )
+
+
+def sources(hits):
+    return [h["_source"] for h in hits]
+
+
+def test_dump_and_replay_round_trip(tmp_path):
+    es_source = ElasticsearchEventSource(FakeES(DOCS), "search-log")
+    path = str(tmp_path / "events.ndjson.gz")
+
+    dumped = write_ndjson(path, es_source.iter_hits(GTE, LTE))
+    replayed = list(FileEventSource([path]).iter_hits(GTE, LTE))
+
+    assert dumped == 4
+    assert sources(replayed) == sources(es_source.iter_hits(GTE, LTE))
+    assert [h["_source"]["query_log"]["user_pcid"] for h in replayed] == ["p1", "p1", "p2", "p3"]
+
+
+def test_replay_skips_events_without_pcid(tmp_path):
+    # exists 필터가 없던 때 만든 덤프: user_pcid 없는 이벤트가 ES 정렬대로 맨 뒤에 있다
+    path = tmp_path / "old.ndjson"
+    with open(path, "w", encoding="utf-8") as f:
+        for hit in FakeES(DOCS).iter_hits("search-log", {"query": {"bool": {"filter": []}}}):
+            f.write(json.dumps(hit["_source"], ensure_ascii=False) + "\n")
+
+    replayed = list(FileEventSource([str(path)]).iter_hits(GTE, LTE, after_pcid="p1"))
+    assert [h["_source"]["query_log"]["user_pcid"] for h in replayed] == ["p2", "p3"]
@@ -0,0 +1,65 @@
+# tests/test_vector_transitions.py
+"""NumPy 전이 계산(vector_transitions)이 process_hits 루프와 같은 결과를 내는지 무작위 입력으로 비교"""
+import random
+from collections import Counter
+from itertools import groupby
+from operator import attrgetter
+
+import pytest
+
+from search_graph import search_log_processor, vector_transitions
+from search_graph.edge_accumulator import EdgeAccumulator
+from search_graph.events import SearchEvent
+from search_graph.search_log_processor import SearchLogProcessor
+from search_graph.vector_transitions import (
+    columns_from_events,
+    diff_accumulators,
+    extract_transitions,
+)
+
+KEYWORDS = ["테라", "카스", "맥주", "소주", "치킨", ""]
+DAYS = ["2024-12-01", "2024-12-02", "2024-12-03", ""]
+
+
+def random_events(rng, pcids=30):
+    events = []
+    for p in range(pcids):
+        ts = sorted(
+            (rng.choice(DAYS), rng.randrange(24 * 60)) for _ in range(rng.randrange(1, 15))
+        )
+        for day, minute in ts:
+            events.append(
+                SearchEvent(
+                    pcid=f"p{p:03d}",
+                    query=rng.choice(KEYWORDS),
+                    created_dt=f"{day}T{minute // 60:02d}:{minute % 60:02d}:00.000" if day else "",
+                    result_count=rng.choice([0, 0, 3]),
+                )
+            )
+    return events
+
+
+@pytest.fixture(params=["all_fail", "zero_results"])
+def fail_rule(request, monkeypatch):
+    # 현재 MVP 기준(모두 실패)과 운영 예정 기준(result_count == 0) 둘 다 비교
+    if request.param == "zero_results":
+        rule = lambda event: event.result_count == 0  # noqa: E731
+        monkeypatch.setattr(search_log_processor, "is_fail_event", rule)
+        monkeypatch.setattr(vector_transitions, "is_fail_event", rule)
+    return request.param
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_vector_matches_loop(seed, fail_rule):
+    events = random_events(random.Random(seed))
+    processor = SearchLogProcessor(es=None, neo=None, index_name="idx", query_file="")
+
+    loop_acc = EdgeAccumulator()
+    loop_fail_pairs = Counter()
+    for _, sequence in groupby(events, key=attrgetter("pcid")):
+        loop_fail_pairs.update(processor.process_hits(sequence, writer=loop_acc))
+
+    vector_acc, vector_fail_pairs = extract_transitions(columns_from_events(events))
+
+    assert diff_accumulators(loop_acc, vector_acc) == []
+    assert loop_fail_pairs == vector_fail_pairs